@@ -0,0 +1,41 @@
+# batch.py  – solve an NDJSON file of scheduling requests, NDJSON results out
+import argparse, asyncio, json, os, sys
+from concurrent.futures import ProcessPoolExecutor
+
+from server import batch_results
+
+
+# ---------- CLI arguments ----------
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("input", nargs="?", default="-", help="NDJSON file, - for stdin")
+    p.add_argument("-o", "--output", default="-", help="NDJSON file, - for stdout")
+    p.add_argument("--time-limit", type=float, default=10, help="seconds/instance")
+    p.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    return p.parse_args()
+
+
+# ---------- main ----------
+async def run(a) -> None:
+    src = sys.stdin.buffer if a.input == "-" else open(a.input, "rb")
+    out = sys.stdout if a.output == "-" else open(a.output, "w")
+
+    async def lines():
+        for line in src:
+            yield line
+
+    num_workers = max(1, (os.cpu_count() or 1) // a.processes)
+    with ProcessPoolExecutor(max_workers=a.processes) as pool:
+        async for res in batch_results(
+            lines(), pool, a.time_limit, 2 * a.processes, num_workers
+        ):
+            out.write(json.dumps(res) + "\n")
+            out.flush()
+
+
+def main():
+    asyncio.run(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
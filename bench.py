@@ -0,0 +1,178 @@
+# bench.py  – seeded scaling benchmark for the CP-SAT model
+import argparse, itertools, json, platform, random, sys, time
+from argparse import Namespace
+from typing import Any, Dict, List
+
+from ortools.sat.python import cp_model
+
+from bench_busy import add_busy_windows
+from server import ScheduleRequestBW, build_model, busy_maps
+from test import build_payload
+
+SWEEP = ("tasks", "workers", "machines", "types", "horizon", "busy")
+STATUS_RANK = {"OPTIMAL": 0, "FEASIBLE": 1, "INFEASIBLE": 0, "UNKNOWN": 2}
+
+
+# ---------- CLI arguments ----------
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("--tasks", type=int, nargs="+", default=[20, 50, 100])
+    p.add_argument("--workers", type=int, nargs="+", default=[5, 10])
+    p.add_argument("--machines", type=int, nargs="+", default=[5, 10])
+    p.add_argument("--types", type=int, nargs="+", default=[4])
+    p.add_argument("--horizon", type=int, nargs="+", default=[300])
+    p.add_argument("--busy", type=int, nargs="+", default=[0, 5])
+    p.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    p.add_argument("--time-limit", type=float, default=10)
+    p.add_argument("--num-workers", type=int, default=1, help="CP-SAT threads")
+    p.add_argument(
+        "--strengthen",
+        choices=["off", "on", "both"],
+        default="off",
+        help="strengthening layer; 'both' also reports the gain",
+    )
+    p.add_argument("-o", "--output", default="bench_results.json")
+    p.add_argument("--compare", help="baseline results file to check against")
+    p.add_argument("--tolerance", type=float, default=0.2, help="relative slowdown")
+    p.add_argument("--slack", type=float, default=0.05, help="absolute seconds")
+    return p.parse_args()
+
+
+# ---------- instance ----------
+def make_instance(cfg: Dict[str, int], seed: int) -> ScheduleRequestBW:
+    random.seed(seed)
+    gen = Namespace(
+        workers=cfg["workers"],
+        machines=cfg["machines"],
+        tasks=cfg["tasks"],
+        types=[f"T{i}" for i in range(cfg["types"])],
+        dur_min=1,
+        dur_max=max(1, cfg["horizon"] // 50),
+        horizon=cfg["horizon"],
+    )
+    payload = add_busy_windows(build_payload(gen), cfg["busy"], cfg["horizon"])
+    return ScheduleRequestBW(**payload)
+
+
+# ---------- measurement ----------
+def measure(
+    req: ScheduleRequestBW, time_limit: float, num_workers: int, strengthen: bool
+):
+    t0 = time.perf_counter()
+    sm = build_model(req, *busy_maps(req), strengthen=strengthen)
+    build_s = time.perf_counter() - t0
+    proto = sm.mdl.Proto()
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.num_workers = num_workers
+    t0 = time.perf_counter()
+    status = solver.Solve(sm.mdl)
+    solve_s = time.perf_counter() - t0
+    found = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    return dict(
+        build_s=build_s,
+        solve_s=solve_s,
+        vars=len(proto.variables),
+        constraints=len(proto.constraints),
+        status=solver.StatusName(status),
+        objective=int(solver.ObjectiveValue()) if found else None,
+        bound=int(solver.BestObjectiveBound()) if found else None,
+        branches=solver.NumBranches(),
+        conflicts=solver.NumConflicts(),
+    )
+
+
+def run_key(r: Dict[str, Any]):
+    return tuple(r[k] for k in SWEEP) + (r["seed"], r.get("strengthen", False))
+
+
+# ---------- comparison ----------
+def compare(runs: List[Dict[str, Any]], baseline: List[Dict[str, Any]], a) -> List[str]:
+    base = {run_key(r): r for r in baseline}
+    issues = []
+    for r in runs:
+        b = base.get(run_key(r))
+        if b is None:
+            continue
+        cfg = " ".join(f"{k}={r[k]}" for k in SWEEP + ("seed", "strengthen"))
+        for k in ("build_s", "solve_s"):
+            if r[k] > b[k] * (1 + a.tolerance) + a.slack:
+                issues.append(f"{cfg}: {k} {b[k]:.3f} -> {r[k]:.3f}")
+        pair = (b["status"], r["status"])
+        flipped = pair[0] != pair[1] and "INFEASIBLE" in pair  # proven either way
+        if flipped or STATUS_RANK.get(pair[1], 3) > STATUS_RANK.get(pair[0], 3):
+            issues.append(f"{cfg}: status {b['status']} -> {r['status']}")
+        if (
+            None not in (r["objective"], b["objective"])
+            and r["objective"] > b["objective"]
+        ):
+            issues.append(f"{cfg}: objective {b['objective']} -> {r['objective']}")
+    return issues
+
+
+def gain(runs: List[Dict[str, Any]]) -> None:
+    """Strengthened vs. plain model on the same instances."""
+    plain = {run_key(r)[:-1]: r for r in runs if not r["strengthen"]}
+    pairs = [(plain[run_key(r)[:-1]], r) for r in runs if r["strengthen"]]
+    if not pairs:
+        return
+    proven = [sum(x["status"] == "OPTIMAL" for x in side) for side in zip(*pairs)]
+    total = [sum(x["build_s"] + x["solve_s"] for x in side) for side in zip(*pairs)]
+    print(
+        f"strengthen: {proven[0]} -> {proven[1]} of {len(pairs)} proven optimal, "
+        f"total time {total[0]:.2f}s -> {total[1]:.2f}s "
+        f"({total[0] / max(total[1], 1e-9):.2f}x)"
+    )
+
+
+# ---------- main ----------
+def main():
+    a = parse_args()
+    runs = []
+    print(
+        f"{'tasks':>5} {'wrk':>4} {'mch':>4} {'typ':>4} {'hor':>6} {'busy':>4} "
+        f"{'seed':>4} {'vars':>7} {'cons':>7} {'build_s':>8} {'solve_s':>8} "
+        f"{'obj':>6} {'bound':>6} {'str':>3}  status"
+    )
+    variants = {"off": [False], "on": [True], "both": [False, True]}[a.strengthen]
+    for values in itertools.product(*(getattr(a, k) for k in SWEEP)):
+        cfg = dict(zip(SWEEP, values))
+        for seed, strengthen in itertools.product(a.seeds, variants):
+            r = {**cfg, "seed": seed, "strengthen": strengthen}
+            req = make_instance(cfg, seed)
+            r.update(measure(req, a.time_limit, a.num_workers, strengthen))
+            runs.append(r)
+            print(
+                f"{r['tasks']:>5} {r['workers']:>4} {r['machines']:>4} "
+                f"{r['types']:>4} {r['horizon']:>6} {r['busy']:>4} {seed:>4} "
+                f"{r['vars']:>7} {r['constraints']:>7} {r['build_s']:>8.3f} "
+                f"{r['solve_s']:>8.3f} {str(r['objective']):>6} "
+                f"{str(r['bound']):>6} {'on' if strengthen else 'off':>3}  "
+                f"{r['status']}"
+            )
+    gain(runs)
+
+    meta = dict(
+        python=platform.python_version(),
+        machine=platform.machine(),
+        time_limit=a.time_limit,
+        num_workers=a.num_workers,
+        created=time.strftime("%Y-%m-%dT%H:%M:%S"),
+    )
+    with open(a.output, "w") as f:
+        json.dump({"meta": meta, "runs": runs}, f, indent=1)
+    print(f"wrote {len(runs)} runs to {a.output}")
+
+    if a.compare:
+        with open(a.compare) as f:
+            issues = compare(runs, json.load(f)["runs"], a)
+        for line in issues:
+            print("REGRESSION", line)
+        if issues:
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# bench_busy.py  – model size / solve time vs. number of busy windows
+import argparse, random, time
+from argparse import Namespace
+from typing import Any, Dict
+
+from ortools.sat.python import cp_model
+
+from server import (
+    Machine,
+    ScheduleRequest,
+    ScheduleRequestBW,
+    Task,
+    Worker,
+    build_model,
+    merge_busy_windows,
+)
+from test import build_payload
+
+
+# ---------- CLI arguments ----------
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("--workers", type=int, default=8)
+    p.add_argument("--machines", type=int, default=8)
+    p.add_argument("--tasks", type=int, default=40)
+    p.add_argument("--types", nargs="+", default=list("ABCD"))
+    p.add_argument("--horizon", type=int, default=400)
+    p.add_argument("--busy", type=int, nargs="+", default=[0, 2, 5, 10, 20, 40])
+    p.add_argument("--time-limit", type=float, default=10)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--legacy", action="store_true", help="also time phantom model")
+    return p.parse_args()
+
+
+# ---------- instance ----------
+def add_busy_windows(payload: Dict[str, Any], per_resource: int, horizon: int):
+    for r in payload["workers"] + payload["machines"]:
+        r["id"] = str(r["id"])
+        r["busy_windows"] = []
+        for _ in range(per_resource):
+            s = random.randint(0, horizon - 1)
+            r["busy_windows"].append((s, min(horizon, s + random.randint(1, 5))))
+    for t in payload["tasks"]:
+        t["id"] = str(t["id"])
+    return payload
+
+
+def legacy_request(req: ScheduleRequestBW) -> ScheduleRequest:
+    """Old encoding: one phantom resource, type and dummy task per busy window."""
+    workers = [Worker(id=w.id, types=set(w.types)) for w in req.workers]
+    machines = [Machine(id=m.id, types=set(m.types)) for m in req.machines]
+    tasks = list(req.tasks)
+    for own, other, cls, src, tag in (
+        (workers, machines, Machine, req.workers, "W"),
+        (machines, workers, Worker, req.machines, "M"),
+    ):
+        for r, res in zip(src, own):
+            for i, (s, e) in enumerate(merge_busy_windows(r.busy_windows)):
+                ttype = f"_BW_{tag}{r.id}_{i}"
+                res.types.add(ttype)
+                other.append(cls(id=f"ph_{ttype}", types={ttype}))
+                tasks.append(
+                    Task(
+                        id=f"d_{ttype}",
+                        type=ttype,
+                        duration=e - s,
+                        earliest_start=s,
+                        deadline=e,
+                    )
+                )
+    return ScheduleRequest(workers=workers, machines=machines, tasks=tasks)
+
+
+def legacy_model(req: ScheduleRequest) -> Namespace:
+    """
+    The model /schedule built before busy windows were native: a presence
+    literal for every (task, resource) pair, ineligible ones fixed to 0.
+    Kept here so --legacy times the old builder, not today's build_model().
+    """
+    mdl = cp_model.CpModel()
+    horizon = max(t.deadline for t in req.tasks)
+    start = {
+        t.id: mdl.NewIntVar(t.earliest_start, t.deadline - t.duration, f"start_t{t.id}")
+        for t in req.tasks
+    }
+    w_choose, m_choose = {}, {}
+    for t in req.tasks:
+        for w in req.workers:
+            key = (t.id, w.id)
+            w_choose[key] = mdl.NewBoolVar(f"w_t{t.id}_w{w.id}")
+            if t.type not in w.types:
+                mdl.Add(w_choose[key] == 0)
+        for m in req.machines:
+            key = (t.id, m.id)
+            m_choose[key] = mdl.NewBoolVar(f"m_t{t.id}_m{m.id}")
+            if t.type not in m.types:
+                mdl.Add(m_choose[key] == 0)
+        mdl.Add(sum(w_choose[(t.id, w.id)] for w in req.workers) == 1)
+        mdl.Add(sum(m_choose[(t.id, m.id)] for m in req.machines) == 1)
+        mdl.Add(start[t.id] + t.duration <= t.deadline)
+
+    for resources, choose, tag in (
+        (req.workers, w_choose, "w"),
+        (req.machines, m_choose, "m"),
+    ):
+        for r in resources:
+            intervals = [
+                mdl.NewOptionalIntervalVar(
+                    start[t.id],
+                    t.duration,
+                    start[t.id] + t.duration,
+                    choose[(t.id, r.id)],
+                    f"int_t{t.id}_{tag}{r.id}",
+                )
+                for t in req.tasks
+                if t.type in r.types
+            ]
+            mdl.AddNoOverlap(intervals)
+
+    makespan = mdl.NewIntVar(0, horizon, "makespan")
+    mdl.AddMaxEquality(makespan, [start[t.id] + t.duration for t in req.tasks])
+    mdl.Minimize(makespan)
+    return Namespace(mdl=mdl)
+
+
+# ---------- measurement ----------
+def run(label: str, build, time_limit: float) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    sm = build()
+    t_build = time.perf_counter() - t0
+    proto = sm.mdl.Proto()
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    t0 = time.perf_counter()
+    status = solver.Solve(sm.mdl)
+    t_solve = time.perf_counter() - t0
+    return dict(
+        model=label,
+        vars=len(proto.variables),
+        constraints=len(proto.constraints),
+        build_s=t_build,
+        solve_s=t_solve,
+        status=solver.StatusName(status),
+    )
+
+
+# ---------- main ----------
+def main():
+    a = parse_args()
+    gen = Namespace(
+        workers=a.workers,
+        machines=a.machines,
+        tasks=a.tasks,
+        types=a.types,
+        dur_min=1,
+        dur_max=4,
+        horizon=a.horizon,
+    )
+    print(
+        f"{'busy':>5} {'model':>7} {'vars':>7} {'cons':>7} "
+        f"{'build_s':>8} {'solve_s':>8}  status"
+    )
+    for k in a.busy:
+        random.seed(a.seed)
+        payload = add_busy_windows(build_payload(gen), k, a.horizon)
+        req = ScheduleRequestBW(**payload)
+        wb = {w.id: merge_busy_windows(w.busy_windows) for w in req.workers}
+        mb = {m.id: merge_busy_windows(m.busy_windows) for m in req.machines}
+        rows = [run("native", lambda: build_model(req, wb, mb), a.time_limit)]
+        if a.legacy:
+            rows.append(
+                run("legacy", lambda: legacy_model(legacy_request(req)), a.time_limit)
+            )
+        for r in rows:
+            print(
+                f"{k:>5} {r['model']:>7} {r['vars']:>7} {r['constraints']:>7} "
+                f"{r['build_s']:>8.3f} {r['solve_s']:>8.3f}  {r['status']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# bench_ingest.py  – parse-to-model and result-to-bytes time vs. instance size
+import argparse, json, random, time
+from argparse import Namespace
+from typing import Callable
+
+from fastapi.encoders import jsonable_encoder
+import msgpack
+import orjson
+
+from bench_busy import add_busy_windows
+from server import (
+    ScheduleRequestBW,
+    anytime_fields,
+    build_model,
+    busy_maps,
+    dumps,
+    heuristic_plan,
+    precheck,
+)
+from test import build_payload
+
+
+# ---------- CLI arguments ----------
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("--tasks", type=int, nargs="+", default=[1000, 2000, 5000])
+    p.add_argument("--workers", type=int, default=50)
+    p.add_argument("--machines", type=int, default=50)
+    p.add_argument("--types", type=int, default=10)
+    p.add_argument("--horizon", type=int, default=10000)
+    p.add_argument("--busy", type=int, default=5, help="busy windows per resource")
+    p.add_argument("--repeat", type=int, default=3, help="best of this many runs")
+    p.add_argument("--seed", type=int, default=0)
+    return p.parse_args()
+
+
+# ---------- measurement ----------
+def best_of(repeat: int, fn: Callable[[], object]) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def legacy_bytes(result) -> bytes:
+    """What a plain dict return cost: jsonable_encoder, then JSONResponse."""
+    return json.dumps(
+        jsonable_encoder(result),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+# ---------- main ----------
+def main():
+    a = parse_args()
+    print(
+        f"{'tasks':>6} {'bytes':>9} {'decode':>8} {'validate':>8} "
+        f"{'precheck':>8} {'build':>8} {'legacy':>8} {'encode':>8} {'msgpack':>8}"
+    )
+    for n in a.tasks:
+        random.seed(a.seed)
+        gen = Namespace(
+            workers=a.workers,
+            machines=a.machines,
+            tasks=n,
+            types=[f"T{i}" for i in range(a.types)],
+            dur_min=1,
+            dur_max=max(1, a.horizon // 500),
+            horizon=a.horizon,
+        )
+        payload = add_busy_windows(build_payload(gen), a.busy, a.horizon)
+        body = json.dumps(payload).encode()
+        decode = orjson.loads
+
+        t_decode = best_of(a.repeat, lambda: decode(body))
+        data = decode(body)
+        t_validate = best_of(a.repeat, lambda: ScheduleRequestBW.model_validate(data))
+        req = ScheduleRequestBW.model_validate(data)
+        wb, mb = busy_maps(req)
+        t_pre = best_of(a.repeat, lambda: precheck(req, wb, mb))
+        bounds = precheck(req, wb, mb).bounds
+        t_build = best_of(a.repeat, lambda: build_model(req, wb, mb, bounds))
+
+        plan = heuristic_plan(req, wb, mb)
+        if plan is None:
+            print(f"{n:>6} no heuristic plan; skipped result-to-bytes")
+            continue
+        result = {
+            **plan,
+            "engine": "heuristic",
+            **anytime_fields("FEASIBLE", plan["makespan"], 0, 0.0),
+        }
+        assert json.loads(dumps(result)) == json.loads(legacy_bytes(result))
+        t_legacy = best_of(a.repeat, lambda: legacy_bytes(result))
+        t_encode = best_of(a.repeat, lambda: dumps(result))
+        t_pack = best_of(a.repeat, lambda: msgpack.packb(result))
+        print(
+            f"{n:>6} {len(body):>9} {t_decode:>8.4f} {t_validate:>8.4f} "
+            f"{t_pre:>8.4f} {t_build:>8.4f} {t_legacy:>8.4f} {t_encode:>8.4f} "
+            f"{t_pack:>8.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# bench_startup.py  – import time and cold start to the first successful /schedule
+import argparse, os, re, statistics, subprocess, sys, time
+from typing import Dict, List, Optional
+
+import httpx
+
+from server import WARMUP_INSTANCE
+
+# not the warm-up instance itself: the first request must not be a cache hit
+FIRST_REQUEST = {
+    "workers": [
+        {"id": w["id"], "types": w["types"]} for w in WARMUP_INSTANCE["workers"]
+    ],
+    "machines": [
+        {"id": m["id"], "types": m["types"]} for m in WARMUP_INSTANCE["machines"]
+    ],
+    "tasks": [{**t, "id": f"first-{t['id']}"} for t in WARMUP_INSTANCE["tasks"]],
+}
+
+
+# ---------- CLI arguments ----------
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("--repeat", type=int, default=5, help="median of this many runs")
+    p.add_argument(
+        "--import-budget", type=float, default=1.5, help="seconds; exit 1 if over"
+    )
+    p.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    p.add_argument(
+        "--launchers",
+        nargs="+",
+        choices=["uvicorn", "prefork"],
+        default=["uvicorn", "prefork"],
+    )
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    p.add_argument("--no-warmup", action="store_true", help="SCHEDULER_WARMUP=0")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--timeout", type=float, default=60)
+    return p.parse_args()
+
+
+# ---------- import time ----------
+def import_profile() -> Dict[str, float]:
+    """
+    `python -X importtime -c "import server"`: cumulative seconds of each
+    package server.py imports directly, and of server itself.
+    """
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    cumulative: Dict[str, float] = {}
+    children: Dict[str, float] = {}
+    for line in out.splitlines():
+        m = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( +)(\S+)", line)
+        if not m:
+            continue
+        # a module is listed after its imports, one indent level deeper
+        name, seconds = m.group(3).split(".")[0], int(m.group(1)) / 1e6
+        if len(m.group(2)) == 3:
+            children[name] = children.get(name, 0) + seconds
+        elif len(m.group(2)) == 1:
+            if name == "server":
+                cumulative = {**children, "server": seconds}
+            children = {}
+    return cumulative
+
+
+# ---------- cold start ----------
+def command(launcher: str, workers: int, port: int) -> List[str]:
+    if launcher == "prefork":
+        return [
+            sys.executable,
+            "server.py",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+        ]
+    cmd = [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port)]
+    return cmd + ["--workers", str(workers), "--log-level", "warning"]
+
+
+def wait_for(
+    client: httpx.Client, path: str, t0: float, deadline: float
+) -> Optional[float]:
+    while time.perf_counter() < deadline:
+        try:
+            if client.get(path).status_code == 200:
+                return time.perf_counter() - t0
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.005)
+    return None
+
+
+def cold_start(launcher: str, workers: int, a) -> Dict[str, Optional[float]]:
+    env = dict(os.environ, SCHEDULER_WARMUP="0" if a.no_warmup else "1")
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(command(launcher, workers, a.port), env=env)
+    deadline = t0 + a.timeout
+    try:
+        with httpx.Client(
+            base_url=f"http://127.0.0.1:{a.port}", timeout=a.timeout
+        ) as c:
+            listen = wait_for(c, "/health", t0, deadline)
+            ready = wait_for(c, "/ready", t0, deadline)
+            t1 = time.perf_counter()
+            r = c.post(
+                "/schedule_with_busy",
+                json=FIRST_REQUEST,
+                headers={"cache-control": "no-cache"},
+            )
+            first = time.perf_counter() - t0 if r.status_code == 200 else None
+            return dict(
+                listen=listen,
+                ready=ready,
+                first=first,
+                latency=time.perf_counter() - t1,
+            )
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+# ---------- main ----------
+def main():
+    a = parse_args()
+    profiles = [import_profile() for _ in range(a.repeat)]
+    total = statistics.median(p["server"] for p in profiles)
+    print(
+        f"import server: {total:.3f}s median of {a.repeat} (budget {a.import_budget}s)"
+    )
+    median = {
+        k: statistics.median(p.get(k, 0) for p in profiles)
+        for k in profiles[0]
+        if k != "server"
+    }
+    for name in sorted(median, key=median.get, reverse=True)[: a.top]:
+        print(f"  {name:<20} {median[name]:.3f}s")
+
+    print(
+        f"\n{'launcher':<9} {'workers':>7} {'listen':>8} {'ready':>8} "
+        f"{'first':>8} {'latency':>8}   (seconds from launch, median)"
+    )
+    for launcher in a.launchers:
+        for workers in a.workers:
+            runs = [cold_start(launcher, workers, a) for _ in range(a.repeat)]
+            cols = []
+            for k in ("listen", "ready", "first", "latency"):
+                xs = [r[k] for r in runs if r[k] is not None]
+                cols.append(f"{statistics.median(xs):>8.3f}" if xs else f"{'-':>8}")
+            print(f"{launcher:<9} {workers:>7} {' '.join(cols)}")
+
+    if total > a.import_budget:
+        print(f"import time {total:.3f}s is over the {a.import_budget}s budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
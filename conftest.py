@@ -0,0 +1,20 @@
+# conftest.py  – shared test setup: a throwaway store, no warm-up solve
+import os, tempfile
+
+import pytest
+
+os.environ.setdefault("SCHEDULER_WARMUP", "0")
+os.environ.setdefault(
+    "SCHEDULER_STORE_DB", os.path.join(tempfile.mkdtemp(), "schedules.sqlite")
+)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One app for the whole run: its lifespan shuts the job pool down."""
+    from fastapi.testclient import TestClient
+
+    import server
+
+    with TestClient(server.app) as c:
+        yield c
@@ -0,0 +1,233 @@
+# loadtest.py  – latency and throughput of the scheduler under concurrent load
+import argparse, asyncio, itertools, json, random, subprocess, sys, time
+from argparse import Namespace
+from typing import Any, Dict, List
+
+import httpx
+import numpy as np
+
+from bench_busy import add_busy_windows
+from test import build_payload
+
+
+# ---------- CLI arguments ----------
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("--url", default="http://127.0.0.1:8000")
+    p.add_argument("--path", default="/schedule_with_busy")
+    p.add_argument("--query", default="", help="e.g. 'time_limit=2&mode=heuristic'")
+    p.add_argument("--no-cache", action="store_true", help="send Cache-Control")
+    src = p.add_argument_group("instances (generated unless --capture is given)")
+    src.add_argument("--capture", help="JSONL: one payload, or {path, query, body}")
+    src.add_argument("--instances", type=int, default=50, help="distinct generated")
+    src.add_argument("--workers", type=int, default=5)
+    src.add_argument("--machines", type=int, default=5)
+    src.add_argument("--tasks", type=int, default=20)
+    src.add_argument("--types", nargs="+", default=list("ABCD"))
+    src.add_argument("--horizon", type=int, default=100)
+    src.add_argument("--busy", type=int, default=2, help="busy windows per resource")
+    src.add_argument("--seed", type=int, default=0)
+    load = p.add_argument_group("load")
+    mode = load.add_mutually_exclusive_group()
+    mode.add_argument("--concurrency", type=int, default=8, help="closed loop")
+    mode.add_argument("--rate", type=float, help="open loop: Poisson arrivals/s")
+    load.add_argument("--requests", type=int, default=200)
+    load.add_argument("--duration", type=float, help="stop sending after seconds")
+    load.add_argument("--timeout", type=float, default=120)
+    srv = p.add_argument_group("local server")
+    srv.add_argument("--spawn", type=int, metavar="N", help="run uvicorn, N workers")
+    srv.add_argument("--port", type=int, default=8000)
+    p.add_argument("-o", "--output", help="per-request records as JSON")
+    return p.parse_args()
+
+
+# ---------- instances ----------
+def load_capture(path: str, a) -> List[Dict[str, Any]]:
+    jobs = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            if "body" not in rec:
+                rec = {"body": rec}
+            jobs.append(
+                {
+                    "path": rec.get("path", a.path),
+                    "query": rec.get("query", a.query),
+                    "body": json.dumps(rec["body"]).encode(),
+                }
+            )
+    return jobs
+
+
+def generate(a) -> List[Dict[str, Any]]:
+    gen = Namespace(
+        workers=a.workers,
+        machines=a.machines,
+        tasks=a.tasks,
+        types=a.types,
+        dur_min=1,
+        dur_max=max(1, a.horizon // 20),
+        horizon=a.horizon,
+    )
+    jobs = []
+    for i in range(a.instances):
+        random.seed(a.seed + i)
+        payload = add_busy_windows(build_payload(gen), a.busy, a.horizon)
+        jobs.append(
+            {"path": a.path, "query": a.query, "body": json.dumps(payload).encode()}
+        )
+    return jobs
+
+
+# ---------- load ----------
+async def fire(client: httpx.AsyncClient, job, a, due: float) -> Dict[str, Any]:
+    """One request; latency counts from `due`, when it should have been sent."""
+    url = a.url + job["path"] + (f"?{job['query']}" if job["query"] else "")
+    headers = {"content-type": "application/json"}
+    if a.no_cache:
+        headers["cache-control"] = "no-cache"
+    rec: Dict[str, Any] = {"path": job["path"], "sent": due}
+    try:
+        r = await client.post(url, content=job["body"], headers=headers)
+    except httpx.HTTPError as e:
+        rec.update(status="error", error=type(e).__name__)
+        rec["latency"] = time.perf_counter() - due
+        return rec
+    rec["latency"] = time.perf_counter() - due
+    rec["status"] = r.status_code
+    timing = r.headers.get("server-timing", "")
+    if "dur=" in timing:
+        rec["server"] = float(timing.split("dur=")[1].split(",")[0]) / 1000
+    if r.status_code == 200:
+        rec["solve"] = r.json().get("wall_time")
+    return rec
+
+
+async def closed_loop(client, jobs, a) -> List[Dict[str, Any]]:
+    """`concurrency` clients, each sending its next request on a response."""
+    records: List[Dict[str, Any]] = []
+    counter = itertools.count()
+    stop = time.perf_counter() + (a.duration or float("inf"))
+
+    async def user():
+        while (i := next(counter)) < a.requests and time.perf_counter() < stop:
+            now = time.perf_counter()
+            records.append(await fire(client, jobs[i % len(jobs)], a, now))
+
+    await asyncio.gather(*(user() for _ in range(a.concurrency)))
+    return records
+
+
+async def open_loop(client, jobs, a) -> List[Dict[str, Any]]:
+    """Poisson arrivals at `rate`, whether or not earlier requests returned."""
+    rnd = random.Random(a.seed)
+    due = time.perf_counter()
+    stop = due + (a.duration or float("inf"))
+    tasks = []
+    for i in range(a.requests):
+        due += rnd.expovariate(a.rate)
+        if due >= stop:
+            break
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        tasks.append(asyncio.create_task(fire(client, jobs[i % len(jobs)], a, due)))
+    return list(await asyncio.gather(*tasks))
+
+
+async def run(a, jobs) -> List[Dict[str, Any]]:
+    # open loop: never let the client's own pool queue requests
+    cap = None if a.rate else a.concurrency
+    limits = httpx.Limits(max_connections=cap, max_keepalive_connections=cap)
+    async with httpx.AsyncClient(limits=limits, timeout=a.timeout) as client:
+        if a.rate:
+            return await open_loop(client, jobs, a)
+        return await closed_loop(client, jobs, a)
+
+
+# ---------- report ----------
+def report(records: List[Dict[str, Any]], elapsed: float) -> None:
+    n = len(records)
+    if not n:
+        print("no requests sent")
+        return
+    codes: Dict[str, int] = {}
+    for r in records:
+        codes[str(r["status"])] = codes.get(str(r["status"]), 0) + 1
+    ok = [r for r in records if r["status"] == 200]
+    errors = sum(
+        r["status"] == "error" or not 200 <= r["status"] < 300 and r["status"] != 422
+        for r in records
+    )
+    print(
+        f"{n} requests in {elapsed:.2f}s: {n / elapsed:.1f} req/s, "
+        f"{len(ok) / elapsed:.1f} ok/s"
+    )
+    print(
+        f"status: {', '.join(f'{k}={v}' for k, v in sorted(codes.items()))}; "
+        f"422 rate {codes.get('422', 0) / n:.1%}, error rate {errors / n:.1%}"
+    )
+
+    # latency = queueing (before the app saw it) + app time; app = solve + rest
+    rows = {"latency": [r["latency"] for r in records]}
+    timed = [r for r in ok if r.get("server") is not None]
+    rows["queue"] = [r["latency"] - r["server"] for r in timed]
+    rows["app"] = [r["server"] for r in timed]
+    solved = [r for r in timed if r.get("solve") is not None]
+    rows["solve"] = [r["solve"] for r in solved]
+    rows["app - solve"] = [r["server"] - r["solve"] for r in solved]
+    print(f"{'seconds':<12} {'p50':>8} {'p95':>8} {'p99':>8} {'mean':>8} {'n':>6}")
+    for name, xs in rows.items():
+        if not xs:
+            continue
+        p50, p95, p99 = np.percentile(xs, [50, 95, 99])
+        print(
+            f"{name:<12} {p50:>8.3f} {p95:>8.3f} {p99:>8.3f} "
+            f"{np.mean(xs):>8.3f} {len(xs):>6}"
+        )
+
+
+# ---------- local server ----------
+def spawn(a) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--workers", str(a.spawn)]
+        + ["--port", str(a.port), "--log-level", "warning"]
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{a.url}/ready", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        if proc.poll() is not None:
+            break
+        time.sleep(0.2)
+    proc.terminate()
+    sys.exit("uvicorn did not come up")
+
+
+# ---------- main ----------
+def main():
+    a = parse_args()
+    if a.spawn:
+        a.url = f"http://127.0.0.1:{a.port}"
+    jobs = load_capture(a.capture, a) if a.capture else generate(a)
+    proc = spawn(a) if a.spawn else None
+    try:
+        t0 = time.perf_counter()
+        records = asyncio.run(run(a, jobs))
+        elapsed = time.perf_counter() - t0
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+    report(records, elapsed)
+    if a.output:
+        with open(a.output, "w") as f:
+            json.dump(records, f, indent=1)
+        print(f"wrote {len(records)} records to {a.output}")
+
+
+if __name__ == "__main__":
+    main()
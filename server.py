@@ -1,16 +1,95 @@
-from typing import List, Set, Tuple
-import uuid
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from collections import OrderedDict
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import asynccontextmanager, contextmanager, suppress
+from dataclasses import asdict, dataclass, field, replace
+from itertools import combinations
+from typing import (
+    Annotated,
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+)
+from contextvars import ContextVar
+import asyncio, hashlib, heapq, html, json, logging, math, multiprocessing, os
+import sqlite3, tempfile, threading, time, uuid
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.routing import APIRoute
+import numpy as np
+from pydantic import BaseModel, Field
+import pydantic.dataclasses
 from ortools.sat.python import cp_model
-from itertools import count
-from copy import deepcopy
+import msgpack
+import orjson
 
+SOLVE_TIME_LIMIT = 10  # seconds per CP-SAT solve, unless the request asks
+# server-side caps on per-request solver options
+MAX_TIME_LIMIT = float(os.environ.get("SCHEDULER_MAX_TIME_LIMIT", 60))
+CPU_CORES = int(os.environ.get("SCHEDULER_CPU_CORES", os.cpu_count() or 1))
+ROLLING_TASKS = 200  # tasks released per rolling window when ?window is not given
+# mode=coarse: without an exact common divisor, the scale makes the
+# COARSE_QUANTILE duration COARSE_UNITS coarse units long; refinement lets
+# every start move COARSE_RADIUS coarse units around the coarse plan
+COARSE_QUANTILE, COARSE_UNITS, COARSE_RADIUS = 0.25, 4, 2
+# model identical resources as one class once some class has this many members
+# (0 turns the aggregated formulation off)
+AGGREGATE_MIN_CLASS = int(os.environ.get("SCHEDULER_AGGREGATE_MIN_CLASS", 3))
+# symmetry breaking, redundant cumulatives and a makespan lower bound
+STRENGTHEN = os.environ.get("SCHEDULER_STRENGTHEN", "0") != "0"
+LB_SUBSET_TYPES = 6  # energy bounds over all type subsets up to this many types
 
-class Task(BaseModel):
+# async job API: solver processes, and how many jobs may wait behind them
+JOB_WORKERS = int(os.environ.get("SCHEDULER_JOB_WORKERS", os.cpu_count() or 1))
+JOB_QUEUE_DEPTH = int(os.environ.get("SCHEDULER_JOB_QUEUE_DEPTH", 2 * JOB_WORKERS))
+JOB_HISTORY = 1000  # finished jobs kept for polling
+BATCH_INFLIGHT = 2 * JOB_WORKERS  # batch instances parsed/solving at once
+
+# result cache: in-memory LRU, plus an SQLite tier when a path is configured
+CACHE_SIZE = int(os.environ.get("SCHEDULER_CACHE_SIZE", 256))
+CACHE_TTL = float(os.environ.get("SCHEDULER_CACHE_TTL", 3600))  # seconds
+CACHE_DB = os.environ.get("SCHEDULER_CACHE_DB")  # e.g. /data/cache.sqlite
+
+# schedule store: plans solved with ?store=true, queryable by resource and time
+STORE_DB = os.environ.get("SCHEDULER_STORE_DB", "schedules.sqlite")
+STORE_TTL = float(os.environ.get("SCHEDULER_STORE_TTL", 30 * 86400))  # seconds
+STORE_PAGE, STORE_MAX_PAGE = 1000, 10000  # assignments per page: default, cap
+
+# coordinator mode (mode=distributed): peer solver base URLs, comma-separated;
+# requests in flight per peer; retries of a failed subproblem on other peers
+PEERS = [
+    u.strip().rstrip("/") for u in os.environ.get("SCHEDULER_PEERS", "").split(",")
+]
+PEERS = [u for u in PEERS if u]
+PEER_CONCURRENCY = int(os.environ.get("SCHEDULER_PEER_CONCURRENCY", 2))
+PEER_RETRIES = int(os.environ.get("SCHEDULER_PEER_RETRIES", 2))
+PEER_SLACK = 10.0  # seconds on top of the time limit for transfer and parsing
+PEER_FALLBACK_SHARE = 0.3  # of time_limit, kept back for a split=time fallback
+
+# startup: /ready answers 503 until a tiny solve has primed the native code
+# paths (SCHEDULER_WARMUP=0 skips it); prefork workers of `python server.py`
+WARMUP = os.environ.get("SCHEDULER_WARMUP", "1") != "0"
+WEB_WORKERS = int(os.environ.get("WEB_CONCURRENCY", 1))
+
+# per-entity request logging is DEBUG; off (and free) by default
+log = logging.getLogger("scheduler")
+log.setLevel(os.environ.get("SCHEDULER_LOG_LEVEL", "INFO").upper())
+log.addHandler(logging.StreamHandler())
+
+
+# tasks are the bulk of a request: a slots record validates about twice as
+# fast as a BaseModel and takes a fraction of the memory
+@pydantic.dataclasses.dataclass(slots=True)
+class Task:
     id: str
     type: str
-    duration: int
+    duration: Annotated[int, Field(ge=0)]  # one rule for every engine
     earliest_start: int
     deadline: int
 
@@ -49,190 +128,938 @@ class ScheduleRequestBW(BaseModel):
     tasks: List[Task]
 
 
-app = FastAPI()
+@pydantic.dataclasses.dataclass(slots=True)  # plans can be 100k rows long
+class Assignment:
+    task_id: str
+    worker_id: str
+    machine_id: str
+    start: int
+    end: int
+
+
+class RescheduleRequest(ScheduleRequestBW):
+    previous_assignments: List[Assignment]
+    freeze_before: Optional[int] = None  # tasks starting earlier keep their slot
+    frozen: List[str] = []  # task ids that keep their slot regardless
+    time_limit: float = Field(2.0, gt=0)  # seconds, capped at MAX_TIME_LIMIT
+
+
+class InsertRequest(ScheduleRequestBW):
+    previous_assignments: List[Assignment]  # the current plan for `tasks`
+    new_tasks: List[Task]
+    time_limit: float = Field(2.0, gt=0)  # neighbourhood re-solve, capped
+
+
+class ValidateRequest(ScheduleRequestBW):
+    assignments: List[Assignment]
+
+
+class GanttRequest(BaseModel):
+    assignments: List[Assignment]
+
+
+class PoolSpec(BaseModel):
+    workers: List[WorkerBW] = []
+    machines: List[MachineBW] = []
+
+
+class PoolPatch(PoolSpec):
+    # listed resources replace those with the same id or are appended
+    remove_workers: List[str] = []
+    remove_machines: List[str] = []
+
+
+class PoolTasks(BaseModel):
+    tasks: List[Task]
+    version: Optional[int] = None  # 409 unless the pool is at this version
+
+
+# ---------- metrics: Prometheus text format ----------
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
 
 
-# ---------- helper: convert busy windows → dummy tasks ----------
-def inject_busy_tasks(req: ScheduleRequestBW) -> tuple[ScheduleRequest, set[int]]:
+class Metrics:
     """
-    Replace every busy window with a unique dummy task that ties up BOTH
-    resources. Return the converted ScheduleRequest and the set of dummy task IDs.
+    Minimal thread-safe registry of counters, gauges and histograms rendered
+    in the Prometheus text exposition format. Series are keyed by name and
+    label set; metrics from pool processes (jobs, batch) are not collected.
     """
-    req2 = deepcopy(req)
 
-    # next_task_id = 1 + max((t.id for t in req2.tasks), default=0)
-    # max_worker_id = max((w.id for w in req2.workers), default=0)
-    # max_machine_id = max((m.id for m in req2.machines), default=0)
-    # next_dummy_worker = count(max_worker_id + 1)  # fresh IDs
-    # next_dummy_machine = count(max_machine_id + 1)
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.kind: Dict[str, str] = {}
+        self.values: Dict[str, Dict[Tuple, Any]] = {}
 
-    dummy_ids: set[int] = set()
-    dummy_prefix = "_BW_"  # only for the *type* name
+    def _series(self, kind: str, name: str, labels: Dict[str, str], init):
+        self.kind.setdefault(name, kind)
+        key = tuple(sorted(labels.items()))
+        series = self.values.setdefault(name, {})
+        if key not in series:
+            series[key] = init()
+        return series, key
 
-    # — worker busy → dummy task + placeholder machine —
-    for w in req2.workers:
-        for idx, (s, e) in enumerate(w.busy_windows):
-            ttype = f"{dummy_prefix}W{w.id}_{idx}"
-            w.types.add(ttype)  # lock the real worker
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        with self.lock:
+            series, key = self._series("counter", name, labels, float)
+            series[key] += value
 
-            # phantom machine with unique ID
-            ph_mid = f"ph_m_{uuid.uuid4().hex}"
-            req2.machines.append(MachineBW(id=ph_mid, types={ttype}, busy_windows=[]))
+    def set(self, name: str, value: float, **labels) -> None:
+        with self.lock:
+            series, key = self._series("gauge", name, labels, float)
+            series[key] = value
 
-            # dummy task with unique ID
-            dummy_task_id = f"dummy_{uuid.uuid4().hex}"
-            req2.tasks.append(
-                Task(
-                    id=dummy_task_id,
-                    type=ttype,
-                    duration=e - s,
-                    earliest_start=s,
-                    deadline=e,
-                )
+    def observe(self, name: str, value: float, **labels) -> None:
+        with self.lock:
+            series, key = self._series(
+                "histogram", name, labels, lambda: [[0] * len(LATENCY_BUCKETS), 0.0, 0]
             )
-            dummy_ids.add(dummy_task_id)
-
-    # — machine busy → dummy task + placeholder worker —
-    for m in req2.machines:
-        for idx, (s, e) in enumerate(m.busy_windows):
-            ttype = f"{dummy_prefix}M{m.id}_{idx}"
-            m.types.add(ttype)  # lock the real machine
-
-            # phantom worker with unique ID
-            ph_wid = f"ph_w_{uuid.uuid4().hex}"
-            req2.workers.append(WorkerBW(id=ph_wid, types={ttype}, busy_windows=[]))
-
-            # dummy task with unique ID
-            dummy_task_id = f"dummy_{uuid.uuid4().hex}"
-            req2.tasks.append(
-                Task(
-                    id=dummy_task_id,
-                    type=ttype,
-                    duration=e - s,
-                    earliest_start=s,
-                    deadline=e,
-                )
+            h = series[key]
+            i = bisect_left(LATENCY_BUCKETS, value)  # first bucket with le >= value
+            if i < len(LATENCY_BUCKETS):
+                h[0][i] += 1
+            h[1] += value
+            h[2] += 1
+
+    def render(self) -> str:
+        def fmt(labels, extra=()):
+            items = [*labels, *extra]
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+        out = []
+        with self.lock:
+            for name, series in sorted(self.values.items()):
+                kind = self.kind[name]
+                out.append(f"# TYPE {name} {kind}")
+                for labels, v in series.items():
+                    if kind != "histogram":
+                        out.append(f"{name}{fmt(labels)} {v}")
+                        continue
+                    counts, total, n = v
+                    cumulative = 0
+                    for le, c in zip(LATENCY_BUCKETS, counts):
+                        cumulative += c
+                        out.append(
+                            f"{name}_bucket{fmt(labels, [('le', le)])} {cumulative}"
+                        )
+                    out.append(f"{name}_bucket{fmt(labels, [('le', '+Inf')])} {n}")
+                    out.append(f"{name}_sum{fmt(labels)} {total}")
+                    out.append(f"{name}_count{fmt(labels)} {n}")
+        return "\n".join(out) + "\n"
+
+
+metrics = Metrics()
+_request_t0: ContextVar[float] = ContextVar("request_t0", default=0.0)
+
+
+@contextmanager
+def span(name: str):
+    """Time a hot-path stage into scheduler_span_seconds{span=name}."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe("scheduler_span_seconds", time.perf_counter() - t0, span=name)
+
+
+def mark_parsed() -> None:
+    """Called first thing in a handler: time spent routing + validating."""
+    t0 = _request_t0.get()
+    if t0:
+        metrics.observe(
+            "scheduler_span_seconds", time.perf_counter() - t0, span="parse"
+        )
+
+
+class MetricsMiddleware:
+    """
+    Per-endpoint latency histogram and request counter (pure ASGI). Every
+    response carries `Server-Timing: app;dur=<ms>`, the time from entering
+    the app to the response start, so clients can tell it from queueing.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        t0 = time.perf_counter()
+        token = _request_t0.set(t0)
+        code = 500
+
+        async def send_status(message):
+            nonlocal code
+            if message["type"] == "http.response.start":
+                code = message["status"]
+                dur = f"app;dur={(time.perf_counter() - t0) * 1000:.1f}"
+                headers = [
+                    *message.get("headers", ()),
+                    (b"server-timing", dur.encode()),
+                ]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            _request_t0.reset(token)
+            endpoint = getattr(scope.get("route"), "path", "unmatched")
+            metrics.observe(
+                "scheduler_request_seconds", time.perf_counter() - t0, endpoint=endpoint
             )
-            dummy_ids.add(dummy_task_id)
+            metrics.inc("scheduler_requests_total", endpoint=endpoint, code=code)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if not ready.is_set():  # prefork children inherit a warm, ready parent
+        asyncio.get_running_loop().run_in_executor(None, warm_up)
+    yield
+    jobs.shutdown()
+    cluster.close()
+    if _batch_pool is not None:
+        _batch_pool.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+
+
+# ---------- wire formats: JSON (via orjson) and msgpack ----------
+MSGPACK = "application/msgpack"
+
+
+def dumps(content: Any) -> bytes:
+    """The JSON document JSONResponse would render, via orjson."""
+    return orjson.dumps(content)
+
+
+class WireRequest(Request):
+    """Request whose body decodes with orjson, or was decoded from msgpack."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            body = await self.body()
+            self._json = orjson.loads(body)
+        return self._json
+
+
+class WireRoute(APIRoute):
+    """
+    Accept `Content-Type: application/msgpack` bodies wherever a JSON body is
+    expected: the body is decoded here and
+    handed to FastAPI's validation as if it had been JSON.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def route(request: Request) -> Response:
+            ctype = request.headers.get("content-type", "")
+            if ctype.split(";")[0].strip().lower() != MSGPACK:
+                return await handler(WireRequest(request.scope, request.receive))
+            headers = [
+                (k, b"application/json") if k == b"content-type" else (k, v)
+                for k, v in request.scope["headers"]
+            ]
+            wire = WireRequest({**request.scope, "headers": headers}, request.receive)
+            try:
+                wire._json = msgpack.unpackb(await wire.body())
+            except Exception:
+                raise HTTPException(422, "Invalid msgpack body")
+            return await handler(wire)
+
+        return route
+
+
+app.router.route_class = WireRoute
+
 
-    # cast back to basic models (busy_windows removed for solver)
-    workers_clean = [Worker(id=w.id, types=w.types) for w in req2.workers]
-    machines_clean = [Machine(id=m.id, types=m.types) for m in req2.machines]
-    return (
-        ScheduleRequest(
-            workers=workers_clean, machines=machines_clean, tasks=req2.tasks
-        ),
-        dummy_ids,
+def encode_response(
+    request: Request, content: Any, response: Optional[Response] = None
+) -> Response:
+    """
+    Render a handler result without FastAPI's jsonable_encoder pass: msgpack
+    when the client accepts it, JSON otherwise.
+    Headers set on the handler's `response` parameter carry over.
+    """
+    with span("encode"):
+        if MSGPACK in request.headers.get("accept", ""):
+            out = Response(msgpack.packb(content), media_type=MSGPACK)
+        else:
+            out = Response(dumps(content), media_type="application/json")
+    if response is not None:
+        for k, v in response.headers.items():
+            if k != "content-length":
+                out.headers[k] = v
+    return out
+
+
+# ---------- solver options and core sharing ----------
+SolveMode = Literal["cp-sat", "heuristic", "rolling", "coarse", "distributed"]
+
+
+@dataclass
+class SolveOptions:
+    time_limit: float = SOLVE_TIME_LIMIT  # seconds
+    num_workers: int = 0  # CP-SAT search threads; 0 → a fair share of the cores
+    relative_gap: float = 0.0  # stop once (makespan - bound) / makespan <= this
+    absolute_gap: float = 0.0  # stop once makespan - bound <= this
+    seed: Optional[int] = None  # reproducible search with num_workers=1
+    # mode=rolling: window length and how much of it is re-planned next time
+    window: Optional[int] = None
+    overlap: Optional[int] = None
+    # mode=coarse: time units per coarse unit (None → coarse_scale())
+    scale: Optional[int] = None
+    # mode=distributed: cut by type-connected component or by time slice
+    # (`window` tasks per slice; None → one slice per peer request slot)
+    split: Literal["components", "time"] = "components"
+
+    def apply(self, solver: cp_model.CpSolver, deadline: float) -> None:
+        solver.parameters.max_time_in_seconds = max(0.0, deadline - time.monotonic())
+        solver.parameters.num_workers = self.num_workers  # 0 → CP-SAT default
+        solver.parameters.relative_gap_limit = self.relative_gap
+        solver.parameters.absolute_gap_limit = self.absolute_gap
+        if self.seed is not None:
+            solver.parameters.random_seed = self.seed
+
+
+def solve_options(
+    time_limit: float = Query(SOLVE_TIME_LIMIT, gt=0),
+    num_workers: int = Query(0, ge=0),
+    relative_gap: float = Query(0.0, ge=0),
+    absolute_gap: float = Query(0.0, ge=0),
+    seed: Optional[int] = None,
+    window: Optional[int] = Query(None, gt=0),
+    overlap: Optional[int] = Query(None, ge=0),
+    scale: Optional[int] = Query(None, ge=1),
+    split: Literal["components", "time"] = "components",
+) -> SolveOptions:
+    """Query parameters of the solve endpoints, clamped to the server caps."""
+    return SolveOptions(
+        min(time_limit, MAX_TIME_LIMIT),
+        min(num_workers, CPU_CORES),
+        relative_gap,
+        absolute_gap,
+        seed,
+        window,
+        overlap,
+        scale,
+        split,
     )
 
 
-@app.post("/schedule_with_busy")
-def schedule_with_busy(req: ScheduleRequestBW):
-    converted, dummy_ids = inject_busy_tasks(req)
-    result = schedule(converted)  # reuse existing solver
+class CoreBudget:
+    """
+    Shares the cores among concurrent solves: each lease gets what it asks
+    for (0 = as many as possible), but at most an equal share among the
+    solves running, at most the cores still free, and at least one.
+    """
+
+    def __init__(self, total: int):
+        self.total, self.used, self.active = total, 0, 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def lease(self, want: int = 0):
+        with self.lock:
+            share = self.total // (self.active + 1)
+            grant = max(1, min(want or self.total, share, self.total - self.used))
+            self.used += grant
+            self.active += 1
+        try:
+            yield grant
+        finally:
+            with self.lock:
+                self.used -= grant
+                self.active -= 1
+
+
+cores = CoreBudget(CPU_CORES)
 
-    real_plan = [
-        a for a in result["assignments"] if a["task_id"] not in dummy_ids
-    ]  # drop placeholders
-    real_makespan = max((a["end"] for a in real_plan), default=0)
-    return {"makespan": real_makespan, "assignments": real_plan}
+
+def anytime_fields(status: str, makespan: int, bound: int, wall_time: float):
+    """Solve status, best bound, relative gap and wall time of a plan."""
+    return {
+        "solve_status": status,
+        "bound": bound,
+        "gap": round((makespan - bound) / max(1, makespan), 6),
+        "wall_time": round(wall_time, 3),
+    }
+
+
+@app.get("/metrics")
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# ---------- helper: busy windows → fixed intervals ----------
+def merge_busy_windows(windows: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Sort the busy windows of one resource and merge overlapping or touching
+    ones, so they never clash with each other inside the resource's NoOverlap.
+    Empty windows (end <= start) block nothing and are dropped.
+    """
+    merged: List[Tuple[int, int]] = []
+    for s, e in sorted(w for w in windows if w[1] > w[0]):
+        if merged and s <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+        else:
+            merged.append((s, e))
+    return merged
+
+
+def busy_maps(req: ScheduleRequestBW):
+    """Merged busy windows per worker id and per machine id."""
+    worker_busy = {w.id: merge_busy_windows(w.busy_windows) for w in req.workers}
+    machine_busy = {m.id: merge_busy_windows(m.busy_windows) for m in req.machines}
+    return worker_busy, machine_busy
+
+
+@app.post("/schedule_with_busy")
+def schedule_with_busy(
+    req: ScheduleRequestBW,
+    request: Request,
+    response: Response,
+    cache_control: Optional[str] = Header(None),
+    mode: SolveMode = "cp-sat",
+    options: SolveOptions = Depends(solve_options),
+    store: bool = False,
+):
+    mark_parsed()
+    with span("busy_windows"):
+        busy = busy_maps(req)
+    result = cached_solve(req, *busy, response, cache_control, mode, options)
+    return encode_response(request, keep(result, store), response)
 
 
 @app.post("/schedule")
-def schedule(req: ScheduleRequest):
-    # log
+def schedule(
+    req: ScheduleRequest,
+    request: Request,
+    response: Response,
+    cache_control: Optional[str] = Header(None),
+    mode: SolveMode = "cp-sat",
+    options: SolveOptions = Depends(solve_options),
+    store: bool = False,
+):
+    mark_parsed()
+    result = cached_solve(req, {}, {}, response, cache_control, mode, options)
+    return encode_response(request, keep(result, store), response)
+
+
+def eligibility_index(resources) -> Dict[str, List[str]]:
+    """Map every task type to the ids of the resources that can serve it."""
+    if isinstance(resources, Roster):
+        return resources.by_type
+    index: Dict[str, List[str]] = {}
+    for r in resources:
+        for ttype in r.types:
+            index.setdefault(ttype, []).append(r.id)
+    return index
+
+
+def resource_classes(
+    resources, busy: Dict[str, List[Tuple[int, int]]]
+) -> Dict[str, List[str]]:
+    """
+    Group interchangeable resources: same type set and same busy windows.
+    Returns first member id → all member ids, in request order.
+    """
+    if isinstance(resources, Roster) and busy is resources.busy:
+        return resources.classes
+    groups: Dict[tuple, List[str]] = {}
+    for r in resources:
+        key = (frozenset(r.types), tuple(busy.get(r.id, ())))
+        groups.setdefault(key, []).append(r.id)
+    return {ids[0]: ids for ids in groups.values()}
+
+
+@dataclass
+class ScheduleModel:
+    mdl: cp_model.CpModel
+    start: Dict[str, cp_model.IntVar]
+    # task id → {resource id: presence literal}, eligible pairs only
+    w_choose: Dict[str, Dict[str, cp_model.IntVar]]
+    m_choose: Dict[str, Dict[str, cp_model.IntVar]]
+    makespan: cp_model.IntVar
+    # model-size counters: bool_vars, intervals, no_overlaps, cumulatives
+    size: Dict[str, int] = field(default_factory=dict)
+    # aggregated classes (2+ members): the id used in *_choose → member ids
+    w_classes: Dict[str, List[str]] = field(default_factory=dict)
+    m_classes: Dict[str, List[str]] = field(default_factory=dict)
+    # interchangeable resources ordered by first use (see break_symmetry())
+    w_sym: List[List[str]] = field(default_factory=list)
+    m_sym: List[List[str]] = field(default_factory=list)
+
+
+def build_model(
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]] | None = None,
+    machine_busy: Dict[str, List[Tuple[int, int]]] | None = None,
+    bounds: Dict[str, Tuple[int, int]] | None = None,
+    aggregate: bool | None = None,
+    strengthen: bool = False,
+) -> ScheduleModel:
+    """
+    Build the CP-SAT model. Variables exist only for eligible (task, resource)
+    pairs, found through a type → resources index. Busy windows are given per
+    resource id and enter that resource's NoOverlap as fixed, always-present
+    intervals. `bounds` (task id → earliest, latest start, see precheck())
+    tighten the start domains and the makespan range.
+
+    With `aggregate`, interchangeable resources (see resource_classes()) are
+    one class with a Cumulative of capacity = class size instead of one
+    NoOverlap each, which removes the symmetry between members;
+    extract_plan() hands out member ids afterwards. None enables it when some
+    class has AGGREGATE_MIN_CLASS members.
+
+    `strengthen` raises the makespan's lower end to makespan_lower_bound()
+    and adds constraints that are implied by the model but help
+    propagation, see strengthen_model().
+    """
+    worker_busy = worker_busy or {}
+    machine_busy = machine_busy or {}
+    bounds = bounds or {}
+    w_groups = resource_classes(req.workers, worker_busy)
+    m_groups = resource_classes(req.machines, machine_busy)
+    if aggregate is None:
+        largest = max(map(len, [*w_groups.values(), *m_groups.values()]), default=0)
+        aggregate = 0 < AGGREGATE_MIN_CLASS <= largest
+    w_classes, m_classes = {}, {}
+    if aggregate:
+        w_classes = {k: v for k, v in w_groups.items() if len(v) > 1}
+        m_classes = {k: v for k, v in m_groups.items() if len(v) > 1}
+    # members other than the first are represented by it
+    w_hidden = {i for ids in w_classes.values() for i in ids[1:]}
+    m_hidden = {i for ids in m_classes.values() for i in ids[1:]}
+    w_index = eligibility_index(req.workers)  # a pool's is cached: filter a copy
+    m_index = eligibility_index(req.machines)
+    if w_hidden:
+        w_index = {
+            ty: [r for r in ids if r not in w_hidden] for ty, ids in w_index.items()
+        }
+    if m_hidden:
+        m_index = {
+            ty: [r for r in ids if r not in m_hidden] for ty, ids in m_index.items()
+        }
+
+    mdl = cp_model.CpModel()
+    window = {
+        t.id: bounds.get(t.id, (t.earliest_start, t.deadline - t.duration))
+        for t in req.tasks
+    }
+    horizon = max((window[t.id][1] + t.duration for t in req.tasks), default=0)
+    lower = max((window[t.id][0] + t.duration for t in req.tasks), default=0)
+
+    # per-resource (or per-class) interval lists, filled while walking the
+    # eligible pairs
+    w_intervals: Dict[str, list] = {r: [] for ids in w_index.values() for r in ids}
+    m_intervals: Dict[str, list] = {r: [] for ids in m_index.values() for r in ids}
+
+    start, w_choose, m_choose = {}, {}, {}
+    for t in req.tasks:
+        # start time per task (timing window is its domain)
+        st = start[t.id] = mdl.NewIntVar(*window[t.id], f"start_t{t.id}")
+
+        # presence booleans + optional intervals, eligible pairs only
+        for index, choose, intervals, tag in (
+            (w_index, w_choose, w_intervals, "w"),
+            (m_index, m_choose, m_intervals, "m"),
+        ):
+            lits = choose[t.id] = {}
+            for rid in index.get(t.type, ()):
+                lit = lits[rid] = mdl.NewBoolVar(f"{tag}_t{t.id}_{tag}{rid}")
+                intervals[rid].append(
+                    mdl.NewOptionalFixedSizeIntervalVar(
+                        st, t.duration, lit, f"int_t{t.id}_{tag}{rid}"
+                    )
+                )
+            # exactly one worker / machine (empty → infeasible)
+            mdl.AddExactlyOne(lits.values())
+
+    # no-overlap per resource, cumulative per class (busy windows are fixed
+    # intervals; in a class every member shares them, so they take it whole)
+    size = {"bool_vars": 0, "intervals": 0, "no_overlaps": 0, "cumulatives": 0}
+    for intervals, busy, classes, tag in (
+        (w_intervals, worker_busy, w_classes, "w"),
+        (m_intervals, machine_busy, m_classes, "m"),
+    ):
+        for rid, ivs in intervals.items():
+            size["bool_vars"] += len(ivs)
+            n_tasks = len(ivs)
+            ivs += [
+                mdl.NewFixedSizeIntervalVar(s, e - s, f"busy_{tag}{rid}_{i}")
+                for i, (s, e) in enumerate(busy.get(rid, []))
+            ]
+            size["intervals"] += len(ivs)
+            cap = len(classes.get(rid, ()))
+            if cap > 1:
+                demands = [1] * n_tasks + [cap] * (len(ivs) - n_tasks)
+                mdl.AddCumulative(ivs, demands, cap)
+                size["cumulatives"] += 1
+            elif len(ivs) > 1:
+                mdl.AddNoOverlap(ivs)
+                size["no_overlaps"] += 1
+
+    # minimise makespan
+    if strengthen:
+        lower = max(lower, makespan_lower_bound(req, worker_busy, machine_busy, window))
+        size["makespan_lower_bound"] = lower
+    makespan = mdl.NewIntVar(min(lower, horizon), horizon, "makespan")
+    if req.tasks:
+        mdl.AddMaxEquality(makespan, [start[t.id] + t.duration for t in req.tasks])
+    mdl.Minimize(makespan)
+
+    sm = ScheduleModel(
+        mdl, start, w_choose, m_choose, makespan, size, w_classes, m_classes
+    )
+    if strengthen:
+        # groups left after aggregation still have interchangeable members
+        sm.w_sym = [v for k, v in w_groups.items() if len(v) > 1 and k not in w_classes]
+        sm.m_sym = [v for k, v in m_groups.items() if len(v) > 1 and k not in m_classes]
+        strengthen_model(sm, req, worker_busy, machine_busy)
+    return sm
+
+
+# ---------- model strengthening ----------
+def strengthen_model(
+    sm: ScheduleModel,
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]],
+    machine_busy: Dict[str, List[Tuple[int, int]]],
+) -> None:
+    """
+    Implied constraints: none of them removes an optimal makespan.
+    - members of sm.w_sym / sm.m_sym groups are used in a fixed order;
+    - per type and resource kind, the tasks of that type never run more at
+      once than there are eligible resources that are not busy.
+    """
+    mdl = sm.mdl
+    sm.size["symmetry_breaks"] = sum(
+        break_symmetry(mdl, req.tasks, choose, groups, tag)
+        for choose, groups, tag in (
+            (sm.w_choose, sm.w_sym, "w"),
+            (sm.m_choose, sm.m_sym, "m"),
+        )
+    )
+
+    by_type: Dict[str, List[Task]] = {}
+    for t in req.tasks:
+        by_type.setdefault(t.type, []).append(t)
+    task_iv: Dict[str, cp_model.IntervalVar] = {}
+    sm.size["redundant_cumulatives"] = 0
+    for resources, busy, tag in (
+        (req.workers, worker_busy, "w"),
+        (req.machines, machine_busy, "m"),
+    ):
+        index = eligibility_index(resources)
+        for ttype, tasks in by_type.items():
+            pool = index.get(ttype, [])
+            if not pool or len(tasks) <= len(pool):
+                continue  # empty pools are infeasible anyway; small ones never bind
+            ivs = []
+            for t in tasks:
+                if t.id not in task_iv:
+                    task_iv[t.id] = mdl.NewFixedSizeIntervalVar(
+                        sm.start[t.id], t.duration, f"run_t{t.id}"
+                    )
+                ivs.append(task_iv[t.id])
+            ivs += [
+                mdl.NewFixedSizeIntervalVar(s, e - s, f"busy_{ttype}_{tag}{rid}_{i}")
+                for rid in pool
+                for i, (s, e) in enumerate(busy.get(rid, []))
+            ]
+            mdl.AddCumulative(ivs, [1] * len(ivs), len(pool))
+            sm.size["redundant_cumulatives"] += 1
+
+
+def break_symmetry(
+    mdl: cp_model.CpModel,
+    tasks: List[Task],
+    choose: Dict[str, Dict[str, cp_model.IntVar]],
+    groups: List[List[str]],
+    tag: str,
+) -> int:
+    """
+    Members of a group (same types, same busy windows) can swap their whole
+    schedules, so only keep the swap where they are first used in group
+    order: member k+1 may take a task only if member k took an earlier one
+    (tasks in request order). Returns the number of constraints added.
+    """
+    added = 0
+    for members in groups:
+        tids = [t.id for t in tasks if members[0] in choose[t.id]]
+        for prev, rid in zip(members, members[1:]):
+            used = None  # true iff `prev` took one of the tasks seen so far
+            for k, tid in enumerate(tids):
+                lit, x = choose[tid][rid], choose[tid][prev]
+                if used is None:
+                    mdl.Add(lit == 0)
+                else:
+                    mdl.AddImplication(lit, used)
+                added += 1
+                if used is None:
+                    used = x
+                elif k + 1 < len(tids):
+                    nxt = mdl.NewBoolVar(f"used_{tag}{prev}_t{tid}")
+                    mdl.AddBoolOr([used, x, nxt.Not()])
+                    mdl.AddImplication(used, nxt)
+                    mdl.AddImplication(x, nxt)
+                    used = nxt
+    return added
+
+
+def makespan_lower_bound(
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]],
+    machine_busy: Dict[str, List[Tuple[int, int]]],
+    window: Dict[str, Tuple[int, int]],
+) -> int:
+    """
+    The latest earliest end of any task, and per set of types and resource
+    kind an energy bound: the tasks of those types that cannot start before
+    `a` need their total duration of free time (capacity minus busy load) on
+    the resources eligible for any of the types, after `a`. Tried for every
+    distinct window start `a`, on single types, all types together and, with
+    at most LB_SUBSET_TYPES types, every subset.
+    """
+    lb = max((window[t.id][0] + t.duration for t in req.tasks), default=0)
+    by_type: Dict[str, List[Tuple[int, int]]] = {}
+    for t in req.tasks:
+        by_type.setdefault(t.type, []).append((window[t.id][0], t.duration))
+    types = sorted(by_type)
+    if len(types) <= LB_SUBSET_TYPES:
+        groups = [g for k in range(1, len(types) + 1) for g in combinations(types, k)]
+    else:
+        groups = [(ty,) for ty in types] + [tuple(types)]
+    for resources, busy in ((req.workers, worker_busy), (req.machines, machine_busy)):
+        index = eligibility_index(resources)
+        for group in groups:
+            pool = {rid for ty in group for rid in index.get(ty, ())}
+            if not pool:
+                continue
+            cap = len(pool)
+            windows = [w for rid in pool for w in busy.get(rid, ())]
+            rows = sorted((r for ty in group for r in by_type[ty]), reverse=True)
+            starts = np.array([a for a, _ in rows], dtype=np.int64)
+            work = np.cumsum([d for _, d in rows], dtype=np.int64)
+            # last row per start value: work of every task starting there or later
+            keep = np.r_[starts[:-1] != starts[1:], True]
+            a, need = starts[keep], work[keep]
+            # smallest end M with cap * (M - a) - busy(a, M) >= need
+            lo = a - (-need // cap)
+            hi = a + need + sum(e - s for s, e in windows)
+            while (lo < hi).any():
+                mid = (lo + hi) // 2
+                ok = cap * (mid - a) - busy_overlap(windows, a, mid) >= need
+                hi = np.where(ok, mid, hi)
+                lo = np.where(ok, lo, mid + 1)
+            lb = max(lb, int(lo.max()))
+    return lb
+
+
+def log_request(req: ScheduleRequest | ScheduleRequestBW) -> None:
+    if not log.isEnabledFor(logging.DEBUG):
+        return  # skip the per-entity formatting entirely
     for w in req.workers:
-        w.types = sorted(w.types)
-        print(f"Worker {w.id} types:  {', '.join(w.types)}")
+        log.debug(f"Worker {w.id} types:  {', '.join(sorted(w.types))}")
     for m in req.machines:
-        m.types = sorted(m.types)
-        print(f"Machine {m.id} types: {', '.join(m.types)}")
+        log.debug(f"Machine {m.id} types: {', '.join(sorted(m.types))}")
     for t in req.tasks:
-        print(
+        log.debug(
             f"Task {t.id}: {t.duration} units in [{t.earliest_start}, {t.deadline}],"
             f" type {t.type}"
         )
 
-    mdl = cp_model.CpModel()
-    horizon = max(t.deadline for t in req.tasks)
 
-    # start time per task
-    start = {
-        t.id: mdl.NewIntVar(t.earliest_start, t.deadline - t.duration, f"start_t{t.id}")
-        for t in req.tasks
-    }
+def split_components(req: ScheduleRequest | ScheduleRequestBW) -> list:
+    """
+    Split the instance into independent sub-instances: tasks, workers and
+    machines that no chain of shared types connects can never interact.
+    Resources whose types no task needs are dropped.
+    """
+    parent: Dict[str, str] = {}
+
+    def find(x: str) -> str:
+        while parent.setdefault(x, x) != x:
+            parent[x] = x = parent[parent[x]]
+        return x
+
+    for r in (*req.workers, *req.machines):
+        first, *rest = r.types or [None]
+        for ttype in rest:
+            parent[find(ttype)] = find(first)
 
-    # presence booleans
-    w_choose, m_choose = {}, {}
+    groups: Dict[str, Tuple[list, list, list]] = {}
     for t in req.tasks:
-        for w in req.workers:
-            key = (t.id, w.id)
-            w_choose[key] = mdl.NewBoolVar(f"w_t{t.id}_w{w.id}")
-            if t.type not in w.types:
-                mdl.Add(w_choose[key] == 0)
-        for m in req.machines:
-            key = (t.id, m.id)
-            m_choose[key] = mdl.NewBoolVar(f"m_t{t.id}_m{m.id}")
-            if t.type not in m.types:
-                mdl.Add(m_choose[key] == 0)
-
-        # exactly one worker & one machine
-        mdl.Add(sum(w_choose[(t.id, w.id)] for w in req.workers) == 1)
-        mdl.Add(sum(m_choose[(t.id, m.id)] for m in req.machines) == 1)
-
-        # timing windows
-        mdl.Add(start[t.id] + t.duration <= t.deadline)
-
-    # no-overlap per worker
-    for w in req.workers:
-        intervals = [
-            mdl.NewOptionalIntervalVar(
-                start[t.id],
-                t.duration,
-                start[t.id] + t.duration,
-                w_choose[(t.id, w.id)],
-                f"int_t{t.id}_w{w.id}",
-            )
-            for t in req.tasks
-            if t.type in w.types
-        ]
-        mdl.AddNoOverlap(intervals)
+        groups.setdefault(find(t.type), ([], [], []))[2].append(t)
+    for pos, resources in ((0, req.workers), (1, req.machines)):
+        for r in resources:
+            group = groups.get(find(next(iter(r.types)))) if r.types else None
+            if group is not None:
+                group[pos].append(r)
 
-    # no-overlap per machine
-    for m in req.machines:
-        intervals = [
-            mdl.NewOptionalIntervalVar(
-                start[t.id],
-                t.duration,
-                start[t.id] + t.duration,
-                m_choose[(t.id, m.id)],
-                f"int_t{t.id}_m{m.id}",
-            )
-            for t in req.tasks
-            if t.type in m.types
-        ]
-        mdl.AddNoOverlap(intervals)
+    return [
+        type(req).model_construct(workers=w, machines=m, tasks=t)
+        for w, m, t in groups.values()
+    ]
 
-    # minimise makespan
-    makespan = mdl.NewIntVar(0, horizon, "makespan")
-    mdl.AddMaxEquality(makespan, [start[t.id] + t.duration for t in req.tasks])
-    mdl.Minimize(makespan)
+
+def run_solve(
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]] | None = None,
+    machine_busy: Dict[str, List[Tuple[int, int]]] | None = None,
+    options: Optional[SolveOptions] = None,
+    pre: Optional["Precheck"] = None,
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Solve and return (status name, plan or None); the plan carries the
+    anytime_fields(). Independent components get their own model and are
+    solved concurrently (CP-SAT releases the GIL while searching), sharing
+    one deadline and the `options.num_workers` search threads (0 = all
+    cores). Runs precheck() unless the caller already did.
+    """
+    options = options or SolveOptions()
+    t0 = time.monotonic()
+    deadline = t0 + options.time_limit
+    if pre is None:
+        with span("precheck"):
+            pre = precheck(req, worker_busy, machine_busy)
+    if pre.reasons:
+        return "INFEASIBLE", None
+    parts = split_components(req)
+    if len(parts) <= 1:
+        status, result = solve_component(
+            req, worker_busy, machine_busy, deadline, options, None, pre.bounds
+        )
+        if result is not None:
+            bound = result.pop("bound")
+            wall_time = time.monotonic() - t0
+            result.update(anytime_fields(status, result["makespan"], bound, wall_time))
+        return status, result
+
+    ncpu = options.num_workers or CPU_CORES
+    parallel = min(len(parts), ncpu)
+    failed = threading.Event()
+    results: List[Tuple[str, Optional[Dict[str, Any]]]] = [("UNKNOWN", None)] * len(
+        parts
+    )
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        futures = {
+            pool.submit(
+                solve_component,
+                part,
+                worker_busy,
+                machine_busy,
+                deadline,
+                replace(options, num_workers=max(1, ncpu // parallel)),
+                failed,
+                pre.bounds,
+            ): i
+            for i, part in enumerate(parts)
+        }
+        for f in as_completed(futures):
+            results[futures[f]] = f.result()
+            if f.result()[1] is None:
+                failed.set()  # one infeasible part sinks the whole instance
+
+    failures = [s for s, r in results if r is None]
+    if failures:
+        return ("INFEASIBLE" if "INFEASIBLE" in failures else failures[0]), None
+    by_task = {a["task_id"]: a for _, r in results for a in r["assignments"]}
+    makespan = max(r["makespan"] for _, r in results)
+    bound = max(r["bound"] for _, r in results)  # the longest part decides
+    status = "OPTIMAL" if bound >= makespan else "FEASIBLE"
+    return status, {
+        "makespan": makespan,
+        "assignments": [by_task[t.id] for t in req.tasks],
+        "engine": "+".join(sorted({r["engine"] for _, r in results})),
+        **anytime_fields(status, makespan, bound, time.monotonic() - t0),
+    }
+
+
+def solve_component(
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]] | None,
+    machine_busy: Dict[str, List[Tuple[int, int]]] | None,
+    deadline: float,
+    options: SolveOptions,
+    failed: Optional[threading.Event] = None,
+    bounds: Dict[str, Tuple[int, int]] | None = None,
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Solve one component. The plan carries the best proven `bound`; the
+    status is OPTIMAL only when that bound meets the makespan (CP-SAT also
+    says OPTIMAL when it stops at a gap limit).
+    """
+    if failed is not None and failed.is_set():
+        return "UNKNOWN", None
+    with span("build"):
+        sm = build_model(req, worker_busy, machine_busy, bounds, strengthen=STRENGTHEN)
+    with span("heuristic"):
+        greedy = heuristic_plan(req, worker_busy, machine_busy)
+        if greedy is not None:
+            add_hint(sm, greedy)
 
     # solve
     solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = 10
-    if solver.Solve(mdl) not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-        raise HTTPException(422, "No feasible schedule")
+    options.apply(solver, deadline)
+    with span("solve"):
+        status = solver.Solve(sm.mdl)
+    record_solve(sm, solver, status)
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        with span("extract"):
+            plan = extract_plan(req, sm, solver)
+        bound = best_bound(sm, solver)
+        name = "OPTIMAL" if bound >= plan["makespan"] else "FEASIBLE"
+        return name, {**plan, "engine": "cp-sat", "bound": bound}
+    if status == cp_model.UNKNOWN and greedy is not None:
+        # out of time before a first solution: the greedy plan is still valid
+        bound = best_bound(sm, solver)
+        return "FEASIBLE", {**greedy, "engine": "heuristic", "bound": bound}
+    return solver.StatusName(status), None
+
 
+def best_bound(sm: ScheduleModel, solver: cp_model.CpSolver) -> int:
+    """Proven makespan lower bound: the solver's, or the model's own."""
+    low = sm.makespan.Proto().domain[0]
+    bound = solver.BestObjectiveBound()
+    return max(low, math.ceil(bound - 1e-6)) if math.isfinite(bound) else low
+
+
+def record_solve(sm: ScheduleModel, solver: cp_model.CpSolver, status) -> None:
+    """Model-size gauges and solver statistics of the latest solve."""
+    for k, v in sm.size.items():
+        metrics.set(f"scheduler_model_{k}", v)
+    metrics.inc("scheduler_solves_total", status=solver.StatusName(status))
+    metrics.observe("scheduler_solver_wall_seconds", solver.WallTime())
+    metrics.inc("scheduler_solver_branches_total", solver.NumBranches())
+    metrics.inc("scheduler_solver_conflicts_total", solver.NumConflicts())
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        obj, bound = solver.ObjectiveValue(), solver.BestObjectiveBound()
+        metrics.set("scheduler_solver_objective", obj)
+        metrics.set("scheduler_solver_bound", bound)
+        metrics.set("scheduler_solver_gap", (obj - bound) / max(1.0, abs(obj)))
+
+
+def extract_plan(req: ScheduleRequest | ScheduleRequestBW, sm: ScheduleModel, sol):
+    """
+    Read the schedule out of a solver or solution callback (both expose
+    Value / BooleanValue). Tasks booked on an aggregated class are spread
+    over its members by colour_classes().
+    """
     plan = []
     for t in req.tasks:
         w_id = next(
-            w.id for w in req.workers if solver.BooleanValue(w_choose[(t.id, w.id)])
+            rid for rid, lit in sm.w_choose[t.id].items() if sol.BooleanValue(lit)
         )
         m_id = next(
-            m.id for m in req.machines if solver.BooleanValue(m_choose[(t.id, m.id)])
+            rid for rid, lit in sm.m_choose[t.id].items() if sol.BooleanValue(lit)
         )
-        s = solver.Value(start[t.id])
+        s = sol.Value(sm.start[t.id])
         plan.append(
             {
                 "task_id": t.id,
@@ -243,4 +1070,2733 @@ def schedule(req: ScheduleRequest):
             }
         )
 
-    return {"makespan": solver.Value(makespan), "assignments": plan}
+    colour_classes(plan, sm.w_classes, "worker_id")
+    colour_classes(plan, sm.m_classes, "machine_id")
+    return {"makespan": sol.Value(sm.makespan), "assignments": plan}
+
+
+def colour_classes(
+    plan: List[Dict[str, Any]], classes: Dict[str, List[str]], key: str
+) -> None:
+    """
+    Interval colouring: walk each class's tasks by start time and give every
+    task the member that became free first. The class Cumulative keeps at
+    most `len(members)` tasks running at once, so that member is always free.
+    """
+    booked: Dict[str, list] = {}
+    for a in plan:
+        if a[key] in classes:
+            booked.setdefault(a[key], []).append(a)
+    for rid, rows in booked.items():
+        members = classes[rid]
+        free = [(0, i) for i in range(len(members))]  # (free from, member)
+        for a in sorted(rows, key=lambda a: a["start"]):
+            _, i = heapq.heappop(free)
+            a[key] = members[i]
+            heapq.heappush(free, (a["end"], i))
+
+
+# ---------- greedy heuristic: EDF list scheduling ----------
+class Timeline:
+    """Sorted, disjoint busy intervals of one resource."""
+
+    def __init__(self, busy: List[Tuple[int, int]] = ()):
+        self.starts = [s for s, _ in busy]
+        self.ends = [e for _, e in busy]
+
+    def earliest_fit(self, t: int, duration: int) -> int:
+        """First start >= t such that [start, start + duration) is free."""
+        i = bisect_right(self.ends, t)
+        while i < len(self.starts) and self.starts[i] < t + duration:
+            t = max(t, self.ends[i])
+            i += 1
+        return t
+
+    def latest_fit(self, end: int, duration: int) -> int:
+        """Last start with start + duration <= end and the slot free."""
+        s = end - duration
+        i = bisect_left(self.starts, s + duration) - 1
+        while i >= 0 and self.ends[i] > s:
+            s = min(s, self.starts[i] - duration)
+            i -= 1
+        return s
+
+    def book(self, s: int, e: int) -> None:
+        i = bisect_right(self.starts, s)
+        self.starts.insert(i, s)
+        self.ends.insert(i, e)
+
+
+def heuristic_plan(
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]] | None = None,
+    machine_busy: Dict[str, List[Tuple[int, int]]] | None = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Earliest-deadline-first list scheduling (see edf_pass()). Returns None
+    if some task misses its deadline.
+    """
+    placed, missed = edf_pass(req, worker_busy, machine_busy)
+    if missed:
+        return None
+    plan = [placed[t.id] for t in req.tasks]
+    return {"makespan": max((a["end"] for a in plan), default=0), "assignments": plan}
+
+
+def edf_pass(
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]] | None = None,
+    machine_busy: Dict[str, List[Tuple[int, int]]] | None = None,
+    stop: bool = True,
+) -> Tuple[Dict[str, Dict[str, Any]], List[Task]]:
+    """
+    Take tasks by deadline and put each on the eligible worker/machine pair
+    where it can start earliest (see earliest_pair()). Returns the placed
+    assignments by task id and the tasks that would miss their deadline;
+    with `stop`, the pass ends at the first of those.
+    """
+    worker_busy = worker_busy or {}
+    machine_busy = machine_busy or {}
+    w_index = eligibility_index(req.workers)
+    m_index = eligibility_index(req.machines)
+    w_line = {w.id: Timeline(worker_busy.get(w.id, [])) for w in req.workers}
+    m_line = {m.id: Timeline(machine_busy.get(m.id, [])) for m in req.machines}
+
+    tasks = req.tasks
+    dl = np.fromiter((t.deadline for t in tasks), np.int64, len(tasks))
+    es = np.fromiter((t.earliest_start for t in tasks), np.int64, len(tasks))
+    order = np.lexsort((es, dl))  # by deadline, then earliest start
+
+    placed: Dict[str, Dict[str, Any]] = {}
+    missed: List[Task] = []
+    for k in order.tolist():
+        t = tasks[k]
+        ws, ms = w_index.get(t.type, []), m_index.get(t.type, [])
+        s = math.inf
+        if ws and ms:
+            s, w_id, m_id = earliest_pair(t, ws, ms, w_line, m_line)
+        if s + t.duration > t.deadline:
+            missed.append(t)
+            if stop:
+                break
+            continue
+        w_line[w_id].book(s, s + t.duration)
+        m_line[m_id].book(s, s + t.duration)
+        placed[t.id] = {
+            "task_id": t.id,
+            "worker_id": w_id,
+            "machine_id": m_id,
+            "start": s,
+            "end": s + t.duration,
+        }
+    return placed, missed
+
+
+def earliest_pair(
+    t: Task,
+    ws: List[str],
+    ms: List[str],
+    w_line: Dict[str, Timeline],
+    m_line: Dict[str, Timeline],
+) -> Tuple[int, str, str]:
+    """
+    Earliest start of `t` on any pair of the eligible workers `ws` and
+    machines `ms`, and that pair. Pairs are tried in order of the vectorised
+    lower bound max(worker fit, machine fit); the scan stops once no pair
+    can beat the best start found.
+    """
+    ew = np.array([w_line[w].earliest_fit(t.earliest_start, t.duration) for w in ws])
+    em = np.array([m_line[m].earliest_fit(t.earliest_start, t.duration) for m in ms])
+    lb = np.maximum.outer(ew, em).ravel()
+    best = None
+    for p in np.argsort(lb, kind="stable"):
+        if best is not None and lb[p] >= best[0]:
+            break
+        wl, ml = w_line[ws[p // len(ms)]], m_line[ms[p % len(ms)]]
+        s = int(lb[p])
+        while True:  # alternate until both resources are free
+            s2 = ml.earliest_fit(wl.earliest_fit(s, t.duration), t.duration)
+            if s2 == s:
+                break
+            s = s2
+        if best is None or s < best[0]:
+            best = (s, p)
+    s, p = best
+    return s, ws[p // len(ms)], ms[p % len(ms)]
+
+
+def add_hint(sm: ScheduleModel, plan: Dict[str, Any]) -> None:
+    """Warm-start CP-SAT from a complete plan."""
+    # member id → the class id its literals live under
+    w_rep, m_rep = (
+        {m: rid for rid, members in classes.items() for m in members}
+        for classes in (sm.w_classes, sm.m_classes)
+    )
+    # swap interchangeable members into the order break_symmetry() allows
+    for rename, groups, key in (
+        (w_rep, sm.w_sym, "worker_id"),
+        (m_rep, sm.m_sym, "machine_id"),
+    ):
+        for members in groups:
+            group = set(members)
+            used = dict.fromkeys(a[key] for a in plan["assignments"] if a[key] in group)
+            order = [*used, *(m for m in members if m not in used)]
+            rename.update(zip(order, members))
+    for a in plan["assignments"]:
+        tid = a["task_id"]
+        sm.mdl.AddHint(sm.start[tid], a["start"])
+        for choose, rid in (
+            (sm.w_choose, w_rep.get(a["worker_id"], a["worker_id"])),
+            (sm.m_choose, m_rep.get(a["machine_id"], a["machine_id"])),
+        ):
+            for r, lit in choose[tid].items():
+                sm.mdl.AddHint(lit, r == rid)
+    sm.mdl.AddHint(sm.makespan, plan["makespan"])
+
+
+# ---------- pre-solve checks ----------
+@dataclass
+class Precheck:
+    # why the instance cannot be scheduled; empty when no check fired
+    reasons: List[Dict[str, Any]]
+    # task id → (earliest, latest) start that some eligible resource allows
+    bounds: Dict[str, Tuple[int, int]]
+
+    def error(self) -> HTTPException:
+        return HTTPException(
+            422, {"message": "No feasible schedule", "reasons": self.reasons}
+        )
+
+
+class TaskColumns:
+    """
+    The task list as numpy columns, with types interned to integer codes:
+    task k has type `types[tc[k]]`, and `code` maps a type to its code.
+    """
+
+    __slots__ = ("ids", "types", "code", "tc", "dur", "es", "dl")
+
+    def __init__(self, tasks: List[Task]):
+        n = len(tasks)
+        self.types = sorted({t.type for t in tasks})
+        self.code = {ty: i for i, ty in enumerate(self.types)}
+        self.tc = np.fromiter((self.code[t.type] for t in tasks), np.int64, n)
+        self.dur = np.fromiter((t.duration for t in tasks), np.int64, n)
+        self.es = np.fromiter((t.earliest_start for t in tasks), np.int64, n)
+        self.dl = np.fromiter((t.deadline for t in tasks), np.int64, n)
+        self.ids = np.array([t.id for t in tasks], dtype=object)
+
+
+def busy_overlap(busy: List[Tuple[int, int]], lo, hi) -> np.ndarray:
+    """Busy time of one resource inside each window [lo[i], hi[i])."""
+    if not busy:
+        return np.zeros_like(lo)
+    b = np.asarray(busy, dtype=np.int64)
+    s = np.maximum(b[:, 0][None, :], lo[:, None])
+    e = np.minimum(b[:, 1][None, :], hi[:, None])
+    return np.clip(e - s, 0, None).sum(axis=1)
+
+
+def precheck(
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]] | None = None,
+    machine_busy: Dict[str, List[Tuple[int, int]]] | None = None,
+) -> Precheck:
+    """
+    Cheap necessary conditions, checked before any model is built:
+    - every task type has an eligible worker and an eligible machine;
+    - every task fits its own window (duration <= deadline - earliest_start);
+    - per type and resource kind, total work fits into the free time of the
+      eligible resources within the type's overall window;
+    - every task has a free slot on some eligible worker and some eligible
+      machine, given their busy windows.
+    The last check also yields each task's tightest start bounds.
+    """
+    worker_busy = worker_busy or {}
+    machine_busy = machine_busy or {}
+    tasks = req.tasks
+    if not tasks:
+        return Precheck([], {})
+    w_index = eligibility_index(req.workers)
+    m_index = eligibility_index(req.machines)
+
+    cols = TaskColumns(tasks)
+    types, code, tc, ids = cols.types, cols.code, cols.tc, cols.ids
+    dur, es, dl = cols.dur, cols.es, cols.dl
+    reasons: List[Dict[str, Any]] = []
+
+    # 1. eligibility
+    for kind, index in (("worker", w_index), ("machine", m_index)):
+        for ty in types:
+            if not index.get(ty):
+                reasons.append(
+                    {
+                        "check": f"no_eligible_{kind}",
+                        "type": ty,
+                        "task_ids": ids[tc == code[ty]].tolist(),
+                    }
+                )
+
+    # 2. own window
+    short = dur > dl - es
+    if short.any():
+        reasons.append({"check": "window_too_short", "task_ids": ids[short].tolist()})
+
+    # 3. energy per type and resource kind
+    work = np.bincount(tc, weights=dur, minlength=len(types)).astype(np.int64)
+    lo = np.full(len(types), np.iinfo(np.int64).max)
+    hi = np.full(len(types), np.iinfo(np.int64).min)
+    np.minimum.at(lo, tc, es)
+    np.maximum.at(hi, tc, dl)
+    for kind, index, busy in (
+        ("worker", w_index, worker_busy),
+        ("machine", m_index, machine_busy),
+    ):
+        eligible = [index.get(ty, []) for ty in types]
+        capacity = np.array([len(rs) for rs in eligible]) * (hi - lo)
+        for rid in {rid for rs in eligible for rid in rs if busy.get(rid)}:
+            mask = np.array([rid in rs for rs in eligible])
+            capacity[mask] -= busy_overlap(busy[rid], lo[mask], hi[mask])
+        for i in np.flatnonzero((work > capacity) & (capacity >= 0)):
+            if not eligible[i]:
+                continue  # already reported by check 1
+            reasons.append(
+                {
+                    "check": f"{kind}_capacity",
+                    "type": types[i],
+                    "work": int(work[i]),
+                    "capacity": int(capacity[i]),
+                    "resources": eligible[i],
+                    "task_ids": ids[tc == i].tolist(),
+                }
+            )
+    if reasons:
+        return Precheck(reasons, {})
+
+    # 4. free slot per task → start bounds
+    es_l, dur_l, dl_l = es.tolist(), dur.tolist(), dl.tolist()
+    first = es.copy()
+    last = dl - dur
+    for kind, index, busy in (
+        ("worker", w_index, worker_busy),
+        ("machine", m_index, machine_busy),
+    ):
+        lines = {rid: Timeline(b) for rid, b in busy.items() if b}
+        for ty in types:
+            rids = index[ty]
+            if any(rid not in lines for rid in rids):
+                continue  # some eligible resource is never busy
+            for k in np.flatnonzero(tc == code[ty]).tolist():
+                e0, d0, l0 = es_l[k], dur_l[k], dl_l[k]
+                lo_k = hi_k = None  # loosest start bounds over eligible resources
+                for r in rids:
+                    a, b = lines[r].earliest_fit(e0, d0), lines[r].latest_fit(l0, d0)
+                    if a > b:
+                        continue
+                    lo_k = a if lo_k is None else min(lo_k, a)
+                    hi_k = b if hi_k is None else max(hi_k, b)
+                    if lo_k == e0 and hi_k == l0 - d0:
+                        break  # no resource can loosen the task's own window
+                if lo_k is None:
+                    reasons.append(
+                        {
+                            "check": f"no_free_{kind}",
+                            "type": ty,
+                            "resources": rids,
+                            "task_ids": [tasks[k].id],
+                        }
+                    )
+                    continue
+                first[k] = max(first[k], lo_k)
+                last[k] = min(last[k], hi_k)
+    if reasons:
+        return Precheck(reasons, {})
+    clash = first > last
+    if clash.any():
+        return Precheck(
+            [{"check": "no_common_free_slot", "task_ids": ids[clash].tolist()}], {}
+        )
+    return Precheck([], {t.id: (int(a), int(b)) for t, a, b in zip(tasks, first, last)})
+
+
+# ---------- rolling horizon ----------
+def rolling_solve(
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]],
+    machine_busy: Dict[str, List[Tuple[int, int]]],
+    options: Optional[SolveOptions] = None,
+    bounds: Dict[str, Tuple[int, int]] | None = None,
+) -> Dict[str, Any]:
+    """
+    Rolling horizon for long plans. Starting at the first release T, solve
+    the tasks released before T + window (plus those rolled over) with
+    run_solve(), commit the ones that start before the commit point
+    T + window - overlap, carry them forward as busy time and move T to the
+    commit point; the last window commits everything. `options.time_limit`
+    applies per window, so the total grows with the number of windows.
+
+    Commitments are final, so a later window can turn out infeasible even
+    when the whole instance is not; that window is reported with the 422.
+    The bound is the largest of the energy lower bound and the windows'
+    bounds (each given the commitments before it); a single window reports
+    its own.
+    """
+    options = options or SolveOptions()
+    t0 = time.monotonic()
+    tasks = sorted(req.tasks, key=lambda t: t.earliest_start)
+    window, overlap = options.window, options.overlap
+    if window is None:
+        spread = tasks[-1].earliest_start - tasks[0].earliest_start + 1 if tasks else 1
+        window = max(1, math.ceil(spread * ROLLING_TASKS / max(1, len(tasks))))
+    if overlap is None:
+        overlap = window // 4
+    if overlap >= window:
+        raise HTTPException(422, "overlap must be smaller than window")
+
+    # busy time per resource: own windows, then committed tasks (merged)
+    busy = {
+        "worker_id": {w.id: list(worker_busy.get(w.id, [])) for w in req.workers},
+        "machine_id": {m.id: list(machine_busy.get(m.id, [])) for m in req.machines},
+    }
+    placed: Dict[str, Dict[str, Any]] = {}
+    pending: List[Task] = []  # released, not committed yet
+    stats: List[Dict[str, Any]] = []
+    engines: Set[str] = set()
+    nxt, start = 0, tasks[0].earliest_start if tasks else 0
+    while nxt < len(tasks) or pending:
+        if not pending:
+            start = max(start, tasks[nxt].earliest_start)  # skip idle stretches
+        while nxt < len(tasks) and tasks[nxt].earliest_start < start + window:
+            pending.append(tasks[nxt])
+            nxt += 1
+        final = nxt == len(tasks)
+        commit = math.inf if final else start + window - overlap
+
+        # busy time that ends before every pending release can never matter
+        # again (later windows only release later tasks), so drop it for good
+        lo = min(t.earliest_start for t in pending)
+        for kind in busy.values():
+            for rid, b in kind.items():
+                if b and b[0][1] <= lo:
+                    kind[rid] = b[bisect_right(b, lo, key=lambda w: w[1]) :]
+        wb, mb = busy.values()
+        part = type(req).model_construct(
+            workers=req.workers, machines=req.machines, tasks=pending
+        )
+        status, result = run_solve(part, wb, mb, options)
+        if result is None:
+            raise HTTPException(
+                422,
+                {
+                    "message": "No feasible schedule",
+                    "window": len(stats),
+                    "start": start,
+                    "solve_status": status,
+                },
+            )
+
+        kept, touched = [], set()
+        for t, a in zip(pending, result["assignments"]):
+            if a["start"] >= commit:
+                kept.append(t)
+                continue
+            placed[t.id] = a
+            for key in busy:
+                busy[key][a[key]].append((a["start"], a["end"]))
+                touched.add((key, a[key]))
+        for key, rid in touched:
+            busy[key][rid] = merge_busy_windows(busy[key][rid])
+        engines.add(result["engine"])
+        stats.append(
+            {
+                "start": start,
+                "commit": None if final else commit,
+                "tasks": len(pending),
+                "committed": len(pending) - len(kept),
+                "makespan": result["makespan"],
+                **{k: result[k] for k in ("solve_status", "bound", "gap", "wall_time")},
+            }
+        )
+        pending, start = kept, commit
+
+    assignments = [placed[t.id] for t in req.tasks]
+    makespan = max((a["end"] for a in assignments), default=0)
+    if len(stats) == 1:  # one window is the whole instance: its bound is exact
+        bound = stats[0]["bound"]
+    else:
+        if bounds is None:
+            bounds = {
+                t.id: (t.earliest_start, t.deadline - t.duration) for t in req.tasks
+            }
+        # a window's bound holds given the commitments before it
+        lb = makespan_lower_bound(req, worker_busy, machine_busy, bounds)
+        bound = max([lb, *(w["bound"] for w in stats)])  # no windows: no tasks
+    status = "OPTIMAL" if bound >= makespan else "FEASIBLE"
+    return {
+        "makespan": makespan,
+        "assignments": assignments,
+        "engine": "+".join(sorted(engines)) or "cp-sat",
+        **anytime_fields(status, makespan, bound, time.monotonic() - t0),
+        "windows": stats,
+    }
+
+
+# ---------- time coarsening ----------
+def time_gcd(
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]],
+    machine_busy: Dict[str, List[Tuple[int, int]]],
+) -> int:
+    """Largest unit dividing every duration, release, deadline and busy bound."""
+    times = [x for t in req.tasks for x in (t.duration, t.earliest_start, t.deadline)]
+    for busy in (worker_busy, machine_busy):
+        times += [x for b in busy.values() for w in b for x in w]
+    return math.gcd(*times) or 1
+
+
+def coarse_scale(
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]],
+    machine_busy: Dict[str, List[Tuple[int, int]]],
+) -> Tuple[int, bool]:
+    """
+    (scale, exact): time_gcd() when it exceeds 1 (dividing by it loses
+    nothing), else a scale that keeps the COARSE_QUANTILE duration
+    COARSE_UNITS coarse units long.
+    """
+    g = time_gcd(req, worker_busy, machine_busy)
+    if g > 1:
+        return g, True
+    durations = [t.duration for t in req.tasks] or [1]
+    q = int(np.quantile(durations, COARSE_QUANTILE))
+    return max(1, q // COARSE_UNITS), False
+
+
+def coarsen(
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]],
+    machine_busy: Dict[str, List[Tuple[int, int]]],
+    scale: int,
+):
+    """
+    The instance in units of `scale`, rounded conservatively: durations,
+    releases and busy ends up, deadlines and busy starts down. Any coarse
+    plan, multiplied back, is feasible in the original units.
+    """
+    tasks = [
+        Task(
+            id=t.id,
+            type=t.type,
+            duration=-(-t.duration // scale),
+            earliest_start=-(-t.earliest_start // scale),
+            deadline=t.deadline // scale,
+        )
+        for t in req.tasks
+    ]
+    part = type(req).model_construct(
+        workers=req.workers, machines=req.machines, tasks=tasks
+    )
+    wb, mb = (
+        {
+            rid: merge_busy_windows([(s // scale, -(-e // scale)) for s, e in b])
+            for rid, b in busy.items()
+        }
+        for busy in (worker_busy, machine_busy)
+    )
+    return part, wb, mb
+
+
+def coarse_solve(
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]],
+    machine_busy: Dict[str, List[Tuple[int, int]]],
+    options: Optional[SolveOptions] = None,
+    bounds: Dict[str, Tuple[int, int]] | None = None,
+) -> Dict[str, Any]:
+    """
+    Solve on a coarser time grid, then refine. The coarse solve gets half
+    the time budget; its plan, multiplied back, is feasible as is. With an
+    exact scale that is the answer. Otherwise the rest of the budget goes to
+    the original model with every start limited to COARSE_RADIUS coarse
+    units around the coarse plan, hinted with it. If the coarse instance
+    has no schedule (rounding ate the slack), the original one is solved.
+    `bounds` are the precheck() start bounds of the original instance.
+    """
+    options = options or SolveOptions()
+    t0 = time.monotonic()
+    deadline = t0 + options.time_limit
+    bounds = bounds or {
+        t.id: (t.earliest_start, t.deadline - t.duration) for t in req.tasks
+    }
+    if options.scale is None:
+        scale, exact = coarse_scale(req, worker_busy, machine_busy)
+    else:
+        scale = options.scale
+        exact = time_gcd(req, worker_busy, machine_busy) % scale == 0
+
+    def finish(plan, status, bound, scale, coarse_makespan):
+        return {
+            **plan,
+            **anytime_fields(status, plan["makespan"], bound, time.monotonic() - t0),
+            "scale": scale,
+            "coarse_makespan": coarse_makespan,
+        }
+
+    coarse = None
+    if scale > 1:
+        part, wb, mb = coarsen(req, worker_busy, machine_busy, scale)
+        budget = options.time_limit if exact else options.time_limit / 2
+        _, coarse = run_solve(part, wb, mb, replace(options, time_limit=budget))
+    if coarse is None:
+        status, result = run_solve(
+            req,
+            worker_busy,
+            machine_busy,
+            replace(options, time_limit=deadline - time.monotonic()),
+        )
+        if result is None:
+            raise HTTPException(422, "No feasible schedule")
+        plan = {k: result[k] for k in ("makespan", "assignments", "engine")}
+        return finish(plan, status, result["bound"], 1, None)
+
+    dur = {t.id: t.duration for t in req.tasks}
+    assignments = [
+        {
+            **a,
+            "start": a["start"] * scale,
+            "end": a["start"] * scale + dur[a["task_id"]],
+        }
+        for a in coarse["assignments"]
+    ]
+    plan = {
+        "makespan": max((a["end"] for a in assignments), default=0),
+        "assignments": assignments,
+        "engine": coarse["engine"],
+    }
+    coarse_makespan = plan["makespan"]
+    bound = makespan_lower_bound(req, worker_busy, machine_busy, bounds)
+    if exact:
+        bound = max(bound, coarse["bound"] * scale)
+        status = "OPTIMAL" if bound >= plan["makespan"] else "FEASIBLE"
+        return finish(plan, status, bound, scale, coarse_makespan)
+
+    # refine in original units around the current plan until it stops moving
+    # (the narrowed model's own bound only holds near that plan)
+    radius = COARSE_RADIUS * scale
+    while time.monotonic() < deadline and plan["makespan"] > bound:
+        narrow = {
+            a["task_id"]: (
+                max(bounds[a["task_id"]][0], a["start"] - radius),
+                min(bounds[a["task_id"]][1], a["start"] + radius),
+            )
+            for a in plan["assignments"]
+        }
+        with span("build"):
+            sm = build_model(
+                req, worker_busy, machine_busy, narrow, strengthen=STRENGTHEN
+            )
+            add_hint(sm, plan)
+        solver = cp_model.CpSolver()
+        options.apply(solver, deadline)
+        with span("solve"):
+            status = solver.Solve(sm.mdl)
+        record_solve(sm, solver, status)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            break
+        refined = extract_plan(req, sm, solver)
+        if refined["makespan"] >= plan["makespan"]:
+            break
+        plan = {**refined, "engine": "cp-sat"}
+    status = "OPTIMAL" if bound >= plan["makespan"] else "FEASIBLE"
+    return finish(plan, status, bound, scale, coarse_makespan)
+
+
+# ---------- coordinator: subproblems on peer solver nodes ----------
+@dataclass
+class Peer:
+    url: str
+    slots: threading.BoundedSemaphore  # requests in flight on this node
+    inflight: int = 0  # including those waiting for a slot
+    failures: int = 0  # consecutive
+
+
+class Cluster:
+    """
+    The peer solver nodes of mode=distributed, behind one pooled HTTP client.
+    Each node takes at most `limit` requests at once; a call goes to the
+    least busy node, and one that fails (transport error, 429 or 5xx) is
+    retried on the least busy node not tried yet, up to `retries` times.
+    """
+
+    def __init__(self, urls: List[str], limit: int, retries: int):
+        self.peers = [Peer(u, threading.BoundedSemaphore(limit)) for u in urls]
+        self.limit, self.retries = limit, retries
+        self.lock = threading.Lock()
+        self._client: Optional["httpx.Client"] = None
+
+    def client(self) -> "httpx.Client":
+        import httpx  # imported here: most deployments are no coordinator
+
+        with self.lock:
+            if self._client is None:
+                n = len(self.peers) * self.limit
+                self._client = httpx.Client(
+                    limits=httpx.Limits(max_connections=n, max_keepalive_connections=n)
+                )
+            return self._client
+
+    def _pick(self, tried: List[Peer]) -> Peer:
+        with self.lock:
+            fresh = [p for p in self.peers if p not in tried] or self.peers
+            peer = min(fresh, key=lambda p: (p.failures > 0, p.inflight))
+            peer.inflight += 1
+            return peer
+
+    def post(
+        self, path: str, params: Dict[str, Any], body: bytes, deadline: float
+    ) -> Tuple[str, int, "httpx.Response"]:
+        """POST `body`; returns the node that answered, attempts and response."""
+        import httpx
+
+        tried: List[Peer] = []
+        error = ""
+        for attempt in range(self.retries + 1):
+            peer = self._pick(tried)
+            try:
+                with peer.slots:
+                    r = self.client().post(
+                        peer.url + path,
+                        params=params,
+                        content=body,
+                        headers={"content-type": "application/json"},
+                        timeout=max(0.0, deadline - time.monotonic()) + PEER_SLACK,
+                    )
+                if r.status_code < 500 and r.status_code != 429:
+                    with self.lock:
+                        peer.failures = 0
+                    return peer.url, attempt + 1, r
+                error = f"{peer.url}: HTTP {r.status_code}"
+            except httpx.TransportError as e:
+                error = f"{peer.url}: {e!r}"
+            finally:
+                with self.lock:
+                    peer.inflight -= 1
+            with self.lock:
+                peer.failures += 1
+            tried.append(peer)
+            metrics.inc("scheduler_peer_failures_total", peer=peer.url)
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(min(1.0, 0.1 * 2**attempt))
+        raise HTTPException(502, f"Solver peers failed, last: {error}")
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+
+
+cluster = Cluster(PEERS, PEER_CONCURRENCY, PEER_RETRIES)
+
+
+def subproblem(
+    part: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]],
+    machine_busy: Dict[str, List[Tuple[int, int]]],
+) -> bytes:
+    """The /schedule_with_busy body for `part` with these busy windows."""
+    return dumps(
+        {
+            "workers": [
+                {
+                    "id": r.id,
+                    "types": sorted(r.types),
+                    "busy_windows": worker_busy.get(r.id, []),
+                }
+                for r in part.workers
+            ],
+            "machines": [
+                {
+                    "id": r.id,
+                    "types": sorted(r.types),
+                    "busy_windows": machine_busy.get(r.id, []),
+                }
+                for r in part.machines
+            ],
+            "tasks": [asdict(t) for t in part.tasks],
+        }
+    )
+
+
+def time_slices(
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]],
+    machine_busy: Dict[str, List[Tuple[int, int]]],
+    size: int,
+) -> Tuple[List[bytes], List[int], List[Task]]:
+    """
+    Cut the time axis at earliest starts, about `size` tasks per slice. Each
+    task goes to the first slice, from the one holding its earliest start,
+    that it fits in once its window is clipped to the slice; then no two
+    slices can compete for a resource. A slice keeps the tasks an EDF pass
+    (edf_pass()) fits into it, so each slice has a feasible plan; the rest
+    move on to the next slice they fit in. Returns the slice bodies, their
+    task counts, and the tasks that fit in no single slice.
+    """
+    tasks = sorted(req.tasks, key=lambda t: t.earliest_start)
+    cuts = sorted({tasks[i].earliest_start for i in range(size, len(tasks), size)})
+    edges = [-math.inf, *cuts, math.inf]
+    slices: List[Dict[str, Task]] = [{} for _ in range(len(edges) - 1)]
+    straddlers = []
+
+    def place(t: Task, first: int) -> None:
+        for k in range(first, len(slices)):
+            es = max(t.earliest_start, edges[k])
+            dl = min(t.deadline, edges[k + 1])
+            if es + t.duration <= dl:
+                slices[k][t.id] = replace(t, earliest_start=es, deadline=dl)
+                return
+            if dl == t.deadline:
+                break
+        straddlers.append(t)
+
+    for t in req.tasks:
+        place(t, bisect_right(cuts, t.earliest_start))
+    original = {t.id: t for t in req.tasks}
+    bodies, counts = [], []
+    for k, part in enumerate(slices):
+        lo, hi = edges[k], edges[k + 1]
+        # only the busy windows inside the slice matter to it
+        wb, mb = (
+            {
+                rid: [(s, e) for s, e in b if e > lo and s < hi]
+                for rid, b in busy.items()
+            }
+            for busy in (worker_busy, machine_busy)
+        )
+        sub = type(req).model_construct(
+            workers=req.workers, machines=req.machines, tasks=list(part.values())
+        )
+        _, missed = edf_pass(sub, wb, mb, stop=False)
+        for t in missed:
+            del part[t.id]
+            place(original[t.id], k + 1)
+        if not part:
+            continue
+        sub.tasks = list(part.values())
+        bodies.append(subproblem(sub, wb, mb))
+        counts.append(len(part))
+    return bodies, counts, straddlers
+
+
+def distributed_solve(
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]],
+    machine_busy: Dict[str, List[Tuple[int, int]]],
+    options: SolveOptions,
+    bounds: Dict[str, Tuple[int, int]],
+) -> Dict[str, Any]:
+    """
+    Coordinator mode: split the instance into subproblems that cannot
+    interact (split_components(), or time_slices()), solve them concurrently
+    on the cluster's peers via /schedule_with_busy, and merge the plans.
+    Time-slice straddlers go into the earliest gap of the merged plan. When
+    a time slice comes back infeasible, or a straddler does not fit, the
+    slicing was too tight and the whole instance goes to a single peer,
+    with the PEER_FALLBACK_SHARE of time_limit the slices left over.
+    An infeasible component makes the instance infeasible (422).
+    """
+    if not cluster.peers:
+        raise HTTPException(503, "No solver peers configured (SCHEDULER_PEERS)")
+    t0 = time.monotonic()
+    deadline = t0 + options.time_limit
+    params: Dict[str, Any] = {
+        "relative_gap": options.relative_gap,
+        "absolute_gap": options.absolute_gap,
+    }
+    if options.seed is not None:
+        params["seed"] = options.seed
+
+    def dispatch(bodies: List[bytes], limit: float) -> List[Tuple[str, int, int, Any]]:
+        """(node, attempts, status code, decoded body) per subproblem."""
+        query = {**params, "time_limit": limit}
+        until = time.monotonic() + limit
+        with ThreadPoolExecutor(max_workers=max(1, len(bodies))) as pool:
+            futures = [
+                pool.submit(cluster.post, "/schedule_with_busy", query, b, until)
+                for b in bodies
+            ]
+            replies = [f.result() for f in futures]
+        decoded = []
+        for node, n, r in replies:
+            try:
+                decoded.append((node, n, r.status_code, r.json()))
+            except ValueError:  # e.g. a proxy's HTML error page
+                raise HTTPException(
+                    502, f"{node}: HTTP {r.status_code} with a non-JSON body"
+                )
+        return decoded
+
+    split, straddlers = options.split, []
+    if split == "time":
+        size = options.window or max(
+            1, -(-len(req.tasks) // (len(cluster.peers) * cluster.limit))
+        )
+        bodies, counts, straddlers = time_slices(req, worker_busy, machine_busy, size)
+    else:
+        parts = split_components(req)
+        bodies = [subproblem(p, worker_busy, machine_busy) for p in parts]
+        counts = [len(p.tasks) for p in parts]
+    reserve = options.time_limit * PEER_FALLBACK_SHARE if split == "time" else 0.0
+    replies = dispatch(bodies, options.time_limit - reserve)
+
+    plan: Optional[List[Dict[str, Any]]] = []
+    if split == "time" and any(code != 200 for _, _, code, _ in replies):
+        plan = None
+    else:
+        for _, _, code, body in replies:
+            if code != 200:
+                raise HTTPException(code, body.get("detail"))
+            plan += body["assignments"]
+    if plan is not None and straddlers:
+        done = [Assignment(**a) for a in plan]
+        w_line, _ = occupancy(req.workers, worker_busy, done, "worker_id")
+        m_line, _ = occupancy(req.machines, machine_busy, done, "machine_id")
+        w_index, m_index = eligibility_index(req.workers), eligibility_index(
+            req.machines
+        )
+        for t in sorted(straddlers, key=lambda t: (t.deadline, t.earliest_start)):
+            s, w_id, m_id = earliest_pair(
+                t, w_index[t.type], m_index[t.type], w_line, m_line
+            )
+            if s + t.duration > t.deadline:
+                plan = None
+                break
+            w_line[w_id].book(s, s + t.duration)
+            m_line[m_id].book(s, s + t.duration)
+            plan.append(
+                {
+                    "task_id": t.id,
+                    "worker_id": w_id,
+                    "machine_id": m_id,
+                    "start": s,
+                    "end": s + t.duration,
+                }
+            )
+    if plan is None:  # the slicing was too tight: one peer gets it all
+        split, straddlers = "single", []
+        counts = [len(req.tasks)]
+        limit = max(reserve, deadline - time.monotonic())
+        replies = dispatch([subproblem(req, worker_busy, machine_busy)], limit)
+        _, _, code, body = replies[0]
+        if code != 200:
+            raise HTTPException(code, body.get("detail"))
+        plan = body["assignments"]
+
+    by_task = {a["task_id"]: a for a in plan}
+    assignments = [by_task[t.id] for t in req.tasks]
+    makespan = max((a["end"] for a in assignments), default=0)
+    if split != "time":  # exact parts: the longest one decides
+        bound = max((body["bound"] for *_, body in replies), default=0)
+    else:
+        bound = makespan_lower_bound(req, worker_busy, machine_busy, bounds)
+    status = "OPTIMAL" if bound >= makespan else "FEASIBLE"
+    return {
+        "makespan": makespan,
+        "assignments": assignments,
+        "engine": "distributed",
+        **anytime_fields(status, makespan, bound, time.monotonic() - t0),
+        "split": split,
+        "straddlers": len(straddlers),
+        "parts": [
+            {
+                "node": node,
+                "attempts": attempts,
+                "tasks": n,
+                "makespan": body["makespan"],
+                "solve_status": body["solve_status"],
+                "wall_time": body["wall_time"],
+            }
+            for (node, attempts, _, body), n in zip(replies, counts)
+        ],
+    }
+
+
+# ---------- result cache ----------
+def canonical_form(
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]],
+    machine_busy: Dict[str, List[Tuple[int, int]]],
+):
+    """
+    Hash the instance independently of list order, type-set order and ids.
+    Workers, machines and tasks are ordered by their attributes and referred
+    to by position; entities with equal attributes are interchangeable, so
+    ties may be broken arbitrarily. Returns the key and the request ids in
+    canonical order, used to translate cached plans back.
+    """
+    wrow = resource_rows(req.workers, worker_busy)
+    mrow = resource_rows(req.machines, machine_busy)
+    trow = {t.id: (t.type, t.duration, t.earliest_start, t.deadline) for t in req.tasks}
+    w_ids = sorted(wrow, key=wrow.__getitem__)
+    m_ids = sorted(mrow, key=mrow.__getitem__)
+    t_ids = sorted(trow, key=trow.__getitem__)
+    blob = json.dumps(
+        [[wrow[i] for i in w_ids], [mrow[i] for i in m_ids], [trow[i] for i in t_ids]],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(blob.encode()).hexdigest(), w_ids, m_ids, t_ids
+
+
+def resource_rows(resources, busy: Dict[str, List[Tuple[int, int]]]):
+    """Resource id → (sorted types, busy windows), as canonical_form() hashes it."""
+    if isinstance(resources, Roster) and busy is resources.busy:
+        return resources.rows
+    return {r.id: (sorted(r.types), busy.get(r.id, [])) for r in resources}
+
+
+@dataclass
+class CacheEntry:
+    status: str  # CP-SAT status name
+    budget: float  # time limit of the solve that produced it (0: gap-limited)
+    # (makespan, [(task, worker, machine, start), ...], engine, bound), rows
+    # in canonical positions
+    plan: Optional[Tuple[int, List[Tuple[int, int, int, int]], str, int]]
+    created: float
+
+    @property
+    def authoritative(self) -> bool:
+        # proven results hold for any budget; others only up to their own
+        return self.status in ("OPTIMAL", "INFEASIBLE")
+
+    def usable(
+        self, budget: float, relative_gap: float = 0.0, absolute_gap: float = 0.0
+    ) -> bool:
+        if self.authoritative or self.budget >= budget:
+            return True
+        if self.plan is None or len(self.plan) < 4:
+            return False  # entries written before bounds were kept
+        # anytime: a plan already within the caller's gap limits will do
+        gap = self.plan[0] - self.plan[3]
+        return gap <= absolute_gap or gap <= relative_gap * max(1, self.plan[0])
+
+
+class ResultCache:
+    """LRU + TTL in memory, with an optional SQLite tier that survives restarts."""
+
+    def __init__(self, size: int, ttl: float, db_path: Optional[str] = None):
+        self.size, self.ttl = size, ttl
+        self.mem: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.db = None
+        if db_path:
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY,"
+                " status TEXT, budget REAL, plan TEXT, created REAL)"
+            )
+            self.db.commit()
+
+    def get(
+        self, key: str, budget: float, relative_gap: float = 0.0, absolute_gap=0.0
+    ) -> Optional[CacheEntry]:
+        now = time.time()
+        with self.lock:
+            entry = self.mem.get(key)
+            if entry is None and self.db is not None:
+                row = self.db.execute(
+                    "SELECT status, budget, plan, created FROM cache WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None:
+                    entry = CacheEntry(row[0], row[1], json.loads(row[2]), row[3])
+                    self._remember(key, entry)
+            if entry is None or now - entry.created > self.ttl:
+                return None
+            self.mem.move_to_end(key)
+            return entry if entry.usable(budget, relative_gap, absolute_gap) else None
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        with self.lock:
+            old = self.mem.get(key)
+            if old is not None and old.usable(entry.budget) and not entry.authoritative:
+                return  # never replace a result with a weaker one
+            self._remember(key, entry)
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        entry.status,
+                        entry.budget,
+                        json.dumps(entry.plan),
+                        entry.created,
+                    ),
+                )
+                self.db.execute(
+                    "DELETE FROM cache WHERE created < ?", (time.time() - self.ttl,)
+                )
+                self.db.commit()
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        self.mem[key] = entry
+        self.mem.move_to_end(key)
+        while len(self.mem) > self.size:
+            self.mem.popitem(last=False)
+
+
+cache = ResultCache(CACHE_SIZE, CACHE_TTL, CACHE_DB)
+
+
+def cached_solve(
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]],
+    machine_busy: Dict[str, List[Tuple[int, int]]],
+    response: Response,
+    cache_control: Optional[str] = None,
+    mode: str = "cp-sat",
+    options: Optional[SolveOptions] = None,
+):
+    """
+    precheck(), then run_solve() behind the result cache. `Cache-Control:
+    no-cache` bypasses the lookup (the fresh result is still stored);
+    `X-Cache` reports HIT, MISS or BYPASS. mode="heuristic" runs
+    heuristic_plan() instead, without CP-SAT or the cache; mode="rolling",
+    "coarse" and "distributed" solve through rolling_solve(), coarse_solve()
+    and distributed_solve(), also without the cache. Search threads are
+    leased from `cores`, so concurrent requests share them.
+    """
+    options = options or SolveOptions()
+    t0 = time.monotonic()
+    with span("precheck"):
+        pre = precheck(req, worker_busy, machine_busy)
+    if pre.reasons:
+        metrics.inc("scheduler_precheck_rejections_total")
+        raise pre.error()
+
+    if mode == "heuristic":
+        result = heuristic_plan(req, worker_busy, machine_busy)
+        if result is None:
+            raise HTTPException(422, "No feasible schedule")
+        bound = makespan_lower_bound(req, worker_busy, machine_busy, pre.bounds)
+        status = "OPTIMAL" if bound >= result["makespan"] else "FEASIBLE"
+        fields = anytime_fields(
+            status, result["makespan"], bound, time.monotonic() - t0
+        )
+        return {**result, "engine": "heuristic", **fields}
+    if mode == "rolling":
+        with cores.lease(options.num_workers) as n:
+            options = replace(options, num_workers=n)
+            return rolling_solve(req, worker_busy, machine_busy, options, pre.bounds)
+    if mode == "coarse":
+        with cores.lease(options.num_workers) as n:
+            options = replace(options, num_workers=n)
+            return coarse_solve(req, worker_busy, machine_busy, options, pre.bounds)
+    if mode == "distributed":
+        return distributed_solve(req, worker_busy, machine_busy, options, pre.bounds)
+
+    # a gap-limited solve may stop early, so it vouches only for its own gap
+    gap_limited = options.relative_gap > 0 or options.absolute_gap > 0
+    budget = 0.0 if gap_limited else options.time_limit
+    bypass = cache_control is not None and "no-cache" in cache_control.lower()
+    with span("cache_lookup"):
+        key, w_ids, m_ids, t_ids = canonical_form(req, worker_busy, machine_busy)
+        entry = (
+            None
+            if bypass
+            else cache.get(
+                key, options.time_limit, options.relative_gap, options.absolute_gap
+            )
+        )
+    if entry is None:
+        log_request(req)
+        with cores.lease(options.num_workers) as n:
+            solve_opts = replace(options, num_workers=n)
+            status, result = run_solve(req, worker_busy, machine_busy, solve_opts, pre)
+        plan = None
+        if result is not None:
+            w_pos = {rid: i for i, rid in enumerate(w_ids)}
+            m_pos = {rid: i for i, rid in enumerate(m_ids)}
+            t_pos = {tid: i for i, tid in enumerate(t_ids)}
+            plan = (
+                result["makespan"],
+                [
+                    (
+                        t_pos[a["task_id"]],
+                        w_pos[a["worker_id"]],
+                        m_pos[a["machine_id"]],
+                        a["start"],
+                    )
+                    for a in result["assignments"]
+                ],
+                result["engine"],
+                result["bound"],
+            )
+        cache.put(key, CacheEntry(status, budget, plan, time.time()))
+        state = "BYPASS" if bypass else "MISS"
+    else:
+        result = None
+        if entry.plan is not None:
+            dur = {t.id: t.duration for t in req.tasks}
+            rows = {t_ids[ti]: (wi, mi, s) for ti, wi, mi, s in entry.plan[1]}
+            assignments = []
+            for t in req.tasks:
+                wi, mi, s = rows[t.id]
+                assignments.append(
+                    {
+                        "task_id": t.id,
+                        "worker_id": w_ids[wi],
+                        "machine_id": m_ids[mi],
+                        "start": s,
+                        "end": s + dur[t.id],
+                    }
+                )
+            makespan = entry.plan[0]
+            if len(entry.plan) > 3:
+                bound = entry.plan[3]
+            else:  # entries written before bounds were kept
+                bound = makespan if entry.status == "OPTIMAL" else 0
+            result = {
+                "makespan": makespan,
+                "assignments": assignments,
+                "engine": entry.plan[2],
+                **anytime_fields(entry.status, makespan, bound, time.monotonic() - t0),
+            }
+        state = "HIT"
+
+    response.headers["X-Cache"] = state
+    metrics.inc("scheduler_cache_requests_total", result=state)
+    if result is None:
+        raise HTTPException(422, "No feasible schedule", headers={"X-Cache": state})
+    return result
+
+
+# ---------- registered resource pools ----------
+POOL_CAPACITY = int(os.environ.get("SCHEDULER_POOL_CAPACITY", 64))
+POOL_TTL = float(os.environ.get("SCHEDULER_POOL_TTL", 7 * 86400))  # idle seconds
+
+
+class Roster(list):
+    """
+    The workers or machines of a registered pool, carrying what every solve
+    would otherwise recompute from them: merged busy windows, the type →
+    resource index, interchangeable classes and the canonical_form() rows.
+    eligibility_index(), resource_classes() and resource_rows() return these
+    as long as they are asked about the pool's own busy windows; rolling and
+    coarse solves pass modified ones and get fresh results.
+    """
+
+    def __init__(self, resources):
+        super().__init__(resources)
+        self.busy = {r.id: merge_busy_windows(r.busy_windows) for r in self}
+        self.by_type = eligibility_index(iter(self))
+        self.classes = resource_classes(iter(self), self.busy)
+        self.rows = {r.id: (sorted(r.types), self.busy[r.id]) for r in self}
+
+
+@dataclass
+class ResourcePool:
+    id: str
+    version: int
+    workers: Roster
+    machines: Roster
+    used: float  # last registration, update or solve
+
+    def view(self, full: bool = False) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"pool_id": self.id, "version": self.version}
+        if full:
+            out["workers"] = [r.model_dump() for r in self.workers]
+            out["machines"] = [r.model_dump() for r in self.machines]
+        else:
+            out["workers"], out["machines"] = len(self.workers), len(self.machines)
+        return out
+
+
+class PoolRegistry:
+    """
+    Resource pools by id, least recently used evicted beyond `capacity` or
+    after `ttl` idle seconds. Pools are immutable: an update builds a new
+    version, so solves already running keep the one they started with.
+    Versions keep counting across eviction and deletion of an id.
+    """
+
+    def __init__(self, capacity: int, ttl: float):
+        self.capacity, self.ttl = capacity, ttl
+        self.pools: "OrderedDict[str, ResourcePool]" = OrderedDict()
+        self.versions: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def put(self, pool_id: str, workers: list, machines: list) -> ResourcePool:
+        pool = ResourcePool(pool_id, 0, Roster(workers), Roster(machines), 0.0)
+        with self.lock:
+            pool.version = self.versions.get(pool_id, 0) + 1
+            pool.used = time.time()
+            self.versions[pool_id] = pool.version
+            self.pools[pool_id] = pool
+            self.pools.move_to_end(pool_id)
+            self._evict()
+        return pool
+
+    def get(self, pool_id: str) -> ResourcePool:
+        with self.lock:
+            self._evict()
+            pool = self.pools.get(pool_id)
+            if pool is None:
+                raise HTTPException(404, f"Unknown resource pool {pool_id}")
+            pool.used = time.time()
+            self.pools.move_to_end(pool_id)
+            return pool
+
+    def delete(self, pool_id: str) -> ResourcePool:
+        with self.lock:
+            pool = self.pools.pop(pool_id, None)
+        if pool is None:
+            raise HTTPException(404, f"Unknown resource pool {pool_id}")
+        return pool
+
+    def _evict(self) -> None:
+        stale = time.time() - self.ttl
+        while self.pools and (
+            len(self.pools) > self.capacity
+            or next(iter(self.pools.values())).used < stale
+        ):
+            self.pools.popitem(last=False)
+            metrics.inc("scheduler_pool_evictions_total")
+        metrics.set("scheduler_pools", len(self.pools))
+
+
+def patched(resources: list, upserts: list, remove: List[str]) -> list:
+    """Resources with `upserts` replacing same-id entries or appended."""
+    new = {r.id: r for r in upserts}
+    out = [new.pop(r.id, r) for r in resources if r.id not in remove]
+    return out + [r for r in new.values() if r.id not in remove]
+
+
+pools = PoolRegistry(POOL_CAPACITY, POOL_TTL)
+
+
+@app.put("/pools/{pool_id}")
+def put_pool(pool_id: str, spec: PoolSpec):
+    """Register a pool, or replace all of its resources."""
+    return pools.put(pool_id, spec.workers, spec.machines).view()
+
+
+@app.patch("/pools/{pool_id}")
+def patch_pool(pool_id: str, change: PoolPatch):
+    old = pools.get(pool_id)
+    workers = patched(old.workers, change.workers, change.remove_workers)
+    machines = patched(old.machines, change.machines, change.remove_machines)
+    return pools.put(pool_id, workers, machines).view()
+
+
+@app.get("/pools")
+def list_pools():
+    with pools.lock:
+        return [p.view() for p in pools.pools.values()]
+
+
+@app.get("/pools/{pool_id}")
+def get_pool(pool_id: str):
+    return pools.get(pool_id).view(full=True)
+
+
+@app.delete("/pools/{pool_id}")
+def delete_pool(pool_id: str):
+    return pools.delete(pool_id).view()
+
+
+@app.post("/pools/{pool_id}/schedule")
+def schedule_pool(
+    pool_id: str,
+    body: PoolTasks,
+    request: Request,
+    response: Response,
+    cache_control: Optional[str] = Header(None),
+    mode: SolveMode = "cp-sat",
+    options: SolveOptions = Depends(solve_options),
+    store: bool = False,
+):
+    """/schedule_with_busy against a registered pool: only tasks are sent."""
+    mark_parsed()
+    pool = pools.get(pool_id)
+    if body.version is not None and body.version != pool.version:
+        raise HTTPException(
+            409,
+            {"message": "Resource pool has changed", "version": pool.version},
+        )
+    req = ScheduleRequestBW.model_construct(
+        workers=pool.workers, machines=pool.machines, tasks=body.tasks
+    )
+    response.headers["X-Pool-Version"] = str(pool.version)
+    busy = pool.workers.busy, pool.machines.busy
+    result = cached_solve(req, *busy, response, cache_control, mode, options)
+    return encode_response(request, keep(result, store), response)
+
+
+# ---------- schedule store: SQLite, indexed by resource, time and task ----------
+class ScheduleStore:
+    """
+    Stored plans, one row per assignment, in an SQLite file in WAL mode:
+    readers never wait for a writer, and the uvicorn workers of one host
+    share the file. Every lookup is a range scan of an index led by the
+    schedule id: (worker, start), (machine, start), (start) or (task).
+    Rows come in (start, seq) order, which those indexes already hold, and
+    pages continue from a keyset cursor instead of an OFFSET.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS schedules (id TEXT UNIQUE NOT NULL,"
+        " created REAL, makespan INTEGER, engine TEXT, solve_status TEXT,"
+        " tasks INTEGER, longest INTEGER)",
+        "CREATE INDEX IF NOT EXISTS schedules_created ON schedules (created)",
+        "CREATE TABLE IF NOT EXISTS assignments (schedule_id TEXT, seq INTEGER,"
+        ' task_id TEXT, worker_id TEXT, machine_id TEXT, "start" INTEGER,'
+        ' "end" INTEGER, PRIMARY KEY (schedule_id, seq)) WITHOUT ROWID',
+        "CREATE INDEX IF NOT EXISTS by_worker"
+        ' ON assignments (schedule_id, worker_id, "start")',
+        "CREATE INDEX IF NOT EXISTS by_machine"
+        ' ON assignments (schedule_id, machine_id, "start")',
+        'CREATE INDEX IF NOT EXISTS by_start ON assignments (schedule_id, "start")',
+        "CREATE INDEX IF NOT EXISTS by_task"
+        ' ON assignments (schedule_id, task_id, "start")',
+    )
+    COLUMNS = ("task_id", "worker_id", "machine_id", "start", "end")
+
+    def __init__(self, path: str, ttl: float):
+        self.path, self.ttl = path, ttl
+        self.local = threading.local()  # one connection per thread
+        self.lock = threading.Lock()  # one writer per process
+        self.ready = False
+
+    def db(self) -> sqlite3.Connection:
+        db = getattr(self.local, "db", None)
+        if db is None:  # lazily: the file appears with the first stored plan
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            with self.lock:
+                if not self.ready:
+                    with db:
+                        for stmt in self.SCHEMA:
+                            db.execute(stmt)
+                    self.ready = True
+            self.local.db = db
+        return db
+
+    def save(self, result: Dict[str, Any]) -> str:
+        schedule_id = uuid.uuid4().hex
+        assignments = result["assignments"]
+        rows = [
+            (
+                schedule_id,
+                i,
+                a["task_id"],
+                a["worker_id"],
+                a["machine_id"],
+                a["start"],
+                a["end"],
+            )
+            for i, a in enumerate(assignments)
+        ]
+        longest = max((a["end"] - a["start"] for a in assignments), default=0)
+        db = self.db()
+        with self.lock, db:  # one transaction; commits on exit
+            expired = "SELECT id FROM schedules WHERE created < ?"
+            cutoff = (time.time() - self.ttl,)
+            db.execute(
+                f"DELETE FROM assignments WHERE schedule_id IN ({expired})", cutoff
+            )
+            db.execute("DELETE FROM schedules WHERE created < ?", cutoff)
+            db.execute(
+                "INSERT INTO schedules VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    schedule_id,
+                    time.time(),
+                    result["makespan"],
+                    result.get("engine"),
+                    result.get("solve_status"),
+                    len(rows),
+                    longest,
+                ),
+            )
+            db.executemany("INSERT INTO assignments VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        metrics.inc("scheduler_schedules_stored_total")
+        return schedule_id
+
+    def info(self, schedule_id: str) -> Dict[str, Any]:
+        row = (
+            self.db()
+            .execute(
+                "SELECT id, created, makespan, engine, solve_status, tasks, longest"
+                " FROM schedules WHERE id = ? AND created >= ?",
+                (schedule_id, time.time() - self.ttl),
+            )
+            .fetchone()
+        )
+        if row is None:
+            raise HTTPException(404, f"Unknown schedule {schedule_id}")
+        keys = ("schedule_id", "created", "makespan", "engine", "solve_status")
+        return {**dict(zip(keys, row)), "tasks": row[5], "longest": row[6]}
+
+    def list(self, limit: int, after: Optional[str] = None) -> Dict[str, Any]:
+        """Newest first; `after` is the `next` cursor of the previous page."""
+        bound = "AND rowid < ?" if after is not None else ""
+        rows = (
+            self.db()
+            .execute(
+                "SELECT rowid, id, created, makespan, engine, solve_status, tasks"
+                f" FROM schedules WHERE created >= ? {bound}"
+                " ORDER BY rowid DESC LIMIT ?",
+                (
+                    time.time() - self.ttl,
+                    *([cursor(after, 1)[0]] if after is not None else []),
+                    limit + 1,
+                ),
+            )
+            .fetchall()
+        )
+        keys = ("schedule_id", "created", "makespan", "engine", "solve_status")
+        return {
+            "schedules": [
+                {**dict(zip(keys, r[1:6])), "tasks": r[6]} for r in rows[:limit]
+            ],
+            "next": str(rows[limit - 1][0]) if len(rows) > limit else None,
+        }
+
+    def delete(self, schedule_id: str) -> None:
+        db = self.db()
+        with self.lock, db:
+            gone = db.execute("DELETE FROM schedules WHERE id = ?", (schedule_id,))
+            db.execute("DELETE FROM assignments WHERE schedule_id = ?", (schedule_id,))
+        if not gone.rowcount:
+            raise HTTPException(404, f"Unknown schedule {schedule_id}")
+
+    def page(
+        self,
+        info: Dict[str, Any],
+        where: "AssignmentFilter",
+        after: Optional[Tuple[int, int]],
+        limit: int,
+    ) -> Tuple[List[Tuple], Optional[Tuple[int, int]]]:
+        """
+        Up to `limit` assignment rows of the schedule `info` matching
+        `where`, after the keyset position (start, seq); returns the rows
+        (with seq last) and the position to continue from, if any. The index
+        is named: without statistics SQLite would rather scan by_start in
+        order than sort the few rows of a selective one.
+        """
+        sql, args = ["schedule_id = ?"], [info["schedule_id"]]
+        index = "by_start"
+        for col, name in (("task_id", "by_task"), ("machine_id", "by_machine")):
+            if getattr(where, col) is not None:
+                sql.append(f"{col} = ?")
+                args.append(getattr(where, col))
+                index = name
+        if where.worker_id is not None:
+            sql.append("worker_id = ?")
+            args.append(where.worker_id)
+            index = "by_task" if where.task_id is not None else "by_worker"
+        if where.start is not None:
+            # overlap is "end" > start; no assignment is longer than `longest`,
+            # so it also starts after start - longest: an index range bound
+            sql.append('"start" > ? AND "end" > ?')
+            args += [where.start - info["longest"], where.start]
+        if where.end is not None:
+            sql.append('"start" < ?')
+            args.append(where.end)
+        if after is not None:
+            sql.append('("start", seq) > (?, ?)')
+            args += after
+        rows = (
+            self.db()
+            .execute(
+                'SELECT task_id, worker_id, machine_id, "start", "end", seq'
+                f" FROM assignments INDEXED BY {index}"
+                f' WHERE {" AND ".join(sql)}'
+                ' ORDER BY "start", seq LIMIT ?',
+                (*args, limit + 1),
+            )
+            .fetchall()
+        )
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return rows, (rows[-1][3], rows[-1][5]) if more else None
+
+
+@dataclass
+class AssignmentFilter:
+    worker_id: Optional[str] = None
+    machine_id: Optional[str] = None
+    task_id: Optional[str] = None
+    start: Optional[int] = None  # assignments overlapping [start, end)
+    end: Optional[int] = None
+
+
+def cursor(text: str, parts: int) -> Tuple[int, ...]:
+    """Decode a `next` cursor of `parts` dot-separated integers."""
+    try:
+        values = tuple(int(x) for x in text.split("."))
+    except ValueError:
+        values = ()
+    if len(values) != parts:
+        raise HTTPException(422, f"Invalid cursor {text!r}")
+    return values
+
+
+def keep(result: Dict[str, Any], store: bool) -> Dict[str, Any]:
+    """The result, plus `schedule_id` once it is stored (with ?store=true)."""
+    if not store:
+        return result
+    with span("store"):
+        return {**result, "schedule_id": schedules.save(result)}
+
+
+schedules = ScheduleStore(STORE_DB, STORE_TTL)
+
+
+@app.get("/schedules")
+def list_schedules(
+    request: Request,
+    limit: int = Query(100, ge=1, le=STORE_MAX_PAGE),
+    after: Optional[str] = None,
+):
+    return encode_response(request, schedules.list(limit, after))
+
+
+@app.get("/schedules/{schedule_id}")
+def get_schedule(schedule_id: str):
+    return schedules.info(schedule_id)
+
+
+@app.delete("/schedules/{schedule_id}")
+def delete_schedule(schedule_id: str):
+    schedules.delete(schedule_id)
+    return {"schedule_id": schedule_id, "deleted": True}
+
+
+@app.get("/schedules/{schedule_id}/assignments")
+def schedule_assignments(
+    schedule_id: str,
+    request: Request,
+    where: AssignmentFilter = Depends(),
+    after: Optional[str] = None,
+    limit: int = Query(STORE_PAGE, ge=1, le=STORE_MAX_PAGE),
+):
+    """
+    The stored assignments matching the filters, by start time. A page of
+    `limit` rows with the cursor of the next one; with `Accept:
+    application/x-ndjson`, every match from `after` on, one per line,
+    read `limit` rows at a time.
+    """
+    info = schedules.info(schedule_id)
+    position = cursor(after, 2) if after is not None else None
+    cols = ScheduleStore.COLUMNS
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+
+        def stream():
+            pos = position
+            while True:
+                rows, pos = schedules.page(info, where, pos, limit)
+                yield b"".join(dumps(dict(zip(cols, r))) + b"\n" for r in rows)
+                if pos is None:
+                    return
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    rows, pos = schedules.page(info, where, position, limit)
+    return encode_response(
+        request,
+        {
+            "schedule_id": schedule_id,
+            "assignments": [dict(zip(cols, r)) for r in rows],
+            "next": f"{pos[0]}.{pos[1]}" if pos else None,
+        },
+    )
+
+
+# ---------- Gantt export: SVG streamed row by row ----------
+GANTT_LEFT, GANTT_TOP, GANTT_BOTTOM = 90, 30, 30  # margins, pixels
+GANTT_CHAR = 6.5  # pixels per label character at font-size 11
+
+
+@dataclass
+class GanttView:
+    start: Optional[int] = None  # time window; default: the whole plan
+    end: Optional[int] = None
+    workers: List[str] = field(default_factory=list)  # rows; none → all
+    machines: List[str] = field(default_factory=list)
+    width: int = 1200  # pixels
+    row_height: int = 20
+
+
+def gantt_view(
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    worker_id: List[str] = Query([]),
+    machine_id: List[str] = Query([]),
+    width: int = Query(1200, ge=200, le=20000),
+    row_height: int = Query(20, ge=4, le=100),
+) -> GanttView:
+    if start is not None and end is not None and end <= start:
+        raise HTTPException(422, "end must be after start")
+    return GanttView(start, end, worker_id, machine_id, width, row_height)
+
+
+def jet_palette(n: int = 256) -> np.ndarray:
+    """The client charts' colours: matplotlib's jet table, mixed with white."""
+    x = np.linspace(0, 1, n)
+    rgb = np.clip(1.5 - np.abs(4 * x[:, None] - [3, 2, 1]), 0, 1)
+    rgb = np.rint((rgb + 1) / 2 * 255).astype(np.int64)
+    return np.array([f"#{r:02x}{g:02x}{b:02x}" for r, g, b in rgb.tolist()])
+
+
+def time_ticks(lo: int, hi: int) -> np.ndarray:
+    """About ten ticks at a 1, 2 or 5 times power-of-ten step, at least 1."""
+    raw = max(1, hi - lo) / 10
+    step = 10 ** max(0, math.floor(math.log10(raw)))  # times are integers
+    step *= next(m for m in (1, 2, 5, 10) if step * m >= raw)
+    return np.arange(math.ceil(lo / step) * step, hi + 1, step)
+
+
+def gantt_svg(
+    tasks: np.ndarray,
+    workers: np.ndarray,
+    machines: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    view: GanttView,
+) -> Iterator[str]:
+    """
+    Render assignment columns as an SVG Gantt chart, laid out like the
+    clients' draw_gantt(): worker rows, a gap, machine rows, a bar per
+    assignment in both. The geometry is computed for all bars at once with
+    numpy, then written one row at a time. Bars narrower than a pixel are
+    merged per row into grey runs of the pixel columns they touch, so the
+    output stays proportional to rows × width however many tasks there are.
+    """
+    esc = html.escape
+    w_ids = np.unique(workers)
+    m_ids = np.unique(machines)
+    if view.workers:  # each filter only narrows its own kind of row
+        w_ids = w_ids[np.isin(w_ids, view.workers)]
+    if view.machines:
+        m_ids = m_ids[np.isin(m_ids, view.machines)]
+    labels = [f"W{esc(str(r))}" for r in w_ids] + [f"M{esc(str(r))}" for r in m_ids]
+    rows_y = np.r_[np.arange(len(w_ids)), np.arange(len(m_ids)) + len(w_ids) + 1]
+
+    lo = view.start if view.start is not None else int(starts.min(initial=0))
+    hi = view.end if view.end is not None else int(ends.max(initial=lo + 1))
+    hi = max(hi, lo + 1)
+    plot_w = view.width - GANTT_LEFT - 10
+    px = plot_w / (hi - lo)
+    rh = view.row_height
+    height = GANTT_TOP + (len(w_ids) + len(m_ids) + 1) * rh + GANTT_BOTTOM
+
+    # one bar per (assignment, row); colour by rank of the task id
+    names, rank = np.unique(tasks, return_inverse=True)
+    palette = jet_palette()
+    colour = np.minimum(rank * len(palette) // max(1, len(names) - 1), len(palette) - 1)
+    shown = (ends > lo) & (starts < hi)
+    rows, bars = [], []
+    for ids, col, offset in ((w_ids, workers, 0), (m_ids, machines, len(w_ids))):
+        pos = np.searchsorted(ids, col)
+        hit = shown & (pos < len(ids))
+        hit[hit] = ids[pos[hit]] == col[hit]
+        rows.append(pos[hit] + offset)
+        bars.append(np.flatnonzero(hit))
+    row = np.concatenate(rows)
+    bar = np.concatenate(bars)
+    x0 = (np.clip(starts[bar], lo, hi) - lo) * px
+    x1 = (np.clip(ends[bar], lo, hi) - lo) * px
+    order = np.lexsort((x0, row))
+    row, bar, x0, x1 = row[order], bar[order], x0[order], x1[order]
+    wide = x1 - x0 >= 1
+
+    # level of detail: pixel columns touched by narrow bars, as runs per row
+    col = np.minimum(x0[~wide].astype(np.int64), plot_w - 1)
+    cells, hits = np.unique(row[~wide] * plot_w + col, return_counts=True)
+    cell_row, cell_col = np.divmod(cells, plot_w)
+    new_run = np.r_[True, (np.diff(cells) != 1) | (np.diff(cell_row) != 0)]
+    run_at = np.flatnonzero(new_run[: len(cells)])
+    runs = (
+        cell_row[run_at],
+        cell_col[run_at],
+        np.diff(np.r_[run_at, len(cells)]),
+        np.add.reduceat(hits, run_at) if len(cells) else hits,
+    )
+
+    yield (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{view.width}" '
+        f'height="{height}" font-family="sans-serif" font-size="11">\n'
+        f'<rect width="100%" height="100%" fill="white"/>\n'
+        f'<text x="{view.width / 2:.0f}" y="18" text-anchor="middle" '
+        f'font-size="14">Gantt chart – Workers &amp; Machines ({lo}–{hi})</text>\n'
+    )
+    axis_y = height - GANTT_BOTTOM
+    ticks = time_ticks(lo, hi)
+    grid = [
+        f'<line x1="{x:.1f}" y1="{GANTT_TOP}" x2="{x:.1f}" y2="{axis_y}" '
+        f'stroke="#eee"/><text x="{x:.1f}" y="{axis_y + 14}" '
+        f'text-anchor="middle">{t}</text>'
+        for t, x in zip(ticks.tolist(), (GANTT_LEFT + (ticks - lo) * px).tolist())
+    ]
+    yield "\n".join(grid) + "\n"
+
+    bar_h = round(rh * 0.6)
+    pad = (rh - bar_h) / 2
+    # the wide bars' text columns, then one slice of them per row
+    fill = palette[colour[bar[wide]]].tolist()
+    tids = [esc(str(t)) for t in tasks[bar[wide]].tolist()]
+    spans = zip(starts[bar[wide]].tolist(), ends[bar[wide]].tolist())
+    spans = [f"{s}–{e}" for s, e in spans]
+    row, x0, x1 = row[wide], x0[wide], x1[wide]
+    cut = np.searchsorted(row, np.arange(len(labels) + 1))
+    run_cut = np.searchsorted(runs[0], np.arange(len(labels) + 1))
+    for r, label in enumerate(labels):
+        top = GANTT_TOP + rows_y[r] * rh
+        y, ty = top + pad, top + rh / 2 + 4
+        out = [
+            f'<g><text x="{GANTT_LEFT - 6}" y="{ty:.1f}" '
+            f'text-anchor="end">{label}</text>'
+        ]
+        i, j = cut[r], cut[r + 1]
+        for a, z, tid, f, when in zip(
+            x0[i:j].tolist(), x1[i:j].tolist(), tids[i:j], fill[i:j], spans[i:j]
+        ):
+            out.append(
+                f'<rect x="{GANTT_LEFT + a:.1f}" y="{y:.1f}" width="{z - a:.1f}" '
+                f'height="{bar_h}" fill="{f}"><title>{tid} {when}</title></rect>'
+            )
+            if z - a >= (len(tid) + 1) * GANTT_CHAR + 4:
+                out.append(
+                    f'<text x="{GANTT_LEFT + (a + z) / 2:.1f}" y="{ty:.1f}" '
+                    f'text-anchor="middle">T{tid}</text>'
+                )
+        rs = slice(run_cut[r], run_cut[r + 1])
+        for c, n, k in zip(
+            runs[1][rs].tolist(), runs[2][rs].tolist(), runs[3][rs].tolist()
+        ):
+            out.append(
+                f'<rect x="{GANTT_LEFT + c}" y="{y:.1f}" width="{n}" '
+                f'height="{bar_h}" fill="#888"><title>{k} tasks</title></rect>'
+            )
+        out.append("</g>\n")
+        yield "".join(out)
+    yield (
+        f'<line x1="{GANTT_LEFT}" y1="{axis_y}" x2="{GANTT_LEFT + plot_w}" '
+        f'y2="{axis_y}" stroke="black"/>\n</svg>\n'
+    )
+
+
+def gantt_response(rows: List[Tuple], view: GanttView) -> StreamingResponse:
+    """A streamed SVG of (task, worker, machine, start, end) rows."""
+    cols = list(zip(*rows)) or [(), (), (), (), ()]
+    tasks, workers, machines = (np.array(c, dtype=str) for c in cols[:3])
+    starts, ends = (np.array(c, dtype=np.int64) for c in cols[3:5])
+    return StreamingResponse(
+        gantt_svg(tasks, workers, machines, starts, ends, view),
+        media_type="image/svg+xml",
+    )
+
+
+@app.post("/gantt")
+def gantt(body: GanttRequest, view: GanttView = Depends(gantt_view)):
+    """A plan from any source, e.g. a solve response, as an SVG Gantt chart."""
+    mark_parsed()
+    rows = [
+        (a.task_id, a.worker_id, a.machine_id, a.start, a.end) for a in body.assignments
+    ]
+    return gantt_response(rows, view)
+
+
+@app.get("/schedules/{schedule_id}/gantt")
+def schedule_gantt(schedule_id: str, view: GanttView = Depends(gantt_view)):
+    """A stored plan as an SVG Gantt chart; the time window is an index seek."""
+    info = schedules.info(schedule_id)
+    where = AssignmentFilter(start=view.start, end=view.end)
+    rows, _ = schedules.page(info, where, None, max(1, info["tasks"]))
+    return gantt_response([r[:5] for r in rows], view)
+
+
+# ---------- async jobs: process pool + streamed improving solutions ----------
+class _StreamingCallback(cp_model.CpSolverSolutionCallback):
+    """Push every improving solution, with the current bound, to the parent."""
+
+    def __init__(self, req: ScheduleRequestBW, sm: ScheduleModel, events):
+        super().__init__()
+        self.req, self.sm, self.events = req, sm, events
+
+    def on_solution_callback(self):
+        sol = extract_plan(self.req, self.sm, self)
+        sol.update(bound=int(self.BestObjectiveBound()), wall_time=self.WallTime())
+        self.events.put({"event": "solution", **sol})
+
+
+def solve_job(
+    payload: Dict[str, Any], events, cancel, options: Optional[SolveOptions] = None
+) -> None:
+    """
+    Runs inside a pool process. Reports progress through `events` and stops
+    the search as soon as `cancel` is set. `options` apply as in run_solve();
+    num_workers=0 means this job's share of the cores.
+    """
+    if cancel.is_set():  # cancelled after the pool took it off the queue
+        events.put({"event": "cancelled"})
+        return
+    options = options or SolveOptions()
+    deadline = time.monotonic() + options.time_limit
+    events.put({"event": "running"})
+    req = ScheduleRequestBW(**payload)
+    busy = busy_maps(req)
+    pre = precheck(req, *busy)
+    if pre.reasons:
+        events.put(
+            {"event": "end", "solve_status": "INFEASIBLE", "reasons": pre.reasons}
+        )
+        return
+    sm = build_model(req, *busy, pre.bounds, strengthen=STRENGTHEN)
+    greedy = heuristic_plan(req, *busy)
+    if greedy is not None:
+        add_hint(sm, greedy)
+    solver = cp_model.CpSolver()
+    options.apply(solver, deadline)
+    if not options.num_workers:  # JOB_WORKERS of these run at once
+        solver.parameters.num_workers = max(1, CPU_CORES // JOB_WORKERS)
+
+    done = threading.Event()
+
+    def watch_cancel():
+        while not done.wait(0.1):
+            if cancel.is_set():
+                solver.StopSearch()
+                return
+
+    threading.Thread(target=watch_cancel, daemon=True).start()
+    status = solver.Solve(sm.mdl, _StreamingCallback(req, sm, events))
+    done.set()
+
+    end = {
+        "event": "end",
+        "solve_status": solver.StatusName(status),
+        "bound": int(solver.BestObjectiveBound()),
+        "wall_time": solver.WallTime(),
+    }
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        end.update(extract_plan(req, sm, solver))
+    events.put(end)
+
+
+@dataclass
+class Job:
+    id: str
+    events: Any
+    cancel: Any
+    status: str = "queued"  # queued/running/done/infeasible/cancelled/error
+    solve_status: Optional[str] = None
+    makespan: Optional[int] = None
+    bound: Optional[int] = None
+    wall_time: Optional[float] = None
+    assignments: Optional[list] = None
+    error: Optional[str] = None
+    reasons: Optional[list] = None  # precheck explanations when infeasible
+    # every streamed event, in order, for SSE subscribers
+    history: list = field(default_factory=list)
+    future: Any = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status not in ("queued", "running")
+
+    def view(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "solve_status": self.solve_status,
+            "makespan": self.makespan,
+            "bound": self.bound,
+            "wall_time": self.wall_time,
+            "solutions": sum(e["event"] == "solution" for e in self.history),
+            "assignments": self.assignments,
+            "error": self.error,
+            "reasons": self.reasons,
+        }
+
+
+class JobManager:
+    """
+    Bounded process pool for background solves. Admission is refused once
+    JOB_WORKERS + JOB_QUEUE_DEPTH jobs are queued or running; finished jobs
+    are kept (oldest evicted first) up to JOB_HISTORY.
+    """
+
+    def __init__(self, workers: int, queue_depth: int, history: int):
+        self.workers, self.queue_depth, self.history = workers, queue_depth, history
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._mp: Any = None
+
+    def _start(self):
+        # lazily: most deployments never use the job API
+        if self._pool is None:
+            self._mp = multiprocessing.Manager()
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def active(self) -> int:
+        return sum(not j.finished for j in self.jobs.values())
+
+    def submit(
+        self, payload: Dict[str, Any], options: Optional[SolveOptions] = None
+    ) -> Job:
+        with self.lock:
+            if self.active() >= self.workers + self.queue_depth:
+                raise HTTPException(
+                    429, "Job queue is full", headers={"Retry-After": "1"}
+                )
+            self._start()
+            job = Job(uuid.uuid4().hex, self._mp.Queue(), self._mp.Event())
+            self.jobs[job.id] = job
+            self._evict()
+            job.future = self._pool.submit(
+                solve_job, payload, job.events, job.cancel, options
+            )
+        job.future.add_done_callback(lambda f: self._on_done(job, f))
+        threading.Thread(target=self._consume, args=(job,), daemon=True).start()
+        return job
+
+    def _on_done(self, job: Job, f):
+        # a job that never reached solve_job's final event still has to end
+        if f.cancelled():
+            job.events.put({"event": "cancelled"})
+        elif f.exception() is not None:
+            job.events.put({"event": "error", "error": repr(f.exception())})
+
+    def _consume(self, job: Job):
+        while not job.finished:
+            ev = job.events.get()
+            kind, status = ev["event"], job.status
+            for k in (
+                "solve_status",
+                "makespan",
+                "bound",
+                "wall_time",
+                "assignments",
+                "reasons",
+            ):
+                if k in ev:
+                    setattr(job, k, ev[k])
+            if kind == "running":
+                status = "running"
+            elif kind == "end":
+                if job.cancel.is_set():
+                    status = "cancelled"
+                else:
+                    status = "infeasible" if job.assignments is None else "done"
+            elif kind == "cancelled":
+                status = "cancelled"
+            elif kind == "error":
+                status, job.error = "error", ev["error"]
+            # publish the event before the status, so SSE never misses it
+            job.history.append(ev)
+            job.status = status
+
+    def _evict(self):
+        done = [jid for jid, j in self.jobs.items() if j.finished]
+        for jid in done[: max(0, len(done) - self.history)]:
+            del self.jobs[jid]
+
+    def get(self, job_id: str) -> Job:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise HTTPException(404, "Unknown job")
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        job = self.get(job_id)
+        if not job.finished and not job.future.cancel():
+            job.cancel.set()  # already running → stop the search
+        return job
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._mp.shutdown()
+            self._pool = self._mp = None
+
+
+jobs = JobManager(JOB_WORKERS, JOB_QUEUE_DEPTH, JOB_HISTORY)
+
+
+@app.post("/jobs", status_code=202)
+def submit_job(req: ScheduleRequestBW, options: SolveOptions = Depends(solve_options)):
+    """Solve in the background; time_limit, gaps, workers and seed apply."""
+    return jobs.submit(req.model_dump(), options).view()
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    return jobs.get(job_id).view()
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    return jobs.cancel(job_id).view()
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent events: one `solution` event per improvement, then `end`."""
+    job = jobs.get(job_id)
+
+    async def stream():
+        sent = 0
+        while True:
+            while sent < len(job.history):
+                ev = job.history[sent]
+                sent += 1
+                if ev["event"] == "running":
+                    continue
+                yield f"event: {ev['event']}\ndata: {json.dumps(ev)}\n\n"
+            if job.finished and sent == len(job.history):
+                yield f"event: status\ndata: {json.dumps(job.view())}\n\n"
+                return
+            await asyncio.sleep(0.05)
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+# ---------- incremental re-scheduling ----------
+def repair_solve(
+    req: ScheduleRequest | ScheduleRequestBW,
+    worker_busy: Dict[str, List[Tuple[int, int]]],
+    machine_busy: Dict[str, List[Tuple[int, int]]],
+    prev: Dict[str, Assignment],
+    frozen: Set[str],
+    time_limit: float,
+) -> Dict[str, Any]:
+    """
+    Re-solve starting from a previous plan `prev` (task id → assignment).
+    Previous assignments seed CP-SAT as hints; `frozen` tasks keep their
+    worker, machine and start. The objective is makespan first, then the
+    number of tasks that move to another worker or machine. Raises 422 when
+    the pre-checks or CP-SAT find no plan.
+    """
+    with span("precheck"):
+        pre = precheck(req, worker_busy, machine_busy)
+    if pre.reasons:
+        raise pre.error()
+    with span("build"):
+        # keeping a task on its old resource needs per-resource literals
+        sm = build_model(req, worker_busy, machine_busy, pre.bounds, aggregate=False)
+    mdl = sm.mdl
+    kept = []  # literals that are true when a task stays on its old resource
+    for t in req.tasks:
+        a = prev.get(t.id)
+        if a is None:
+            continue
+        w_lit = sm.w_choose[t.id].get(a.worker_id)
+        m_lit = sm.m_choose[t.id].get(a.machine_id)
+        if t.id in frozen:
+            if w_lit is None or m_lit is None:
+                raise HTTPException(
+                    422, f"Frozen task {t.id} cannot keep its worker/machine"
+                )
+            mdl.Add(sm.start[t.id] == a.start)
+            mdl.Add(w_lit == 1)
+            mdl.Add(m_lit == 1)
+            continue
+        mdl.AddHint(sm.start[t.id], a.start)
+        for lit in (w_lit, m_lit):
+            if lit is not None:
+                mdl.AddHint(lit, 1)
+                kept.append(lit)
+
+    # lexicographic: any makespan gain outweighs all resource changes
+    mdl.Minimize(sm.makespan * (len(kept) + 1) - sum(kept))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = min(time_limit, MAX_TIME_LIMIT)
+    with span("solve"), cores.lease() as n:
+        solver.parameters.num_workers = n
+        status = solver.Solve(mdl)
+    record_solve(sm, solver, status)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        raise HTTPException(422, "No feasible schedule")
+    return extract_plan(req, sm, solver)
+
+
+def moved(assignments: List[Dict[str, Any]], prev: Dict[str, Assignment]) -> int:
+    """How many tasks of `prev` changed worker, machine or start."""
+    return sum(
+        a["task_id"] in prev
+        and (
+            a["worker_id"] != prev[a["task_id"]].worker_id
+            or a["machine_id"] != prev[a["task_id"]].machine_id
+            or a["start"] != prev[a["task_id"]].start
+        )
+        for a in assignments
+    )
+
+
+@app.post("/reschedule")
+def reschedule(req: RescheduleRequest, request: Request, store: bool = False):
+    """
+    Re-solve a slightly changed instance starting from the previous plan,
+    see repair_solve(). Frozen tasks are the listed ones and those starting
+    before `freeze_before`.
+    """
+    mark_parsed()
+    prev = {a.task_id: a for a in req.previous_assignments}
+    frozen = set(req.frozen)
+    if req.freeze_before is not None:
+        frozen |= {a.task_id for a in prev.values() if a.start < req.freeze_before}
+    frozen &= {t.id for t in req.tasks}
+
+    busy = busy_maps(req)
+    result = repair_solve(req, *busy, prev, frozen, req.time_limit)
+    changed = moved(result["assignments"], prev)
+    result = {**result, "engine": "cp-sat", "frozen": len(frozen), "changed": changed}
+    return encode_response(request, keep(result, store))
+
+
+# ---------- urgent-task insertion ----------
+def occupancy(
+    resources, busy: Dict[str, List[Tuple[int, int]]], plan: list, key: str
+) -> Tuple[Dict[str, Timeline], Dict[str, List[Assignment]]]:
+    """
+    Per resource id: a Timeline of its busy windows plus the plan's
+    assignments on it, and those assignments by start. 422 when the plan
+    names a resource the request does not have.
+    """
+    booked: Dict[str, List[Assignment]] = {r.id: [] for r in resources}
+    for a in plan:
+        rows = booked.get(getattr(a, key))
+        if rows is None:
+            raise HTTPException(422, f"Unknown {key[:-3]} {getattr(a, key)}")
+        rows.append(a)
+    lines = {}
+    for rid, rows in booked.items():
+        rows.sort(key=lambda a: a.start)
+        taken = [*busy.get(rid, ()), *((a.start, a.end) for a in rows)]
+        lines[rid] = Timeline(merge_busy_windows(taken))
+    return lines, booked
+
+
+def neighbourhood(
+    late: List[Task],
+    index: Dict[str, List[str]],
+    booked: Dict[str, List[Assignment]],
+    whole: bool,
+) -> Set[str]:
+    """
+    Planned tasks that share an eligible resource with a late task: those
+    overlapping the late task's window, or (`whole`) all of them.
+    """
+    hood: Set[str] = set()
+    for t in late:
+        for rid in index.get(t.type, ()):
+            rows = booked[rid]
+            if not whole:  # by start: the ones ending after the window opens
+                rows = rows[: bisect_left(rows, t.deadline, key=lambda a: a.start)]
+                rows = [a for a in rows if a.end > t.earliest_start]
+            hood.update(a.task_id for a in rows)
+    return hood
+
+
+@app.post("/insert")
+def insert(req: InsertRequest, request: Request, store: bool = False):
+    """
+    Slot `new_tasks` into an existing plan without disturbing it: each new
+    task (earliest deadline first) goes into the earliest common gap of an
+    eligible worker/machine pair. Tasks that fit nowhere before their
+    deadline escalate to a CP-SAT re-solve (repair_solve()) of the new
+    tasks and the planned tasks around the conflict, the rest of the plan
+    held as busy time: first the planned tasks overlapping a late task's
+    window on its eligible resources, then everything on those resources.
+    """
+    mark_parsed()
+    prev = {a.task_id: a for a in req.previous_assignments}
+    unplanned = [t.id for t in req.tasks if t.id not in prev]
+    if unplanned:
+        raise HTTPException(
+            422,
+            {"message": "Tasks without a previous assignment", "task_ids": unplanned},
+        )
+    known = {t.id for t in req.tasks}
+    dup = [t.id for t in req.new_tasks if t.id in known]
+    if dup or len({t.id for t in req.new_tasks}) < len(req.new_tasks):
+        raise HTTPException(
+            422, {"message": "New task ids must be unique", "task_ids": dup}
+        )
+    plan = [prev[t.id] for t in req.tasks]
+
+    wb, mb = busy_maps(req)
+    with span("insert"):
+        w_line, w_booked = occupancy(req.workers, wb, plan, "worker_id")
+        m_line, m_booked = occupancy(req.machines, mb, plan, "machine_id")
+        w_index = eligibility_index(req.workers)
+        m_index = eligibility_index(req.machines)
+        placed: Dict[str, Assignment] = {}
+        late: List[Task] = []
+        for t in sorted(req.new_tasks, key=lambda t: (t.deadline, t.earliest_start)):
+            ws, ms = w_index.get(t.type, []), m_index.get(t.type, [])
+            if ws and ms:
+                s, w_id, m_id = earliest_pair(t, ws, ms, w_line, m_line)
+                if s + t.duration <= t.deadline:
+                    w_line[w_id].book(s, s + t.duration)
+                    m_line[m_id].book(s, s + t.duration)
+                    placed[t.id] = Assignment(
+                        task_id=t.id,
+                        worker_id=w_id,
+                        machine_id=m_id,
+                        start=s,
+                        end=s + t.duration,
+                    )
+                    continue
+            late.append(t)
+
+    hood: Set[str] = set()
+    if late:
+        error = HTTPException(422, "No feasible schedule")
+        for whole in (False, True):
+            hood = neighbourhood(late, w_index, w_booked, whole)
+            hood |= neighbourhood(late, m_index, m_booked, whole)
+            sub_wb, sub_mb = (
+                {
+                    rid: merge_busy_windows(
+                        [
+                            *busy.get(rid, ()),
+                            *((a.start, a.end) for a in rows if a.task_id not in hood),
+                        ]
+                    )
+                    for rid, rows in booked.items()
+                }
+                for busy, booked in ((wb, w_booked), (mb, m_booked))
+            )
+            part = ScheduleRequestBW.model_construct(
+                workers=req.workers,
+                machines=req.machines,
+                tasks=[t for t in req.tasks if t.id in hood] + list(req.new_tasks),
+            )
+            try:
+                solved = repair_solve(
+                    part, sub_wb, sub_mb, {**prev, **placed}, set(), req.time_limit
+                )
+            except HTTPException as e:
+                error = e
+                continue
+            placed = {a["task_id"]: Assignment(**a) for a in solved["assignments"]}
+            break
+        else:
+            raise error
+
+    assignments = [
+        asdict(placed.get(t.id) or prev[t.id]) for t in (*req.tasks, *req.new_tasks)
+    ]
+    result = {
+        "makespan": max((a["end"] for a in assignments), default=0),
+        "assignments": assignments,
+        "engine": "cp-sat" if late else "gap",
+        "neighbourhood": len(hood),
+        "changed": moved(assignments, prev),
+    }
+    return encode_response(request, keep(result, store))
+
+
+# ---------- plan validation ----------
+def validate_plan(
+    req: ScheduleRequest | ScheduleRequestBW,
+    assignments: List[Assignment],
+    worker_busy: Dict[str, List[Tuple[int, int]]] | None = None,
+    machine_busy: Dict[str, List[Tuple[int, int]]] | None = None,
+) -> Dict[str, Any]:
+    """
+    Check a plan against its instance and report every violation:
+    - each task is assigned exactly once, to a known worker and machine;
+    - both are eligible for the task's type;
+    - the task runs for its duration within [earliest_start, deadline];
+    - no two tasks overlap on a worker or machine;
+    - no task overlaps a busy window of its worker or machine.
+    A zero-length task overlaps nothing.
+    Busy windows (merged, as busy_maps() returns them) default to the
+    request's own. Alongside the violations
+    comes the makespan and each resource's utilisation: booked time over
+    its free time in [0, makespan].
+
+    Vectorised over the assignments, O(n log n): overlaps are a sort and
+    sweep per resource (one lexsort over all of them, keyed by resource),
+    and busy windows are found by binary search.
+    """
+    if worker_busy is None and machine_busy is None:
+        if isinstance(req, ScheduleRequestBW):
+            worker_busy, machine_busy = busy_maps(req)
+    worker_busy, machine_busy = worker_busy or {}, machine_busy or {}
+    cols = TaskColumns(req.tasks)
+    n = len(assignments)
+    t_pos = {tid: k for k, tid in enumerate(cols.ids.tolist())}
+    task_ids = [a.task_id for a in assignments]
+    tk = np.fromiter((t_pos.get(tid, -1) for tid in task_ids), np.int64, n)
+    start = np.fromiter((a.start for a in assignments), np.int64, n)
+    end = np.fromiter((a.end for a in assignments), np.int64, n)
+    violations: List[Dict[str, Any]] = []
+
+    # 1. coverage
+    for i in np.flatnonzero(tk < 0).tolist():
+        violations.append({"check": "unknown_task", "task_id": task_ids[i]})
+    known = tk >= 0
+    counts = np.bincount(tk[known], minlength=len(req.tasks))
+    for k in np.flatnonzero(counts != 1).tolist():
+        check = "unassigned_task" if counts[k] == 0 else "duplicate_assignment"
+        violations.append(
+            {"check": check, "task_id": cols.ids[k], "count": int(counts[k])}
+        )
+
+    # 2. duration and window
+    kt = tk[known]
+    rows = np.flatnonzero(known)
+    for check, bad in (
+        ("wrong_duration", end[known] - start[known] != cols.dur[kt]),
+        ("before_earliest_start", start[known] < cols.es[kt]),
+        ("after_deadline", end[known] > cols.dl[kt]),
+    ):
+        for i in rows[bad].tolist():
+            k = tk[i]
+            violations.append(
+                {
+                    "check": check,
+                    "task_id": task_ids[i],
+                    "start": int(start[i]),
+                    "end": int(end[i]),
+                    "duration": int(cols.dur[k]),
+                    "earliest_start": int(cols.es[k]),
+                    "deadline": int(cols.dl[k]),
+                }
+            )
+
+    # resource-local times: resource i's span is [i * width, (i + 1) * width)
+    makespan = int(end.max()) if n else 0
+    lo = min(int(start.min()) if n else 0, 0)
+    hi = max(makespan, int(start.max()) if n else 0)
+    width = hi - lo + 1
+    utilisation: Dict[str, Dict[str, float]] = {}
+    for kind, resources, busy in (
+        ("worker", req.workers, worker_busy),
+        ("machine", req.machines, machine_busy),
+    ):
+        key = f"{kind}_id"
+        r_ids = [r.id for r in resources]
+        r_pos = {rid: i for i, rid in enumerate(r_ids)}
+        names = [getattr(a, key) for a in assignments]
+        rk = np.fromiter((r_pos.get(rid, -1) for rid in names), np.int64, n)
+
+        # 3. known and eligible
+        for i in np.flatnonzero(rk < 0).tolist():
+            violations.append(
+                {"check": f"unknown_{kind}", "task_id": task_ids[i], key: names[i]}
+            )
+        elig = np.zeros((len(resources), len(cols.types)), dtype=bool)
+        for i, r in enumerate(resources):
+            for ty in r.types:
+                if ty in cols.code:
+                    elig[i, cols.code[ty]] = True
+        both = known & (rk >= 0)
+        rows = np.flatnonzero(both)
+        for i in rows[~elig[rk[both], cols.tc[tk[both]]]].tolist():
+            violations.append(
+                {
+                    "check": f"ineligible_{kind}",
+                    "task_id": task_ids[i],
+                    key: names[i],
+                    "type": cols.types[cols.tc[tk[i]]],
+                }
+            )
+
+        # 4. overlaps: sort by (resource, start), sweep the running max end;
+        # zero-length tasks occupy nothing, as in the solver's NoOverlap
+        rows = np.flatnonzero((rk >= 0) & (end != start))
+        ks = rk[rows] * width + (start[rows] - lo)
+        ke = rk[rows] * width + (end[rows] - lo)
+        order = np.argsort(ks, kind="stable")
+        rows, ks, ke = rows[order], ks[order], ke[order]
+        reach = np.maximum.accumulate(ke) if len(ke) else ke
+        holder = np.maximum.accumulate(np.where(ke == reach, np.arange(len(ke)), 0))
+        for j in np.flatnonzero(ks[1:] < reach[:-1]).tolist():
+            i, other = rows[j + 1], rows[holder[j]]
+            violations.append(
+                {
+                    "check": f"{kind}_overlap",
+                    key: names[i],
+                    "task_id": task_ids[i],
+                    "other_task_id": task_ids[other],
+                }
+            )
+
+        # 5. busy windows, clipped to the plan's span so they stay local
+        spans = [
+            np.asarray(busy.get(rid, ()), np.int64).reshape(-1, 2) for rid in r_ids
+        ]
+        owner = np.repeat(np.arange(len(r_ids)), [len(w) for w in spans])
+        b = np.column_stack(
+            [owner, np.concatenate([np.empty((0, 2), np.int64), *spans])]
+        )
+        b = b[(b[:, 2] > lo) & (b[:, 1] <= hi)]
+        bs = b[:, 0] * width + (np.maximum(b[:, 1], lo) - lo)
+        be = b[:, 0] * width + (np.minimum(b[:, 2], hi + 1) - lo)
+        j = np.searchsorted(be, ks, side="right")  # first window ending after start
+        hit = j < len(be)
+        hit[hit] = bs[j[hit]] < ke[hit]
+        for i, w in zip(rows[hit].tolist(), j[hit].tolist()):
+            violations.append(
+                {
+                    "check": f"{kind}_busy",
+                    key: names[i],
+                    "task_id": task_ids[i],
+                    "window": [int(b[w, 1]), int(b[w, 2])],
+                }
+            )
+
+        # utilisation over [0, makespan]
+        booked = np.bincount(rk[rk >= 0], weights=end[rk >= 0] - start[rk >= 0])
+        booked = np.r_[booked, np.zeros(len(resources) - len(booked))]
+        blocked = np.zeros(len(resources))
+        inside = np.clip(b[:, 1:], 0, makespan)
+        np.add.at(blocked, b[:, 0], inside[:, 1] - inside[:, 0])
+        free = np.maximum(makespan - blocked, 1)
+        utilisation[f"{kind}s"] = {
+            rid: round(float(u), 4) for rid, u in zip(r_ids, booked / free)
+        }
+
+    return {
+        "valid": not violations,
+        "violations": violations,
+        "makespan": makespan,
+        "utilisation": utilisation,
+    }
+
+
+@app.post("/validate")
+def validate(req: ValidateRequest, request: Request):
+    """Check a plan from any source, see validate_plan()."""
+    mark_parsed()
+    busy = busy_maps(req)
+    with span("validate"):
+        report = validate_plan(req, req.assignments, *busy)
+    return encode_response(request, report)
+
+
+# ---------- batch solving: NDJSON in, NDJSON out ----------
+def solve_payload(index: int, line: str | bytes, time_limit: float, num_workers=1):
+    """
+    Solve one NDJSON line (a ScheduleRequest or ScheduleRequestBW). Runs in
+    a pool process; never raises, so one bad line cannot sink the batch.
+    """
+    try:
+        req = ScheduleRequestBW.model_validate_json(line)
+    except ValueError as e:
+        return {"index": index, "status": "INVALID", "error": str(e)}
+    busy = busy_maps(req)
+    pre = precheck(req, *busy)
+    if pre.reasons:
+        return {"index": index, "status": "INFEASIBLE", "reasons": pre.reasons}
+    options = SolveOptions(time_limit=time_limit, num_workers=num_workers)
+    status, result = run_solve(req, *busy, options, pre)
+    if result is None:
+        return {"index": index, "status": status, "error": "No feasible schedule"}
+    return {"index": index, "status": status, **result}
+
+
+async def batch_results(
+    lines: AsyncIterator[bytes],
+    pool,
+    time_limit: float,
+    inflight: int,
+    num_workers: int = 1,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Feed lines to `pool` and yield results in completion order. At most
+    `inflight` instances are held at once, so memory stays bounded however
+    long the input is. Blank lines are skipped but still consume an index.
+    """
+    loop = asyncio.get_running_loop()
+    pending: set = set()
+    index = -1
+    async for line in lines:
+        index += 1
+        if not line.strip():
+            continue
+        pending.add(
+            loop.run_in_executor(
+                pool, solve_payload, index, line, time_limit, num_workers
+            )
+        )
+        if len(pending) >= inflight:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+        else:
+            done = {f for f in pending if f.done()}
+            pending -= done
+        for f in done:
+            yield f.result()
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for f in done:
+            yield f.result()
+
+
+_batch_pool: Optional[ProcessPoolExecutor] = None
+
+
+@app.post("/batch")
+async def batch(request: Request, time_limit: float = Query(SOLVE_TIME_LIMIT, gt=0)):
+    """
+    Body: one scheduling request per line (NDJSON). Response: one result per
+    line, in completion order, tagged with the 0-based input line `index`.
+    """
+    global _batch_pool
+    if _batch_pool is None:
+        _batch_pool = ProcessPoolExecutor(max_workers=JOB_WORKERS)
+    time_limit = min(time_limit, MAX_TIME_LIMIT)
+    num_workers = max(1, CPU_CORES // JOB_WORKERS)
+
+    # the response stream competes with request.stream() for ASGI messages,
+    # so spool the body first (to disk beyond 8 MB) and read lines from there
+    body = tempfile.SpooledTemporaryFile(max_size=8 << 20)
+    async for chunk in request.stream():
+        body.write(chunk)
+    body.seek(0)
+
+    async def body_lines():
+        for line in body:
+            yield line
+        body.close()
+
+    async def stream():
+        async for res in batch_results(
+            body_lines(), _batch_pool, time_limit, BATCH_INFLIGHT, num_workers
+        ):
+            yield json.dumps(res) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+# ---------- startup: warm-up, readiness, prefork workers ----------
+ready = threading.Event()
+WARMUP_INSTANCE = {
+    "workers": [
+        {"id": "w1", "types": ["A", "B"], "busy_windows": [(0, 2)]},
+        {"id": "w2", "types": ["B"], "busy_windows": []},
+    ],
+    "machines": [
+        {"id": "m1", "types": ["A"], "busy_windows": []},
+        {"id": "m2", "types": ["A", "B"], "busy_windows": [(3, 4)]},
+    ],
+    "tasks": [
+        {"id": "t1", "type": "A", "duration": 2, "earliest_start": 0, "deadline": 20},
+        {"id": "t2", "type": "A", "duration": 3, "earliest_start": 1, "deadline": 20},
+        {"id": "t3", "type": "B", "duration": 2, "earliest_start": 0, "deadline": 20},
+        {"id": "t4", "type": "B", "duration": 1, "earliest_start": 2, "deadline": 20},
+    ],
+}
+
+
+def warm_up() -> None:
+    """
+    Run a tiny instance through the path of a first /schedule_with_busy:
+    validation, precheck, heuristic, model build, CP-SAT search, plan
+    extraction and encoding. The first solve in a process otherwise pays
+    for lazy initialisation in OR-Tools and pydantic. Bypasses the cache
+    and the solver metrics; sets `ready` even if it fails, as it only saves
+    time.
+    """
+    t0 = time.monotonic()
+    if WARMUP:
+        try:
+            req = ScheduleRequestBW.model_validate(WARMUP_INSTANCE)
+            wb, mb = busy_maps(req)
+            pre = precheck(req, wb, mb)
+            plan = heuristic_plan(req, wb, mb)
+            sm = build_model(req, wb, mb, pre.bounds)
+            add_hint(sm, plan)
+            solver = cp_model.CpSolver()
+            SolveOptions(num_workers=1).apply(solver, time.monotonic() + 5)
+            if solver.Solve(sm.mdl) in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                dumps(extract_plan(req, sm, solver))
+        except Exception:
+            log.exception("warm-up solve failed")
+    metrics.set("scheduler_warmup_seconds", time.monotonic() - t0)
+    ready.set()
+
+
+@app.get("/health")
+def health():
+    """Liveness: the process serves requests."""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+def readiness():
+    """Readiness: 503 until warm_up() has run."""
+    if not ready.is_set():
+        raise HTTPException(503, "Warming up", headers={"Retry-After": "1"})
+    return {"status": "ready"}
+
+
+def serve(host: str, port: int, workers: int) -> None:
+    """
+    Import and warm up once, then fork `workers` uvicorn processes that
+    share the listening socket and inherit the loaded modules (copy-on-write)
+    and the warm state, so each is ready as it starts. `uvicorn --workers`
+    spawns fresh interpreters that import and warm up one by one. A child
+    that dies is replaced; SIGTERM or SIGINT stops them all.
+    """
+    import signal, socket
+    import uvicorn
+
+    warm_up()
+    config = uvicorn.Config(app, host=host, port=port, log_level="warning")
+    sock = config.bind_socket()
+    # accepted connections inherit it; without, small responses wait on
+    # delayed ACKs (~40 ms) when uvicorn serves a socket it did not open
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    if workers <= 1:
+        uvicorn.Server(config).run(sockets=[sock])
+        return
+
+    def fork() -> int:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            uvicorn.Server(config).run(sockets=[sock])
+            os._exit(0)
+        return pid
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            with suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+    children = {fork() for _ in range(workers)}
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while children:
+        pid, _ = os.wait()
+        children.discard(pid)
+        if not stopping:
+            log.warning(f"worker {pid} exited; starting a new one")
+            children.add(fork())
+
+
+if __name__ == "__main__":
+    import argparse
+
+    p = argparse.ArgumentParser(description="prefork scheduler server")
+    p.add_argument("--host", default="0.0.0.0")
+    p.add_argument("--port", type=int, default=8000)
+    p.add_argument("--workers", type=int, default=WEB_WORKERS)
+    a = p.parse_args()
+    serve(a.host, a.port, a.workers)
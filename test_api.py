@@ -0,0 +1,962 @@
+# test_api.py  – the HTTP endpoints through FastAPI's TestClient
+import json, queue, random, threading, time
+from typing import Any, Dict, List, Tuple
+from xml.etree import ElementTree
+
+import httpx
+import msgpack
+import pytest
+
+import server
+from server import ValidateRequest, busy_maps, validate_plan
+
+NO_CACHE = {"cache-control": "no-cache"}
+
+
+# ---------- instances ----------
+def payload(tasks=30, horizon=200, seed=0, busy=1) -> Dict[str, Any]:
+    """Three workers and machines over types A and B, releases spread out."""
+    rng = random.Random(seed)
+    resources = [
+        dict(id=f"{kind}{i}", types=types, busy_windows=[])
+        for kind in "wm"
+        for i, types in enumerate((["A"], ["B"], ["A", "B"]))
+    ]
+    for r in resources:
+        for _ in range(busy):
+            s = rng.randrange(horizon)
+            r["busy_windows"].append([s, s + rng.randint(1, 4)])
+    rows = []
+    for i in range(tasks):
+        es = rng.randrange(horizon)
+        rows.append(
+            dict(
+                id=f"t{i}",
+                type=rng.choice("AB"),
+                duration=rng.randint(1, 6),
+                earliest_start=es,
+                deadline=es + 40,
+            )
+        )
+    return dict(workers=resources[:3], machines=resources[3:], tasks=rows)
+
+
+def empty() -> Dict[str, Any]:
+    return {**payload(0), "tasks": []}
+
+
+def assert_valid(body: Dict[str, Any], result: Dict[str, Any]) -> None:
+    req = ValidateRequest(**body, assignments=result["assignments"])
+    report = validate_plan(req, req.assignments, *busy_maps(req))
+    assert report["violations"] == []
+    assert report["makespan"] == result["makespan"]
+
+
+# ---------- rolling horizon ----------
+def test_rolling_solves_in_windows(client):
+    body = payload()
+    r = client.post("/schedule_with_busy?mode=rolling&window=50&overlap=10", json=body)
+    assert r.status_code == 200
+    result = r.json()
+    assert_valid(body, result)
+    assert len(result["windows"]) > 1
+    assert sum(w["committed"] for w in result["windows"]) == len(body["tasks"])
+    assert result["bound"] <= result["makespan"]
+
+
+def test_rolling_empty(client):
+    r = client.post("/schedule_with_busy?mode=rolling", json=empty())
+    assert r.status_code == 200
+    result = r.json()
+    assert (result["makespan"], result["assignments"]) == (0, [])
+    assert result["windows"] == [] and result["solve_status"] == "OPTIMAL"
+
+
+def test_rolling_rejects_overlap_not_below_window(client):
+    r = client.post(
+        "/schedule_with_busy?mode=rolling&window=5&overlap=5", json=payload()
+    )
+    assert r.status_code == 422
+
+
+# ---------- coordinator mode ----------
+# Cluster.post passes a timeout, which the test client warns about
+peer_timeout = pytest.mark.filterwarnings("ignore:You should not use the 'timeout'")
+
+
+@pytest.fixture
+def cluster(client, monkeypatch):
+    """A one-peer cluster whose peer is this app, through the test client."""
+    c = server.Cluster(["http://testserver"], 2, 1)
+    c._client = client
+    monkeypatch.setattr(server, "cluster", c)
+    return c
+
+
+def test_distributed_without_peers(client, monkeypatch):
+    monkeypatch.setattr(server, "cluster", server.Cluster([], 2, 1))
+    r = client.post("/schedule_with_busy?mode=distributed", json=payload())
+    assert r.status_code == 503
+
+
+@peer_timeout
+@pytest.mark.parametrize("split", ["components", "time"])
+def test_distributed_merges_peer_plans(client, cluster, split):
+    body = payload(40)
+    r = client.post(
+        f"/schedule_with_busy?mode=distributed&split={split}&window=10",
+        json=body,
+        headers=NO_CACHE,
+    )
+    assert r.status_code == 200
+    result = r.json()
+    assert_valid(body, result)
+    assert result["split"] == split
+    assert split == "components" or len(result["parts"]) > 1
+    assert sum(p["tasks"] for p in result["parts"]) + result["straddlers"] == 40
+
+
+@peer_timeout
+def test_distributed_empty(client, cluster):
+    r = client.post("/schedule_with_busy?mode=distributed&split=time", json=empty())
+    assert r.status_code == 200
+    assert (r.json()["makespan"], r.json()["assignments"]) == (0, [])
+
+
+def test_distributed_peer_without_json_body(client, cluster):
+    cluster._client = httpx.Client(
+        transport=httpx.MockTransport(lambda _: httpx.Response(404, text="<html/>"))
+    )
+    r = client.post("/schedule_with_busy?mode=distributed", json=payload())
+    assert r.status_code == 502
+    assert "HTTP 404 with a non-JSON body" in r.json()["detail"]
+
+
+# ---------- background jobs ----------
+def wait_for_job(client, job_id: str, timeout: float = 30) -> Dict[str, Any]:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} still {job['status']}")
+
+
+def test_job_solves_and_streams_events(client):
+    body = payload()
+    r = client.post("/jobs?time_limit=5", json=body)
+    assert r.status_code == 202
+    job = wait_for_job(client, r.json()["job_id"])
+    assert job["status"] == "done" and job["solutions"] >= 1
+    assert_valid(body, job)
+
+    with client.stream("GET", f"/jobs/{job['job_id']}/events") as events:
+        kinds = [l[7:] for l in events.iter_lines() if l.startswith("event: ")]
+    assert kinds[-2:] == ["end", "status"] and "solution" in kinds
+
+
+def test_job_empty_and_infeasible(client):
+    job = wait_for_job(client, client.post("/jobs", json=empty()).json()["job_id"])
+    assert (job["status"], job["makespan"], job["assignments"]) == ("done", 0, [])
+
+    body = payload(3)
+    body["tasks"][0]["deadline"] = body["tasks"][0]["earliest_start"]
+    job = wait_for_job(client, client.post("/jobs", json=body).json()["job_id"])
+    assert job["status"] == "infeasible"
+    assert job["reasons"][0]["check"] == "window_too_short"
+
+
+def test_job_unknown(client):
+    assert client.get("/jobs/nope").status_code == 404
+    assert client.delete("/jobs/nope").status_code == 404
+
+
+def test_job_cancelled_before_it_starts():
+    # the pool can dequeue a job after DELETE, when its future can no longer
+    # be cancelled: solve_job itself must give up without solving
+    events, cancel = queue.Queue(), threading.Event()
+    cancel.set()
+    server.solve_job(payload(), events, cancel)
+    assert events.get_nowait() == {"event": "cancelled"}
+    assert events.empty()
+
+
+def test_job_cancel_while_running(client):
+    body = payload(120, horizon=100, busy=0)
+    job_id = client.post("/jobs?time_limit=30", json=body).json()["job_id"]
+    t0 = time.monotonic()
+    while client.get(f"/jobs/{job_id}").json()["status"] == "queued":
+        time.sleep(0.02)
+    assert client.delete(f"/jobs/{job_id}").status_code == 200
+    job = wait_for_job(client, job_id)
+    assert job["status"] == "cancelled"
+    assert time.monotonic() - t0 < 15
+
+
+# ---------- resource pools ----------
+def test_pool_lifecycle(client):
+    body = payload()
+    spec = {"workers": body["workers"], "machines": body["machines"]}
+    assert client.put("/pools/lifecycle", json=spec).json()["version"] == 1
+    assert {"pool_id": "lifecycle", "version": 1, "workers": 3, "machines": 3} in (
+        client.get("/pools").json()
+    )
+    full = client.get("/pools/lifecycle").json()
+    assert [w["id"] for w in full["workers"]] == ["w0", "w1", "w2"]
+
+    change = {"machines": [dict(id="m9", types=["A"])], "remove_workers": ["w0"]}
+    pool = client.patch("/pools/lifecycle", json=change).json()
+    assert (pool["version"], pool["workers"], pool["machines"]) == (2, 2, 4)
+
+    assert client.delete("/pools/lifecycle").status_code == 200
+    assert client.get("/pools/lifecycle").status_code == 404
+    assert client.patch("/pools/lifecycle", json=change).status_code == 404
+
+
+def test_pool_schedule_matches_a_full_request(client, monkeypatch):
+    body = payload()
+    spec = {"workers": body["workers"], "machines": body["machines"]}
+    client.put("/pools/solve", json=spec)
+
+    seen = []
+    index = server.eligibility_index
+    monkeypatch.setattr(
+        server, "eligibility_index", lambda rs: seen.append(type(rs)) or index(rs)
+    )
+    r = client.post(
+        "/pools/solve/schedule?seed=1", json={"tasks": body["tasks"]}, headers=NO_CACHE
+    )
+    assert r.status_code == 200 and r.headers["x-pool-version"] == "1"
+    assert_valid(body, r.json())
+    assert seen and set(seen) == {server.Roster}  # the cached indexes only
+
+    full = client.post("/schedule_with_busy?seed=1", json=body, headers=NO_CACHE)
+    assert full.json()["makespan"] == r.json()["makespan"]
+
+
+def test_pool_schedule_edges(client):
+    body = payload()
+    spec = {"workers": body["workers"], "machines": body["machines"]}
+    client.put("/pools/edges", json=spec)
+    r = client.post("/pools/edges/schedule", json={"tasks": []})
+    assert r.status_code == 200 and r.json()["assignments"] == []
+    r = client.post("/pools/edges/schedule", json={"tasks": [], "version": 7})
+    assert r.status_code == 409 and r.json()["detail"]["version"] == 1
+    assert client.post("/pools/nope/schedule", json={"tasks": []}).status_code == 404
+
+
+# ---------- re-scheduling ----------
+def solved(client, body: Dict[str, Any]) -> Dict[str, Any]:
+    r = client.post("/schedule_with_busy", json=body, headers=NO_CACHE)
+    assert r.status_code == 200
+    return r.json()
+
+
+def test_reschedule_keeps_an_optimal_plan(client):
+    body = payload()
+    prev = solved(client, body)
+    r = client.post(
+        "/reschedule", json={**body, "previous_assignments": prev["assignments"]}
+    )
+    assert r.status_code == 200
+    result = r.json()
+    assert_valid(body, result)
+    assert result["makespan"] == prev["makespan"] and result["changed"] == 0
+
+
+def test_reschedule_after_a_change_respects_frozen_tasks(client):
+    body = payload()
+    prev = solved(client, body)["assignments"]
+    by_start = sorted(prev, key=lambda a: a["start"])
+    last = by_start[-1]["task_id"]
+    next(t for t in body["tasks"] if t["id"] == last)["duration"] += 3
+    frozen = {a["task_id"] for a in by_start[:5]}
+    r = client.post(
+        "/reschedule",
+        json={
+            **body,
+            "previous_assignments": prev,
+            "frozen": [by_start[0]["task_id"], "not-a-task"],
+            "freeze_before": by_start[4]["start"] + 1,
+        },
+    )
+    assert r.status_code == 200
+    result = r.json()
+    assert_valid(body, result)
+    assert result["frozen"] >= len(frozen)
+    kept = {a["task_id"]: a for a in result["assignments"]}
+    assert all(kept[a["task_id"]] == a for a in by_start[:5])
+
+
+def test_reschedule_edges(client):
+    r = client.post("/reschedule", json={**empty(), "previous_assignments": []})
+    assert r.status_code == 200 and r.json()["assignments"] == []
+    body = {**payload(), "previous_assignments": []}
+    assert client.post("/reschedule", json={**body, "time_limit": 0}).status_code == 422
+    body["tasks"][0]["deadline"] = body["tasks"][0]["earliest_start"]
+    r = client.post("/reschedule", json=body)
+    assert r.status_code == 422 and r.json()["detail"]["reasons"]
+
+
+# ---------- batch solving ----------
+def test_batch_streams_one_result_per_line(client):
+    bodies = [payload(10, seed=s) for s in range(3)]
+    infeasible = payload(3)
+    infeasible["tasks"][0]["deadline"] = infeasible["tasks"][0]["earliest_start"]
+    lines = [json.dumps(b) for b in bodies] + ["", "{not json", json.dumps(infeasible)]
+    r = client.post("/batch?time_limit=5", content="\n".join(lines) + "\n")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    results = {x["index"]: x for x in map(json.loads, r.text.splitlines())}
+    assert sorted(results) == [0, 1, 2, 4, 5]  # the blank line keeps its index
+    for i, body in enumerate(bodies):
+        assert results[i]["status"] in ("OPTIMAL", "FEASIBLE")
+        assert_valid(body, results[i])
+    assert results[4]["status"] == "INVALID"
+    assert results[5]["status"] == "INFEASIBLE"
+    assert results[5]["reasons"][0]["check"] == "window_too_short"
+
+
+def test_batch_edges(client):
+    r = client.post("/batch", content=b"")
+    assert r.status_code == 200 and r.text == ""
+    (line,) = client.post("/batch", content=json.dumps(empty())).text.splitlines()
+    assert json.loads(line)["assignments"] == []
+    assert client.post("/batch?time_limit=0", content=b"").status_code == 422
+
+
+# ---------- time coarsening ----------
+def scaled(body: Dict[str, Any], k: int, jitter: int = 0) -> Dict[str, Any]:
+    """All times times k; with jitter, deadlines move up to that much later."""
+    rng = random.Random(k)
+    body = json.loads(json.dumps(body))
+    for r in body["workers"] + body["machines"]:
+        r["busy_windows"] = [[s * k, e * k] for s, e in r["busy_windows"]]
+    for t in body["tasks"]:
+        for key in ("duration", "earliest_start", "deadline"):
+            t[key] *= k
+        t["deadline"] += rng.randint(0, jitter)
+    return body
+
+
+def test_coarse_exact_scale(client):
+    body = payload()
+    fine = client.post("/schedule_with_busy", json=scaled(body, 10), headers=NO_CACHE)
+    r = client.post("/schedule_with_busy?mode=coarse", json=scaled(body, 10))
+    assert r.status_code == 200
+    result = r.json()
+    assert_valid(scaled(body, 10), result)
+    assert (result["scale"], result["coarse_makespan"]) == (10, result["makespan"])
+    assert result["makespan"] == fine.json()["makespan"]
+
+
+def test_coarse_rounded_scale_refines(client):
+    body = scaled(payload(), 12, jitter=5)
+    r = client.post("/schedule_with_busy?mode=coarse&scale=4&time_limit=4", json=body)
+    assert r.status_code == 200
+    result = r.json()
+    assert_valid(body, result)
+    assert result["scale"] == 4 and result["coarse_makespan"] is not None
+    assert result["makespan"] <= result["coarse_makespan"]
+
+
+def test_coarse_edges(client):
+    r = client.post("/schedule_with_busy?mode=coarse", json=empty())
+    assert r.status_code == 200 and r.json()["assignments"] == []
+    r = client.post("/schedule_with_busy?mode=coarse&scale=0", json=payload())
+    assert r.status_code == 422
+
+
+# ---------- urgent-task insertion ----------
+def test_insert_into_a_gap(client):
+    body = payload()
+    prev = solved(client, body)
+    new = [dict(id="u1", type="A", duration=2, earliest_start=0, deadline=10_000)]
+    r = client.post(
+        "/insert",
+        json={**body, "previous_assignments": prev["assignments"], "new_tasks": new},
+    )
+    assert r.status_code == 200
+    result = r.json()
+    assert_valid({**body, "tasks": body["tasks"] + new}, result)
+    assert (result["engine"], result["changed"], result["neighbourhood"]) == (
+        "gap",
+        0,
+        0,
+    )
+
+
+def test_insert_escalates_to_a_local_resolve(client):
+    body = dict(
+        workers=[dict(id="w", types=["A"])],
+        machines=[dict(id="m", types=["A"])],
+        tasks=[
+            dict(id="t1", type="A", duration=5, earliest_start=0, deadline=20),
+            dict(id="t2", type="A", duration=5, earliest_start=30, deadline=40),
+        ],
+    )
+    prev = [
+        dict(task_id="t1", worker_id="w", machine_id="m", start=0, end=5),
+        dict(task_id="t2", worker_id="w", machine_id="m", start=30, end=35),
+    ]
+    new = [dict(id="u", type="A", duration=5, earliest_start=0, deadline=5)]
+    r = client.post(
+        "/insert", json={**body, "previous_assignments": prev, "new_tasks": new}
+    )
+    assert r.status_code == 200
+    result = r.json()
+    assert_valid({**body, "tasks": body["tasks"] + new}, result)
+    assert (result["engine"], result["neighbourhood"], result["changed"]) == (
+        "cp-sat",
+        1,
+        1,
+    )
+    assert result["assignments"][1] == prev[1]  # outside the neighbourhood
+
+
+def test_insert_edges(client):
+    r = client.post(
+        "/insert", json={**empty(), "previous_assignments": [], "new_tasks": []}
+    )
+    assert r.status_code == 200 and r.json()["assignments"] == []
+
+    body = payload(3)
+    prev = solved(client, body)["assignments"]
+    urgent = dict(id="u", type="A", duration=3, earliest_start=0, deadline=2)
+    for change, detail in (
+        (dict(previous_assignments=prev[1:]), "Tasks without a previous assignment"),
+        (dict(new_tasks=[{**urgent, "id": "t0"}]), "New task ids must be unique"),
+        (dict(new_tasks=[urgent, urgent]), "New task ids must be unique"),
+    ):
+        req = {**body, "previous_assignments": prev, "new_tasks": [], **change}
+        r = client.post("/insert", json=req)
+        assert r.status_code == 422 and r.json()["detail"]["message"] == detail
+
+    req = {**body, "previous_assignments": prev, "new_tasks": [urgent]}
+    assert client.post("/insert", json=req).status_code == 422  # cannot fit
+    bad = [{**prev[0], "worker_id": "nobody"}, *prev[1:]]
+    req = {**body, "previous_assignments": bad, "new_tasks": []}
+    assert client.post("/insert", json=req).status_code == 422
+
+
+# ---------- schedule store ----------
+def stored(client, body: Dict[str, Any]) -> Dict[str, Any]:
+    r = client.post("/schedule_with_busy?store=true", json=body, headers=NO_CACHE)
+    assert r.status_code == 200 and r.json()["schedule_id"]
+    return r.json()
+
+
+def test_store_lookups(client):
+    result = stored(client, payload(60))
+    sid, plan = result["schedule_id"], result["assignments"]
+    info = client.get(f"/schedules/{sid}").json()
+    assert (info["makespan"], info["tasks"]) == (result["makespan"], 60)
+
+    def rows(**params):
+        r = client.get(
+            f"/schedules/{sid}/assignments", params={"limit": 1000, **params}
+        )
+        assert r.status_code == 200 and r.json()["next"] is None
+        return r.json()["assignments"]
+
+    by_start = sorted(plan, key=lambda a: (a["start"], a["task_id"]))
+    assert [a["start"] for a in rows()] == [a["start"] for a in by_start]
+    by_task = lambda rows: sorted(rows, key=lambda a: a["task_id"])
+    assert by_task(rows()) == by_task(plan)
+    assert rows(worker_id="w1") == [a for a in rows() if a["worker_id"] == "w1"]
+    assert rows(machine_id="m2", start=50, end=120) == [
+        a
+        for a in rows()
+        if a["machine_id"] == "m2" and a["end"] > 50 and a["start"] < 120
+    ]
+    assert rows(task_id="t7") == [a for a in plan if a["task_id"] == "t7"]
+    assert rows(worker_id="nobody") == []
+
+
+def test_store_pages_and_streams(client):
+    sid = stored(client, payload(60))["schedule_id"]
+    url = f"/schedules/{sid}/assignments"
+    whole = client.get(url, params={"limit": 1000}).json()["assignments"]
+    pages, after = [], None
+    while True:
+        params = {"limit": 7, **({"after": after} if after else {})}
+        page = client.get(url, params=params).json()
+        pages += page["assignments"]
+        after = page["next"]
+        if after is None:
+            break
+    assert pages == whole
+
+    r = client.get(url, params={"limit": 5}, headers={"accept": "application/x-ndjson"})
+    assert [json.loads(l) for l in r.text.splitlines()] == whole
+    assert client.get(url, params={"after": "x.1"}).status_code == 422
+
+
+def test_store_list_delete_and_edges(client):
+    ids = [stored(client, payload(5, seed=s))["schedule_id"] for s in range(3)]
+    listed, after = [], None
+    while True:
+        page = client.get(
+            "/schedules", params={"limit": 2, **({"after": after} if after else {})}
+        ).json()
+        listed += [s["schedule_id"] for s in page["schedules"]]
+        after = page["next"]
+        if after is None:
+            break
+    assert listed[: len(ids)] == ids[::-1]  # newest first
+
+    empty_id = stored(client, empty())["schedule_id"]
+    assert client.get(f"/schedules/{empty_id}").json()["tasks"] == 0
+    page = client.get(f"/schedules/{empty_id}/assignments").json()
+    assert (page["assignments"], page["next"]) == ([], None)
+
+    assert client.delete(f"/schedules/{ids[0]}").json()["deleted"] is True
+    for path in (
+        f"/schedules/{ids[0]}",
+        f"/schedules/{ids[0]}/assignments",
+        "/schedules/nope",
+    ):
+        assert client.get(path).status_code == 404
+
+
+# ---------- Gantt export ----------
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def chart(svg: str) -> Tuple[Dict[str, List[str]], List[str]]:
+    """Row label → bar tooltips, and the time-axis labels."""
+    root = ElementTree.fromstring(svg)
+    rows = {
+        g.find(f"{SVG}text").text: [
+            r.find(f"{SVG}title").text for r in g.iter(f"{SVG}rect")
+        ]
+        for g in root.iter(f"{SVG}g")
+    }
+    ticks = [t.text for t in root.findall(f"{SVG}text") if t.text.isdigit()]
+    return rows, ticks
+
+
+def gantt_plan() -> List[Dict[str, Any]]:
+    return [
+        dict(
+            task_id=f"t{i}",
+            worker_id=f"w{i % 2}",
+            machine_id=f"m{i % 3}",
+            start=4 * i,
+            end=4 * i + 3,
+        )
+        for i in range(6)
+    ]
+
+
+def test_gantt_rows_bars_and_ticks(client):
+    r = client.post("/gantt?width=800", json={"assignments": gantt_plan()})
+    assert r.status_code == 200 and r.headers["content-type"] == "image/svg+xml"
+    rows, ticks = chart(r.text)
+    assert list(rows) == ["Ww0", "Ww1", "Mm0", "Mm1", "Mm2"]
+    assert rows["Ww1"] == ["t1 4–7", "t3 12–15", "t5 20–23"]
+    assert rows["Mm2"] == ["t2 8–11", "t5 20–23"]
+    assert ticks and all(
+        int(b) - int(a) == int(ticks[1]) - int(ticks[0])
+        for a, b in zip(ticks, ticks[1:])
+    )
+
+
+def test_gantt_filters_each_kind_of_row(client):
+    plan = {"assignments": gantt_plan()}
+    rows, _ = chart(client.post("/gantt?worker_id=w1", json=plan).text)
+    assert list(rows) == ["Ww1", "Mm0", "Mm1", "Mm2"]
+    rows, _ = chart(client.post("/gantt?machine_id=m0&machine_id=m2", json=plan).text)
+    assert list(rows) == ["Ww0", "Ww1", "Mm0", "Mm2"]
+    rows, _ = chart(client.post("/gantt?start=9&end=14", json=plan).text)
+    assert rows["Ww1"] == ["t3 12–15"] and rows["Mm2"] == ["t2 8–11"]
+
+
+def test_gantt_short_window_has_integer_ticks(client):
+    _, ticks = chart(
+        client.post("/gantt?start=0&end=3", json={"assignments": gantt_plan()}).text
+    )
+    assert ticks == ["0", "1", "2", "3"]
+
+
+def test_gantt_of_a_stored_plan(client):
+    result = stored(client, payload())
+    posted = client.post("/gantt", json={"assignments": result["assignments"]}).text
+    r = client.get(f"/schedules/{result['schedule_id']}/gantt")
+    assert r.status_code == 200
+    assert {k: sorted(v) for k, v in chart(r.text)[0].items()} == {
+        k: sorted(v) for k, v in chart(posted)[0].items()
+    }
+    inside = [a for a in result["assignments"] if a["end"] > 50 and a["start"] < 60]
+    worker = inside[0]["worker_id"]
+    r = client.get(
+        f"/schedules/{result['schedule_id']}/gantt",
+        params={"start": 50, "end": 60, "worker_id": worker},
+    )
+    rows, _ = chart(r.text)
+    assert [k for k in rows if k[0] == "W"] == [f"W{worker}"]
+    assert {k[1:] for k in rows if k[0] == "M"} == {a["machine_id"] for a in inside}
+
+
+def test_gantt_edges(client):
+    r = client.post("/gantt", json={"assignments": []})
+    assert r.status_code == 200 and chart(r.text)[0] == {}
+    odd = dict(task_id="<a&b>", worker_id='w"', machine_id="m", start=0, end=5)
+    rows, _ = chart(client.post("/gantt", json={"assignments": [odd]}).text)
+    assert rows == {'Ww"': ["<a&b> 0–5"], "Mm": ["<a&b> 0–5"]}
+    assert (
+        client.post("/gantt?start=5&end=5", json={"assignments": []}).status_code == 422
+    )
+    assert client.post("/gantt?width=10", json={"assignments": []}).status_code == 422
+    assert client.get("/schedules/nope/gantt").status_code == 404
+
+
+# ---------- result cache ----------
+def test_cache_hits_reordered_and_renamed_instances(client):
+    body = payload(seed=404)
+    first = client.post("/schedule_with_busy", json=body)
+    assert first.headers["x-cache"] == "MISS"
+    again = client.post("/schedule_with_busy", json=body)
+    assert again.headers["x-cache"] == "HIT"
+    assert again.json()["assignments"] == first.json()["assignments"]
+
+    other = {
+        "workers": [{**w, "id": "x" + w["id"]} for w in body["workers"][::-1]],
+        "machines": [{**m, "id": "y" + m["id"]} for m in body["machines"]],
+        "tasks": [{**t, "id": "z" + t["id"]} for t in body["tasks"][::-1]],
+    }
+    hit = client.post("/schedule_with_busy", json=other)
+    assert hit.headers["x-cache"] == "HIT"
+    assert_valid(other, hit.json())
+    assert hit.json()["makespan"] == first.json()["makespan"]
+
+    fresh = client.post("/schedule_with_busy", json=body, headers=NO_CACHE)
+    assert fresh.headers["x-cache"] == "BYPASS"
+
+
+def test_cache_is_shared_with_schedule(client):
+    body = payload(seed=405, busy=0)
+    for r in body["workers"] + body["machines"]:
+        del r["busy_windows"]
+    assert client.post("/schedule", json=body).headers["x-cache"] == "MISS"
+    assert client.post("/schedule_with_busy", json=body).headers["x-cache"] == "HIT"
+    r = client.post("/schedule_with_busy?mode=heuristic", json=body)
+    assert "x-cache" not in r.headers  # other modes skip the cache
+
+
+# ---------- independent components ----------
+def two_components() -> Dict[str, Any]:
+    """payload() on types A/B, plus a separate group on types C/D."""
+    body = payload(20)
+    body["workers"].append(dict(id="wc", types=["C", "D"]))
+    body["machines"].append(dict(id="mc", types=["C", "D"]))
+    body["tasks"] += [
+        dict(id="c1", type="C", duration=2, earliest_start=0, deadline=3),
+        dict(id="c2", type="D", duration=2, earliest_start=1, deadline=5),
+    ]
+    return body
+
+
+def test_components_solve_separately_and_merge(client):
+    body = two_components()
+    r = client.post("/schedule_with_busy", json=body, headers=NO_CACHE)
+    assert r.status_code == 200
+    assert_valid(body, r.json())
+    alone = {**body, "tasks": body["tasks"][:-2]}
+    assert r.json()["makespan"] == solved(client, alone)["makespan"]
+
+
+def test_an_infeasible_component_sinks_the_instance(client):
+    # each task fits on its own and passes the pre-checks; together they clash
+    body = two_components()
+    body["tasks"][-1]["deadline"] = 3
+    r = client.post("/schedule_with_busy", json=body, headers=NO_CACHE)
+    assert r.status_code == 422 and r.json()["detail"] == "No feasible schedule"
+
+
+# ---------- heuristic mode ----------
+def test_heuristic_mode_returns_a_valid_plan(client):
+    body = payload(seed=606)
+    r = client.post("/schedule_with_busy?mode=heuristic", json=body)
+    assert r.status_code == 200
+    result = r.json()
+    assert result["engine"] == "heuristic"
+    assert result["solve_status"] in ("OPTIMAL", "FEASIBLE")
+    assert result["bound"] <= result["makespan"]
+    assert_valid(body, result)
+
+
+def test_heuristic_mode_edges(client):
+    r = client.post("/schedule_with_busy?mode=heuristic", json=empty())
+    assert r.status_code == 200 and r.json()["assignments"] == []
+    body = payload(3)
+    body["tasks"][0]["duration"] = -1
+    assert (
+        client.post("/schedule_with_busy?mode=heuristic", json=body).status_code == 422
+    )
+    assert (
+        client.post("/schedule_with_busy?mode=greedy", json=payload(3)).status_code
+        == 422
+    )
+
+
+# ---------- metrics ----------
+def scrape(client) -> Dict[str, float]:
+    """Sample name with labels → value, from the text exposition format."""
+    r = client.get("/metrics")
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/plain")
+    rows = [line.rsplit(" ", 1) for line in r.text.splitlines() if line[:1] != "#"]
+    return {k: float(v) for k, v in rows}
+
+
+def test_metrics_count_requests_solves_and_spans(client):
+    client.post("/schedule_with_busy", json=payload(seed=1010), headers=NO_CACHE)
+    client.post("/schedule_with_busy", json=payload(seed=1011), headers=NO_CACHE)
+    before = scrape(client)
+    client.post("/schedule_with_busy", json=payload(seed=1010), headers=NO_CACHE)
+    client.post("/schedule", json={"tasks": []})  # 422: missing fields
+    after = scrape(client)
+
+    ok = 'scheduler_requests_total{code="200",endpoint="/schedule_with_busy"}'
+    bad = 'scheduler_requests_total{code="422",endpoint="/schedule"}'
+    assert after[ok] == before[ok] + 1
+    assert after[bad] == before.get(bad, 0) + 1
+    solves = [k for k in after if k.startswith("scheduler_solves_total{")]
+    assert sum(after[k] - before.get(k, 0) for k in solves) == 1
+    span = 'scheduler_span_seconds_count{span="precheck"}'
+    assert after[span] == before[span] + 1
+    latency = (
+        'scheduler_request_seconds_bucket{endpoint="/schedule_with_busy",le="+Inf"}'
+    )
+    assert after[latency] == before[latency] + 1
+
+
+def test_metrics_count_unmatched_paths(client):
+    client.get("/no-such-endpoint")
+    key = 'scheduler_requests_total{code="404",endpoint="unmatched"}'
+    assert scrape(client)[key] >= 1
+
+
+# ---------- infeasibility pre-checks ----------
+def test_precheck_reasons_reach_the_client(client):
+    body = payload(5)
+    body["tasks"].append(
+        dict(id="late", type="A", duration=9, earliest_start=0, deadline=5)
+    )
+    body["tasks"].append(
+        dict(id="odd", type="Z", duration=1, earliest_start=0, deadline=5)
+    )
+    for path in ("/schedule_with_busy", "/schedule_with_busy?mode=heuristic"):
+        r = client.post(path, json=body)
+        assert r.status_code == 422
+        detail = r.json()["detail"]
+        assert detail["message"] == "No feasible schedule"
+        reasons = detail["reasons"]
+        assert {"check": "window_too_short", "task_ids": ["late"]} in reasons
+        assert {
+            "check": "no_eligible_worker",
+            "type": "Z",
+            "task_ids": ["odd"],
+        } in reasons
+
+
+def test_precheck_counts_rejections(client):
+    body = payload(1)
+    body["tasks"][0]["deadline"] = body["tasks"][0]["earliest_start"]
+    key = "scheduler_precheck_rejections_total"
+    before = scrape(client).get(key, 0)
+    assert client.post("/schedule_with_busy", json=body).status_code == 422
+    assert scrape(client)[key] == before + 1
+
+
+# ---------- solver options ----------
+def test_options_reproducible_seed_and_anytime_fields(client):
+    body = payload(40, seed=1414)
+    query = "?num_workers=1&seed=7&time_limit=5"
+    runs = [
+        client.post("/schedule_with_busy" + query, json=body, headers=NO_CACHE).json()
+        for _ in range(2)
+    ]
+    assert runs[0]["assignments"] == runs[1]["assignments"]
+    for result in runs:
+        assert_valid(body, result)
+        assert result["bound"] <= result["makespan"]
+        assert 0 <= result["gap"] <= 1 and result["wall_time"] <= 5 + 1
+
+
+def test_options_gap_limit_stops_early(client):
+    body = payload(40, seed=1415)
+    r = client.post("/schedule_with_busy?relative_gap=1", json=body, headers=NO_CACHE)
+    assert r.status_code == 200
+    assert_valid(body, r.json())
+    assert r.json()["solve_status"] in ("OPTIMAL", "FEASIBLE")
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "time_limit=0",
+        "time_limit=-1",
+        "num_workers=-1",
+        "relative_gap=-0.1",
+        "absolute_gap=-1",
+        "seed=x",
+    ],
+)
+def test_options_reject_invalid_values(client, query):
+    r = client.post(f"/schedule_with_busy?{query}", json=payload(3))
+    assert r.status_code == 422
+
+
+def test_options_are_clamped_to_the_server_caps(client):
+    query = f"?time_limit={server.MAX_TIME_LIMIT * 100}&num_workers=10000"
+    r = client.post("/schedule_with_busy" + query, json=payload(5), headers=NO_CACHE)
+    assert r.status_code == 200
+    assert r.json()["wall_time"] <= server.MAX_TIME_LIMIT + 1
+
+
+# ---------- msgpack wire format ----------
+MSGPACK = {"content-type": "application/msgpack", "accept": "application/msgpack"}
+
+
+def test_msgpack_in_and_out_matches_json(client):
+    body = payload(seed=1717)
+    as_json = client.post("/schedule_with_busy", json=body, headers=NO_CACHE)
+    r = client.post(
+        "/schedule_with_busy",
+        content=msgpack.packb(body),
+        headers={**MSGPACK, **NO_CACHE},
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/msgpack"
+    result = msgpack.unpackb(r.content)
+    assert_valid(body, result)
+    assert result["makespan"] == as_json.json()["makespan"]
+
+
+def test_msgpack_one_way_only(client):
+    body = payload(5)
+    r = client.post(
+        "/schedule_with_busy",
+        content=msgpack.packb(body),
+        headers={"content-type": "application/msgpack"},
+    )
+    assert r.headers["content-type"] == "application/json"
+    assert_valid(body, r.json())
+    r = client.post(
+        "/validate",
+        json={**body, "assignments": []},
+        headers={"accept": "application/msgpack"},
+    )
+    assert msgpack.unpackb(r.content)["valid"] is False
+
+
+def test_msgpack_edges(client):
+    r = client.post(
+        "/schedule_with_busy", content=msgpack.packb(empty()), headers=MSGPACK
+    )
+    assert msgpack.unpackb(r.content)["assignments"] == []
+    bad = client.post("/schedule_with_busy", content=b"\xc1", headers=MSGPACK)
+    assert bad.status_code == 422 and bad.json()["detail"] == "Invalid msgpack body"
+    wrong = client.post(
+        "/schedule_with_busy", content=msgpack.packb([1, 2]), headers=MSGPACK
+    )
+    assert wrong.status_code == 422
+
+
+# ---------- plan validation ----------
+def test_validate_a_solved_plan_and_a_broken_copy(client):
+    body = payload(seed=2020)
+    result = solved(client, body)
+    r = client.post("/validate", json={**body, "assignments": result["assignments"]})
+    assert r.status_code == 200
+    report = r.json()
+    assert report["valid"] and report["makespan"] == result["makespan"]
+    assert set(report["utilisation"]["workers"]) == {"w0", "w1", "w2"}
+
+    broken = [dict(a) for a in result["assignments"]]
+    broken[0]["end"] += 1
+    del broken[-1]
+    r = client.post("/validate", json={**body, "assignments": broken})
+    checks = {v["check"] for v in r.json()["violations"]}
+    assert not r.json()["valid"]
+    assert {"wrong_duration", "unassigned_task"} <= checks
+
+
+def test_validate_edges(client):
+    r = client.post("/validate", json={**empty(), "assignments": []})
+    assert r.status_code == 200 and r.json()["valid"]
+    assert r.json()["makespan"] == 0
+    assert client.post("/validate", json=payload(3)).status_code == 422
+    rows = [dict(task_id="t0", worker_id="w0", machine_id="m0", start=0)]
+    r = client.post("/validate", json={**payload(3), "assignments": rows})
+    assert r.status_code == 422
+
+
+# ---------- health and readiness ----------
+def test_health_and_ready(client, monkeypatch):
+    assert client.get("/health").json() == {"status": "ok"}
+    server.ready.wait(5)  # the lifespan runs warm_up() in the background
+    assert client.get("/ready").json() == {"status": "ready"}
+
+    monkeypatch.setattr(server, "ready", threading.Event())
+    r = client.get("/ready")
+    assert r.status_code == 503 and r.headers["retry-after"] == "1"
+    assert client.get("/health").status_code == 200
+
+
+def test_warm_up_sets_ready_and_leaves_no_trace(monkeypatch):
+    monkeypatch.setattr(server, "WARMUP", True)
+    monkeypatch.setattr(server, "ready", threading.Event())
+    solves = dict(server.metrics.values.get("scheduler_solves_total", {}))
+    server.warm_up()
+    assert server.ready.is_set()
+    assert server.metrics.values.get("scheduler_solves_total", {}) == solves
+    assert "scheduler_warmup_seconds" in server.metrics.values
+
+
+# ---------- resource classes ----------
+def crew(size: int) -> Dict[str, Any]:
+    """`size` identical workers and machines of one type, one of each busy."""
+    body = dict(
+        workers=[dict(id=f"w{i}", types=["A"]) for i in range(size)],
+        machines=[dict(id=f"m{i}", types=["A"]) for i in range(size)],
+        tasks=[
+            dict(id=f"t{i}", type="A", duration=3, earliest_start=0, deadline=30)
+            for i in range(3 * size - 1)
+        ],
+    )
+    body["workers"][0]["busy_windows"] = [[0, 3]]
+    return body
+
+
+@pytest.mark.parametrize("min_class", [0, 2])
+def test_classes_are_expanded_to_members(client, monkeypatch, min_class):
+    monkeypatch.setattr(server, "AGGREGATE_MIN_CLASS", min_class)
+    body = crew(4)
+    result = solved(client, body)
+    assert_valid(body, result)
+    assert result["makespan"] == 9  # 3 tasks on w1-w3, 2 on w0 after its busy window
+    used = {a["worker_id"] for a in result["assignments"]}
+    assert used == {"w0", "w1", "w2", "w3"}
+
+
+def test_classes_edges(client, monkeypatch):
+    monkeypatch.setattr(server, "AGGREGATE_MIN_CLASS", 2)
+    assert solved(client, {**crew(3), "tasks": []})["assignments"] == []
+    body = crew(1)
+    assert solved(client, body)["makespan"] == 9  # after w0's busy window
+
+
+# ---------- strengthened model ----------
+@pytest.mark.parametrize("seed", [1313, 1314])
+def test_strengthened_model_finds_the_same_optimum(client, monkeypatch, seed):
+    body = payload(25, seed=seed)
+    plain = solved(client, body)
+    monkeypatch.setattr(server, "STRENGTHEN", True)
+    strong = solved(client, body)
+    assert_valid(body, strong)
+    assert strong["solve_status"] == plain["solve_status"] == "OPTIMAL"
+    assert strong["makespan"] == plain["makespan"]
+    assert strong["bound"] == strong["makespan"]
@@ -0,0 +1,262 @@
+# test_checks.py  – pure checks: precheck(), validate_plan(), canonical_form()
+import random
+
+from server import (
+    Assignment,
+    ScheduleRequestBW,
+    busy_maps,
+    canonical_form,
+    precheck,
+    validate_plan,
+)
+
+
+# ---------- instance ----------
+def instance(tasks=None, worker_busy=(), machine_busy=()) -> ScheduleRequestBW:
+    """Two workers and two machines; w1/m2 only take one type each."""
+    return ScheduleRequestBW(
+        workers=[
+            dict(id="w1", types=["A"], busy_windows=list(worker_busy)),
+            dict(id="w2", types=["A", "B"]),
+        ],
+        machines=[
+            dict(id="m1", types=["A", "B"]),
+            dict(id="m2", types=["B"], busy_windows=list(machine_busy)),
+        ],
+        tasks=tasks
+        or [
+            dict(id="t1", type="A", duration=3, earliest_start=0, deadline=10),
+            dict(id="t2", type="B", duration=2, earliest_start=0, deadline=10),
+            dict(id="t3", type="A", duration=4, earliest_start=2, deadline=12),
+        ],
+    )
+
+
+def task(tid, ty, duration, es, dl):
+    return dict(id=tid, type=ty, duration=duration, earliest_start=es, deadline=dl)
+
+
+def checks(reasons):
+    return {r["check"] for r in reasons}
+
+
+# ---------- precheck ----------
+def test_precheck_passes_and_bounds_every_task():
+    req = instance()
+    pre = precheck(req, *busy_maps(req))
+    assert pre.reasons == []
+    assert pre.bounds == {"t1": (0, 7), "t2": (0, 8), "t3": (2, 8)}
+
+
+def test_precheck_no_eligible_resource():
+    req = instance([task("t1", "A", 1, 0, 5), task("t9", "C", 1, 0, 5)])
+    reasons = precheck(req, *busy_maps(req)).reasons
+    assert {"check": "no_eligible_worker", "type": "C", "task_ids": ["t9"]} in reasons
+    assert {"check": "no_eligible_machine", "type": "C", "task_ids": ["t9"]} in reasons
+
+
+def test_precheck_window_too_short():
+    req = instance([task("t1", "A", 5, 0, 3)])
+    reasons = precheck(req, *busy_maps(req)).reasons
+    assert {"check": "window_too_short", "task_ids": ["t1"]} in reasons
+    assert checks(reasons) == {"window_too_short", "machine_capacity"}
+
+
+def test_precheck_capacity():
+    # type B: one worker, 12 units of work in a 10-unit window
+    req = instance([task(f"t{i}", "B", 4, 0, 10) for i in range(3)])
+    (reason,) = precheck(req, *busy_maps(req)).reasons
+    assert reason["check"] == "worker_capacity"
+    assert (reason["type"], reason["work"], reason["capacity"]) == ("B", 12, 10)
+    assert reason["resources"] == ["w2"]
+    assert reason["task_ids"] == ["t0", "t1", "t2"]
+
+
+def test_precheck_capacity_counts_busy_windows():
+    # m2 has 10 units of work in [0, 10] but is busy for 1 of them
+    req = instance([task("t1", "B", 4, 0, 10), task("t2", "B", 6, 0, 10)])
+    req.machines[0].types = {"A"}
+    req.machines[1].busy_windows = [(9, 12)]
+    (reason,) = precheck(req, *busy_maps(req)).reasons
+    assert reason["check"] == "machine_capacity"
+    assert (reason["work"], reason["capacity"]) == (10, 9)
+    assert reason["resources"] == ["m2"]
+
+
+def test_precheck_no_free_slot():
+    # the only worker has 6 free units, but never 4 in a row
+    req = ScheduleRequestBW(
+        workers=[dict(id="w1", types=["A"], busy_windows=[(3, 7)])],
+        machines=[dict(id="m1", types=["A"])],
+        tasks=[task("t1", "A", 4, 0, 10)],
+    )
+    (reason,) = precheck(req, *busy_maps(req)).reasons
+    assert reason == {
+        "check": "no_free_worker",
+        "type": "A",
+        "resources": ["w1"],
+        "task_ids": ["t1"],
+    }
+
+
+def test_precheck_no_common_free_slot():
+    # the worker is free early, the machine late
+    req = ScheduleRequestBW(
+        workers=[dict(id="w1", types=["A"], busy_windows=[(4, 10)])],
+        machines=[dict(id="m1", types=["A"], busy_windows=[(0, 6)])],
+        tasks=[task("t1", "A", 3, 0, 10)],
+    )
+    reasons = precheck(req, *busy_maps(req)).reasons
+    assert reasons == [{"check": "no_common_free_slot", "task_ids": ["t1"]}]
+
+
+# ---------- validate_plan ----------
+def plan(*rows):
+    return [
+        Assignment(task_id=t, worker_id=w, machine_id=m, start=s, end=e)
+        for t, w, m, s, e in rows
+    ]
+
+
+def test_validate_plan_accepts_a_valid_plan():
+    req = instance()
+    result = validate_plan(
+        req,
+        plan(
+            ("t1", "w1", "m1", 0, 3),
+            ("t2", "w2", "m2", 0, 2),
+            ("t3", "w1", "m1", 3, 7),
+        ),
+    )
+    assert result["valid"] and result["violations"] == []
+    assert result["makespan"] == 7
+    assert result["utilisation"]["workers"]["w1"] == 1.0
+
+
+def test_validate_plan_reports_each_violation():
+    req = instance(worker_busy=[(20, 30)])
+    result = validate_plan(
+        req,
+        plan(
+            ("t1", "w1", "m1", 0, 3),
+            ("t1", "w2", "m1", 5, 8),  # duplicate
+            ("t2", "w1", "m2", 0, 2),  # w1 cannot do B
+            ("t3", "w1", "m9", 9, 13),  # unknown machine, past deadline
+            ("t8", "w2", "m1", 10, 11),  # unknown task
+        ),
+    )
+    assert not result["valid"]
+    v = result["violations"]
+    assert checks(v) == {
+        "unknown_task",
+        "duplicate_assignment",
+        "ineligible_worker",
+        "unknown_machine",
+        "after_deadline",
+        "worker_overlap",
+    }
+    assert {"check": "unknown_task", "task_id": "t8"} in v
+    assert {"check": "duplicate_assignment", "task_id": "t1", "count": 2} in v
+    assert {
+        "check": "ineligible_worker",
+        "task_id": "t2",
+        "worker_id": "w1",
+        "type": "B",
+    } in v
+    (late,) = [x for x in v if x["check"] == "after_deadline"]
+    assert (late["task_id"], late["end"], late["deadline"]) == ("t3", 13, 12)
+    (overlap,) = [x for x in v if x["check"] == "worker_overlap"]
+    assert {overlap["task_id"], overlap["other_task_id"]} == {"t1", "t2"}
+
+
+def test_validate_plan_duration_window_and_busy():
+    req = instance(worker_busy=[(4, 6)])
+    result = validate_plan(
+        req,
+        plan(
+            ("t1", "w1", "m1", 5, 7),  # too short, runs into w1's busy window
+            ("t3", "w2", "m1", 0, 4),  # before its earliest start
+        ),
+    )
+    v = result["violations"]
+    assert checks(v) == {
+        "unassigned_task",
+        "wrong_duration",
+        "worker_busy",
+        "before_earliest_start",
+    }
+    assert {"check": "unassigned_task", "task_id": "t2", "count": 0} in v
+    assert {
+        "check": "worker_busy",
+        "worker_id": "w1",
+        "task_id": "t1",
+        "window": [4, 6],
+    } in v
+
+
+def test_validate_plan_zero_length_tasks_overlap_nothing():
+    req = instance(
+        [
+            task("t1", "A", 4, 0, 10),
+            task("t2", "A", 0, 0, 10),
+            task("t3", "A", 0, 0, 10),
+        ],
+        worker_busy=[(5, 8)],
+    )
+    result = validate_plan(
+        req,
+        plan(
+            ("t1", "w1", "m1", 0, 4),
+            ("t2", "w1", "m1", 0, 0),  # same start as t1
+            ("t3", "w1", "m1", 6, 6),  # inside w1's busy window
+        ),
+    )
+    assert result["violations"] == []
+
+
+# ---------- canonical_form ----------
+def key(req: ScheduleRequestBW) -> str:
+    return canonical_form(req, *busy_maps(req))[0]
+
+
+def test_cache_key_ignores_order_and_ids():
+    base = instance(worker_busy=[(20, 25)]).model_dump()
+    expected = key(ScheduleRequestBW(**base))
+
+    rng = random.Random(0)
+    for _ in range(5):
+        shuffled = {k: list(v) for k, v in base.items()}
+        for rows in shuffled.values():
+            rng.shuffle(rows)
+        for r in shuffled["workers"] + shuffled["machines"]:
+            r["types"] = rng.sample(sorted(r["types"]), len(r["types"]))
+        assert key(ScheduleRequestBW(**shuffled)) == expected
+
+    renamed = {
+        "workers": [{**w, "id": "x" + w["id"]} for w in base["workers"]],
+        "machines": [{**m, "id": "y" + m["id"]} for m in base["machines"]],
+        "tasks": [{**t, "id": "z" + t["id"]} for t in base["tasks"]],
+    }
+    assert key(ScheduleRequestBW(**renamed)) == expected
+
+
+def test_cache_key_changes_with_the_instance():
+    base = instance(worker_busy=[(20, 25)]).model_dump()
+    expected = key(ScheduleRequestBW(**base))
+    longer = {
+        **base,
+        "tasks": [{**base["tasks"][0], "duration": 4}, *base["tasks"][1:]],
+    }
+    busier = {
+        **base,
+        "workers": [
+            {**base["workers"][0], "busy_windows": [(20, 26)]},
+            base["workers"][1],
+        ],
+    }
+    retyped = {
+        **base,
+        "machines": [base["machines"][0], {**base["machines"][1], "types": ["A"]}],
+    }
+    for other in (longer, busier, retyped):
+        assert key(ScheduleRequestBW(**other)) != expected